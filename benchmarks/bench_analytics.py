@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+学习数据分析基准测试
+1. 原实现：每个统计都逐条遍历进度数据的答题历史（解析时间字符串、字典计数）
+2. 列式分析：一次性加载为数组，之后每个查询都是向量化的数组运算
+
+用法: python benchmarks/bench_analytics.py [答题记录数]
+"""
+
+import sys
+from datetime import datetime
+
+from bench_common import Timer
+
+from core.progress_analytics import ProgressAnalytics, NUMPY_AVAILABLE
+from core.progress_events import new_progress_data
+
+QUESTIONS_PER_EXAM = 100
+HISTORY_PER_QUESTION = 50
+
+
+def make_progress(record_count: int) -> dict:
+    """生成约 record_count 条答题记录的进度数据（每道题 50 条，每次会话作答一份试卷的全部题目）"""
+    progress_data = new_progress_data()
+    question_count = max(1, record_count // HISTORY_PER_QUESTION)
+    for q in range(question_count):
+        exam_no = q // QUESTIONS_PER_EXAM
+        exam = progress_data["exams"].setdefault(f"exam_{exam_no:04d}", {"questions": {}})
+        history = [{
+            "timestamp": f"2025-{i // 28 % 12 + 1:02d}-{i % 28 + 1:02d}T{exam_no % 24:02d}:{q % 60:02d}:{i % 60:02d}",
+            "correct": (q * 7 + i) % (q % 5 + 2) != 0,
+            "user_answer": ["A"],
+            "session_id": f"exam_{exam_no:04d}_session_{i:03d}"
+        } for i in range(HISTORY_PER_QUESTION)]
+        correct = sum(1 for record in history if record["correct"])
+        exam["questions"][f"q{q % QUESTIONS_PER_EXAM + 1}"] = {
+            "attempts": HISTORY_PER_QUESTION, "correct": correct,
+            "last_correct": history[-1]["correct"], "history": history
+        }
+    return progress_data
+
+
+def legacy_weakest_questions(progress_data: dict, limit: int) -> list:
+    """原有写法：逐题计算正确率后排序（作为对照基线）"""
+    rows = []
+    for exam_id, exam in progress_data["exams"].items():
+        for question_id, question in exam["questions"].items():
+            if question["attempts"] > 0:
+                rows.append((question["correct"] / question["attempts"], -question["attempts"], exam_id, question_id))
+    rows.sort(key=lambda row: (row[0], row[1]))
+    return [(exam_id, question_id) for _, _, exam_id, question_id in rows[:limit]]
+
+
+def legacy_daily_trend(progress_data: dict) -> dict:
+    """原有写法：逐条解析时间并按日期计数（作为对照基线）"""
+    days = {}
+    for exam in progress_data["exams"].values():
+        for question in exam["questions"].values():
+            for record in question["history"]:
+                day = datetime.fromisoformat(record["timestamp"]).date().isoformat()
+                stats = days.setdefault(day, [0, 0])
+                stats[0] += 1
+                stats[1] += record["correct"]
+    return {day: tuple(stats) for day, stats in sorted(days.items())}
+
+
+def legacy_mean_gap(progress_data: dict) -> float:
+    """原有写法：逐题解析时间并计算相邻作答间隔（作为对照基线）"""
+    gaps = []
+    for exam in progress_data["exams"].values():
+        for question in exam["questions"].values():
+            times = sorted(datetime.fromisoformat(record["timestamp"]) for record in question["history"])
+            gaps.extend((b - a).total_seconds() for a, b in zip(times, times[1:]))
+    return sum(gaps) / len(gaps)
+
+
+def main():
+    record_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    progress_data = make_progress(record_count)
+    print(f"答题记录: {record_count}，NumPy: {'可用' if NUMPY_AVAILABLE else '不可用（array 模块）'}")
+    print("-" * 50)
+
+    with Timer() as legacy_weakest:
+        expected_weakest = legacy_weakest_questions(progress_data, 20)
+    with Timer() as legacy_trend:
+        expected_trend = legacy_daily_trend(progress_data)
+    with Timer() as legacy_gap:
+        expected_gap = legacy_mean_gap(progress_data)
+
+    with Timer() as build:
+        analytics = ProgressAnalytics(progress_data)
+    with Timer() as weakest:
+        actual_weakest = analytics.weakest_questions(20)
+    with Timer() as trend:
+        actual_trend = analytics.accuracy_trend('day')
+    with Timer() as session_trend:
+        analytics.accuracy_trend('session')
+    with Timer() as gap:
+        actual_gap = analytics.time_between_attempts()
+    with Timer() as category:
+        analytics.error_rates_by_category(lambda exam_id, question_id: exam_id[-1])
+
+    assert [(row["exam_id"], row["question_id"]) for row in actual_weakest] == expected_weakest
+    assert {row["key"]: (row["attempts"], row["correct"]) for row in actual_trend} == expected_trend
+    assert abs(actual_gap["mean"] - expected_gap) < 1e-6
+
+    print(f"{'查询':<16}{'原实现(ms)':>12}{'列式(ms)':>12}")
+    print(f"{'薄弱题目':<16}{legacy_weakest.elapsed:>12.1f}{weakest.elapsed:>12.1f}")
+    print(f"{'按天正确率':<16}{legacy_trend.elapsed:>12.1f}{trend.elapsed:>12.1f}")
+    print(f"{'作答间隔':<16}{legacy_gap.elapsed:>12.1f}{gap.elapsed:>12.1f}")
+    print(f"{'按会话正确率':<16}{'-':>12}{session_trend.elapsed:>12.1f}")
+    print(f"{'分类错误率':<16}{'-':>12}{category.elapsed:>12.1f}")
+    print("-" * 50)
+    print(f"一次性加载: {build.elapsed:.0f} ms；"
+          f"三项查询合计加速比: {(legacy_weakest.elapsed + legacy_trend.elapsed + legacy_gap.elapsed) / (weakest.elapsed + trend.elapsed + gap.elapsed):.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+判题微基准测试
+模拟 ExamWindow 交卷时对每道题判题：
+1. 原实现：每次调用都从 items 整理正确答案和分值，并重新规范化全部答案
+2. QuestionManager.check_answer 不带题目位置：每次调用编译一次答案（原有的 strip().lower() 规则）
+3. QuestionManager.check_answer 带试卷ID和题目序号（ExamWindow 的用法）：复用加载试卷时编译的答案
+4. 同 3，使用可选的宽松规范化流水线（NFKC、空白折叠、包裹引号）
+
+用法: python benchmarks/bench_check_answer.py [题目数量]
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+
+from bench_common import make_exam, Timer
+
+from core.answer_key import AnswerNormalizer, FUZZY_PIPELINE, LEGACY_PIPELINE
+from core.question_manager import QuestionManager
+
+ROUNDS = 20
+
+
+def legacy_check_answer(question, user_answer):
+    """原 QuestionManager.check_answer 的判题逻辑（作为对照基线）"""
+    question_type = question.get('type', 'single_choice')
+    correct_answer = []
+    item_scores = []
+    if question_type in ("comprehensive", "cloze_group"):
+        for item in question.get('items', []):
+            item_answer = item.get('answer', '')
+            item_score = item.get('score', 1)
+            if isinstance(item_answer, list):
+                correct_answer.extend(item_answer)
+                item_scores.extend([item_score] * len(item_answer))
+            else:
+                correct_answer.append(str(item_answer))
+                item_scores.append(item_score)
+    else:
+        correct_answer = question.get('answer', [])
+
+    cleaned_user_answer = [str(ans).strip().lower() for ans in user_answer]
+    cleaned_correct_answer = [str(ans).strip().lower() for ans in correct_answer]
+
+    if question_type in ("cloze_group", "comprehensive"):
+        item_correctness = []
+        item_earned_scores = []
+        for i in range(len(cleaned_correct_answer)):
+            if i < len(cleaned_user_answer) and cleaned_user_answer[i]:
+                is_item_correct = cleaned_user_answer[i] == cleaned_correct_answer[i]
+                item_correctness.append(is_item_correct)
+                item_score = item_scores[i] if i < len(item_scores) else 1
+                item_earned_scores.append(item_score if is_item_correct else 0)
+            else:
+                item_correctness.append(False)
+                item_earned_scores.append(0)
+        is_correct = sum(item_earned_scores) > 0
+    else:
+        is_correct = cleaned_user_answer == cleaned_correct_answer
+        item_correctness = []
+        item_earned_scores = []
+
+    return is_correct, question.get('analysis', '暂无解析'), item_correctness, item_earned_scores
+
+
+def make_user_answers(questions):
+    """为每道题生成一份用户答案（约一半正确）"""
+    random.seed(0)
+    answers = []
+    for question in questions:
+        if question['type'] in ('cloze_group', 'comprehensive'):
+            correct = [item['answer'] for item in question['items']]
+        else:
+            correct = list(question['answer'])
+        answers.append([f" {ans.upper()} " if random.random() < 0.5 else "wrong" for ans in correct])
+    return answers
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    exam_id = "exam_check"
+    exams_dir = tempfile.TemporaryDirectory()
+    with open(os.path.join(exams_dir.name, f"{exam_id}.json"), 'w', encoding='utf-8') as f:
+        json.dump(make_exam(exam_id, count), f, ensure_ascii=False)
+    manager = QuestionManager(exams_dir.name, answer_normalizer=AnswerNormalizer(LEGACY_PIPELINE))
+    fuzzy_manager = QuestionManager(exams_dir.name,
+                                    answer_normalizer=AnswerNormalizer(FUZZY_PIPELINE + ('strip_quotes',)))
+    # 与 ExamWindow 相同：先加载试卷（加载时预编译答案），再按试卷ID和题目序号判题
+    questions = manager.load_exam(exam_id)['questions']
+    fuzzy_manager.load_exam(exam_id)
+    user_answers = make_user_answers(questions)
+    print(f"题目数量: {count}，每轮判题 {count} 次")
+    print("-" * 50)
+
+    with Timer() as recompile:
+        for _ in range(ROUNDS):
+            for question, answer in zip(questions, user_answers):
+                legacy_check_answer(question, answer)
+
+    with Timer() as per_call_compile:
+        for _ in range(ROUNDS):
+            for question, answer in zip(questions, user_answers):
+                manager.check_answer(question, answer)
+
+    with Timer() as compiled:
+        for _ in range(ROUNDS):
+            for index, (question, answer) in enumerate(zip(questions, user_answers)):
+                manager.check_answer(question, answer, exam_id, index)
+
+    with Timer() as fuzzy:
+        for _ in range(ROUNDS):
+            for index, (question, answer) in enumerate(zip(questions, user_answers)):
+                fuzzy_manager.check_answer(question, answer, exam_id, index)
+
+    # 确认各实现的判题结果完全一致
+    for index, (question, answer) in enumerate(zip(questions, user_answers)):
+        expected = legacy_check_answer(question, answer)
+        assert expected == manager.check_answer(question, answer)
+        assert expected == manager.check_answer(question, answer, exam_id, index)
+        assert expected[0] == fuzzy_manager.check_answer(question, answer, exam_id, index)[0]
+
+    per_call = 1000 / (ROUNDS * count)
+    print(f"原实现          : {recompile.elapsed / ROUNDS:8.2f} ms/轮  ({recompile.elapsed * per_call:.2f} µs/次)")
+    print(f"不带位置        : {per_call_compile.elapsed / ROUNDS:8.2f} ms/轮  ({per_call_compile.elapsed * per_call:.2f} µs/次)")
+    print(f"带试卷ID和序号  : {compiled.elapsed / ROUNDS:8.2f} ms/轮  ({compiled.elapsed * per_call:.2f} µs/次)")
+    print(f"带位置+宽松规范化: {fuzzy.elapsed / ROUNDS:8.2f} ms/轮  ({fuzzy.elapsed * per_call:.2f} µs/次)")
+    print("-" * 50)
+    print(f"check_answer 加速比（带位置 vs 原实现）: {recompile.elapsed / compiled.elapsed:.1f}x")
+    exams_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试公共工具
+负责准备运行环境（项目路径、测试密钥）以及生成合成试卷数据
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+# 添加项目路径到系统路径
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+# 基准测试使用独立的测试密钥，避免依赖真实的 .env 配置
+os.environ.setdefault("EXAM_DATA_ENCRYPTION_KEY", "benchmark-only-key")
+
+
+def make_exam(exam_id: str, question_count: int = 50) -> dict:
+    """生成一份包含四种题型的合成试卷"""
+    questions = []
+    for i in range(question_count):
+        kind = i % 4
+        qid = f"q{i + 1}"
+        if kind == 0:
+            questions.append({
+                "id": qid,
+                "type": "single_choice",
+                "question": f"第{i + 1}题：下列哪个命令可以查看当前目录下的文件列表？",
+                "options": ["A. ls", "B. cd", "C. pwd", "D. mkdir"],
+                "answer": ["A"],
+                "score": 2,
+                "analysis": "ls 命令用于列出目录内容。"
+            })
+        elif kind == 1:
+            questions.append({
+                "id": qid,
+                "type": "fill_blank",
+                "question": f"第{i + 1}题：使用 ____ 命令修改文件权限。",
+                "answer": ["chmod"],
+                "score": 2,
+                "analysis": "chmod 用于修改文件的访问权限。"
+            })
+        elif kind == 2:
+            questions.append({
+                "id": qid,
+                "type": "cloze_group",
+                "question": "进程的三种基本状态是 [1]、[2] 和 [3]。<br>请依次填写。",
+                "items": [
+                    {"id": f"{qid}_1", "index": 1, "answer": "就绪", "score": 1},
+                    {"id": f"{qid}_2", "index": 2, "answer": "运行", "score": 1},
+                    {"id": f"{qid}_3", "index": 3, "answer": "阻塞", "score": 1},
+                ],
+                "analysis": "进程的基本状态为就绪、运行和阻塞。"
+            })
+        else:
+            questions.append({
+                "id": qid,
+                "type": "comprehensive",
+                "question": "阅读下面的 Shell 脚本并回答问题：<br><code>for f in *.c; do gcc $f; done</code>",
+                "items": [
+                    {"id": f"{qid}_1", "answer": "gcc", "score": 2},
+                    {"id": f"{qid}_2", "answer": "for", "score": 2},
+                ],
+                "analysis": "脚本遍历所有 C 源文件并逐个编译。"
+            })
+    return {
+        "exam_id": exam_id,
+        "exam_name": f"Linux应用与开发技术 - {exam_id}",
+        "description": "基准测试用合成试卷",
+        "time_limit": 120,
+        "total_score": 100,
+        "questions": questions
+    }
+
+
+class Timer:
+    """简单计时上下文管理器，elapsed 单位为毫秒"""
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = (time.perf_counter() - self._start) * 1000
+        return False
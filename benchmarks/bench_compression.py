@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+压缩加密基准测试
+比较不压缩 / zlib / lzma 三种载荷在以下指标上的差异：
+1. 磁盘占用（Base64 文本格式与二进制容器）
+2. 整卷解密耗时（load_file，含解压与 JSON 解析）
+3. 首题延迟（流式解密直到第一道题解析完成）
+另外比较含超大字段（如内嵌图片）的试卷整卷解密与流式解析全部事件的耗时，流式解析应与值的大小成线性关系
+
+默认使用 data/exams 下的明文试卷；目录为空时使用合成试卷
+用法: python benchmarks/bench_compression.py [试卷目录]
+"""
+
+import os
+import sys
+import json
+import tempfile
+
+from bench_common import project_root, make_exam, Timer
+
+from core.data_encryptor import encryptor
+from core.json_stream import FIELD, ITEM
+
+REPEAT = 5
+LARGE_FIELD_MB = (8, 32)
+
+
+def load_sample_exams(exams_dir: str) -> list:
+    """读取目录下的明文试卷，没有则生成合成试卷"""
+    exams = []
+    if os.path.isdir(exams_dir):
+        for filename in sorted(os.listdir(exams_dir)):
+            if filename.endswith('.json'):
+                with open(os.path.join(exams_dir, filename), 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if isinstance(data, dict) and 'questions' in data:
+                    exams.append((filename, data))
+    if not exams:
+        exams = [(f"synthetic_{n}.json", make_exam(f"synthetic_{n}", n)) for n in (50, 200, 1000)]
+    return exams
+
+
+def best_of(func) -> float:
+    """重复执行取最快一次（毫秒）"""
+    best = float('inf')
+    for _ in range(REPEAT):
+        with Timer() as t:
+            func()
+        best = min(best, t.elapsed)
+    return best
+
+
+def first_question(path: str) -> None:
+    for event, _, _ in encryptor.iter_exam_events(path):
+        if event == ITEM:
+            return
+
+
+def stream_exam(path: str) -> dict:
+    """流式解析全部事件并还原为试卷字典"""
+    data = {}
+    for event, key, value in encryptor.iter_exam_events(path):
+        if event == FIELD:
+            data[key] = value
+        elif event == ITEM:
+            data.setdefault(key, []).append(value)
+    return data
+
+
+def bench_large_field(work_dir: str) -> None:
+    """单个字段达到数 MB 时，流式解析与整卷解密的耗时对比"""
+    print(f"{'超大字段':<12}{'整卷(ms)':>12}{'流式(ms)':>12}")
+    print("-" * 36)
+    for size_mb in LARGE_FIELD_MB:
+        data = make_exam(f"large_{size_mb}", 5)
+        data['questions'][0]['image'] = 'A' * (size_mb * 1024 * 1024)
+        path = os.path.join(work_dir, 'large.exb')
+        with open(path, 'wb') as f:
+            f.write(encryptor.encrypt_container(data))
+
+        with Timer() as full:
+            expected = encryptor.load_file(path)
+        with Timer() as streamed:
+            actual = stream_exam(path)
+        assert actual == expected
+        print(f"{f'{size_mb} MB':<12}{full.elapsed:>12.1f}{streamed.elapsed:>12.1f}")
+    print("-" * 36)
+
+
+def main():
+    exams_dir = sys.argv[1] if len(sys.argv) > 1 else str(project_root / "data" / "exams")
+    exams = load_sample_exams(exams_dir)
+
+    print(f"{'试卷':<24}{'压缩':<6}{'文本(B)':>10}{'容器(B)':>10}{'整卷(ms)':>10}{'首题(ms)':>10}")
+    print("-" * 70)
+    with tempfile.TemporaryDirectory() as work_dir:
+        for filename, data in exams:
+            for compression in (None, 'zlib', 'lzma'):
+                text_path = os.path.join(work_dir, 'exam.json.enc')
+                container_path = os.path.join(work_dir, 'exam.exb')
+                with open(text_path, 'w', encoding='utf-8') as f:
+                    f.write(encryptor.encrypt_data(data, compression=compression))
+                with open(container_path, 'wb') as f:
+                    f.write(encryptor.encrypt_container(data, compression=compression))
+
+                # 预热派生密钥缓存，计时只反映 AES、解压与解析的开销
+                encryptor.load_file(container_path)
+                full = best_of(lambda: encryptor.load_file(container_path))
+                first = best_of(lambda: first_question(container_path))
+
+                print(f"{filename[:22]:<24}{compression or '无':<6}"
+                      f"{os.path.getsize(text_path):>10}{os.path.getsize(container_path):>10}"
+                      f"{full:>10.2f}{first:>10.2f}")
+            print("-" * 70)
+        bench_large_field(work_dir)
+
+
+if __name__ == "__main__":
+    main()
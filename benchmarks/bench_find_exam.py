@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按ID查找试卷文件基准测试
+1. 原实现：逐个尝试 8 个候选文件名（os.path.exists）
+2. 目录索引：一次 os.scandir 建立索引，之后按目录修改时间检查是否需要重建
+
+用法: python benchmarks/bench_find_exam.py [试卷数量]
+"""
+
+import os
+import sys
+import tempfile
+
+from bench_common import Timer
+
+from core.data_encryptor import CONTAINER_EXTENSION
+from core.lazy_exam import INDEXED_EXTENSION
+from core.question_manager import QuestionManager
+
+ROUNDS = 20
+
+
+def legacy_find_exam_file(data_dir, exam_id):
+    """原 QuestionManager.find_exam_file 的查找逻辑（作为对照基线）"""
+    prefixed = exam_id if exam_id.startswith('exam_') else f"exam_{exam_id}"
+    possible_filenames = [
+        f"{exam_id}.json", f"{exam_id}.json.enc", f"{exam_id}{CONTAINER_EXTENSION}",
+        f"{prefixed}.json", f"{prefixed}.json.enc", f"{prefixed}{CONTAINER_EXTENSION}",
+        f"{exam_id}{INDEXED_EXTENSION}", f"{prefixed}{INDEXED_EXTENSION}",
+    ]
+    for filename in possible_filenames:
+        exam_path = os.path.join(data_dir, filename)
+        if os.path.exists(exam_path):
+            return exam_path
+    return None
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    suffixes = ('.json', '.json.enc', CONTAINER_EXTENSION, INDEXED_EXTENSION)
+    with tempfile.TemporaryDirectory() as exams_dir:
+        # 文件内容不影响查找，只创建空文件；后缀轮流使用，让原实现需要尝试不同数量的候选文件名
+        exam_ids = []
+        for i in range(count):
+            exam_id = f"{i + 1:04d}"
+            exam_ids.append(exam_id)
+            open(os.path.join(exams_dir, f"exam_{exam_id}{suffixes[i % len(suffixes)]}"), 'w').close()
+
+        manager = QuestionManager(exams_dir)
+        print(f"试卷数量: {count}，每轮查找 {count} 次")
+        print("-" * 50)
+
+        with Timer() as legacy:
+            for _ in range(ROUNDS):
+                for exam_id in exam_ids:
+                    legacy_find_exam_file(exams_dir, exam_id)
+
+        with Timer() as indexed:
+            for _ in range(ROUNDS):
+                for exam_id in exam_ids:
+                    manager.find_exam_file(exam_id)
+
+        for exam_id in exam_ids + ['missing']:
+            assert legacy_find_exam_file(exams_dir, exam_id) == manager.find_exam_file(exam_id)
+
+    per_call = 1000 / (ROUNDS * count)
+    print(f"逐个尝试文件名  : {legacy.elapsed / ROUNDS:8.2f} ms/轮  ({legacy.elapsed * per_call:.2f} µs/次)")
+    print(f"目录索引        : {indexed.elapsed / ROUNDS:8.2f} ms/轮  ({indexed.elapsed * per_call:.2f} µs/次)")
+    print("-" * 50)
+    print(f"加速比: {legacy.elapsed / indexed.elapsed:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+派生密钥缓存基准测试
+比较 QuestionManager.list_exams 在以下场景下的耗时：
+1. 缓存关闭（每个试卷都执行一次 PBKDF2）
+2. 每个文件独立盐值 + 缓存（首次打开仍为 O(试卷数)，再次打开为零次派生）
+3. 批量共用盐值 + 缓存（整个题库只派生一次）
+
+list_exams 会在试卷目录中写入元数据旁路文件和目录缓存，之后的列出不再解密试卷；
+因此每个场景都把加密试卷复制到新的临时目录中测量，保证每次都真正解密全部试卷。
+
+用法: python benchmarks/bench_key_cache.py [试卷数量]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+from bench_common import make_exam, Timer
+
+from core import data_encryptor
+from core.data_encryptor import encryptor, clear_key_cache
+from core.question_manager import QuestionManager
+
+
+def write_exams(exams_dir: str, count: int, shared_salt: bytes = None) -> None:
+    """写入 count 份加密试卷"""
+    for i in range(count):
+        exam_id = f"exam_{i + 1:03d}"
+        with open(os.path.join(exams_dir, f"{exam_id}.json.enc"), 'w', encoding='utf-8') as f:
+            f.write(encryptor.encrypt_data(make_exam(exam_id, 20), salt=shared_salt))
+
+
+def time_list(source_dir: str) -> float:
+    """把加密试卷复制到新目录（不含旁路文件和目录缓存）后计时 list_exams"""
+    with tempfile.TemporaryDirectory() as exams_dir:
+        for filename in os.listdir(source_dir):
+            shutil.copy2(os.path.join(source_dir, filename), exams_dir)
+        manager = QuestionManager(exams_dir)
+        with Timer() as t:
+            manager.list_exams()
+    return t.elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    print(f"试卷数量: {count}")
+    print("-" * 50)
+
+    with tempfile.TemporaryDirectory() as per_file_dir, tempfile.TemporaryDirectory() as shared_dir:
+        write_exams(per_file_dir, count)
+        write_exams(shared_dir, count, shared_salt=os.urandom(16))
+
+        # 1. 关闭缓存：缓存容量为 0 时每次都会重新派生
+        original_size = data_encryptor.KEY_CACHE_SIZE
+        data_encryptor.KEY_CACHE_SIZE = 0
+        clear_key_cache()
+        baseline = time_list(per_file_dir)
+        data_encryptor.KEY_CACHE_SIZE = original_size
+        print(f"无缓存            : {baseline:8.1f} ms")
+
+        # 2. 独立盐值：第一次打开冷启动，再次解密同一批文件时全部命中缓存
+        clear_key_cache()
+        cold = time_list(per_file_dir)
+        warm = time_list(per_file_dir)
+        print(f"独立盐值 首次打开 : {cold:8.1f} ms")
+        print(f"独立盐值 再次打开 : {warm:8.1f} ms")
+
+        # 3. 共用盐值：首次打开只需一次派生
+        clear_key_cache()
+        shared = time_list(shared_dir)
+        print(f"共用盐值 首次打开 : {shared:8.1f} ms")
+
+    print("-" * 50)
+    print(f"再次打开加速比: {baseline / max(warm, 1e-6):.1f}x")
+    print(f"共用盐值加速比: {baseline / max(shared, 1e-6):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
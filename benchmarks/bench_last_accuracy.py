@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+上次正确率计算基准测试
+1. 原实现：取每道题最后一条答题记录，排序后逐条解析时间戳，按 30 分钟窗口推断上次会话
+2. 会话索引：写入时按 session_id 维护答题数和正确数，直接读取最近一次会话的统计
+
+用法: python benchmarks/bench_last_accuracy.py [题目数量] [交卷次数]
+"""
+
+import sys
+from datetime import datetime, timedelta
+
+from bench_common import Timer
+
+from core.progress_events import apply_event, new_progress_data
+
+ROUNDS = 200
+
+
+def legacy_last_attempt_accuracy(questions: dict) -> float:
+    """原 _calculate_last_attempt_accuracy 的计算逻辑（作为对照基线）"""
+    recent_attempts = []
+    for q_id, q_data in questions.items():
+        if q_data.get("history"):
+            last_record = q_data["history"][-1]
+            recent_attempts.append({
+                "question_id": q_id,
+                "timestamp": last_record.get("timestamp"),
+                "correct": last_record.get("correct", False)
+            })
+    if not recent_attempts:
+        return 0.0
+    recent_attempts.sort(key=lambda x: x["timestamp"] or "", reverse=True)
+    most_recent_dt = datetime.fromisoformat(recent_attempts[0]["timestamp"])
+    last_session_questions = []
+    for attempt in recent_attempts:
+        attempt_dt = datetime.fromisoformat(attempt["timestamp"])
+        if abs((attempt_dt - most_recent_dt).total_seconds()) <= 1800:
+            last_session_questions.append(attempt)
+    correct_count = sum(1 for q in last_session_questions if q["correct"])
+    return correct_count / len(last_session_questions) * 100
+
+
+def index_last_attempt_accuracy(exam_data: dict) -> float:
+    """会话索引的计算逻辑（与 UserProgressManager._calculate_last_attempt_accuracy 相同）"""
+    entry = exam_data["session_index"].get(exam_data.get("last_session_id"))
+    if not entry or not entry["attempts"]:
+        return 0.0
+    return entry["correct"] / entry["attempts"] * 100
+
+
+def main():
+    question_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    session_count = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    # 每次交卷作答全部题目，两次交卷间隔一天（原实现的 30 分钟窗口恰好对应一次会话）
+    progress_data = new_progress_data()
+    start = datetime(2025, 1, 1, 9, 0, 0)
+    for s in range(session_count):
+        for q in range(question_count):
+            apply_event(progress_data, {
+                "op": "answer", "exam_id": "bench", "question_id": f"q{q}",
+                "correct": (q + s) % 3 != 0, "user_answer": ["A"], "session_id": f"session_{s}",
+                "timestamp": (start + timedelta(days=s, seconds=q)).isoformat()
+            })
+    exam_data = progress_data["exams"]["bench"]
+    print(f"题目数量: {question_count}，交卷次数: {session_count}")
+    print("-" * 50)
+
+    with Timer() as legacy:
+        for _ in range(ROUNDS):
+            expected = legacy_last_attempt_accuracy(exam_data["questions"])
+    with Timer() as indexed:
+        for _ in range(ROUNDS):
+            actual = index_last_attempt_accuracy(exam_data)
+    assert abs(expected - actual) < 1e-9
+
+    print(f"时间窗口推断    : {legacy.elapsed / ROUNDS:8.3f} ms/次")
+    print(f"会话索引        : {indexed.elapsed / ROUNDS * 1000:8.3f} µs/次")
+    print("-" * 50)
+    print(f"加速比: {legacy.elapsed / indexed.elapsed:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
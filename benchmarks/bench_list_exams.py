@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+试卷列表基准测试
+模拟打开 ExamListWindow 时的 QuestionManager.list_exams 调用：
+1. 无元数据旁路文件：每个试卷执行一次 PBKDF2 并完整解密解析
+2. 有元数据旁路文件：每个试卷只读取一个很小的签名 JSON
+3. 有试卷目录缓存：整个目录只读取一个 .catalog 文件，每个试卷只需一次 stat
+
+用法: python benchmarks/bench_list_exams.py [试卷数量]
+"""
+
+import os
+import sys
+import tempfile
+
+from bench_common import make_exam, Timer
+
+from core.data_encryptor import encryptor, clear_key_cache
+from core.exam_catalog import CATALOG_FILENAME
+from core.exam_metadata import META_SUFFIX
+from core.question_manager import QuestionManager
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    print(f"试卷数量: {count}")
+    print("-" * 50)
+
+    with tempfile.TemporaryDirectory() as exams_dir:
+        for i in range(count):
+            exam_id = f"exam_{i + 1:03d}"
+            with open(os.path.join(exams_dir, f"{exam_id}.json.enc"), 'w', encoding='utf-8') as f:
+                f.write(encryptor.encrypt_data(make_exam(exam_id, 40)))
+
+        manager = QuestionManager(exams_dir)
+
+        # 1. 冷启动：没有旁路文件，列表过程中会顺带生成
+        clear_key_cache()
+        with Timer() as cold:
+            exams = manager.list_exams()
+        sidecars = sum(1 for name in os.listdir(exams_dir) if name.endswith(META_SUFFIX))
+        print(f"无旁路文件（完整解密）: {cold.elapsed:9.1f} ms  ({len(exams)} 份试卷，生成 {sidecars} 个旁路文件)")
+
+        # 2. 有旁路文件：删除目录缓存并清空密钥缓存，确认列表过程不再依赖 PBKDF2
+        os.remove(os.path.join(exams_dir, CATALOG_FILENAME))
+        manager = QuestionManager(exams_dir)
+        clear_key_cache()
+        with Timer() as warm:
+            exams = manager.list_exams()
+        print(f"读取旁路文件          : {warm.elapsed:9.1f} ms  ({len(exams)} 份试卷)")
+
+        # 3. 有目录缓存：模拟重新启动程序，只加载一次 .catalog
+        manager = QuestionManager(exams_dir)
+        with Timer() as cached:
+            exams = manager.list_exams()
+        print(f"读取目录缓存          : {cached.elapsed:9.1f} ms  ({len(exams)} 份试卷)")
+
+    print("-" * 50)
+    print(f"加速比（旁路文件）: {cold.elapsed / max(warm.elapsed, 1e-6):.0f}x")
+    print(f"加速比（目录缓存）: {cold.elapsed / max(cached.elapsed, 1e-6):.0f}x")
+
+
+if __name__ == "__main__":
+    main()
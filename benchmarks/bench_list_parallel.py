@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+并行列出试卷基准测试
+在没有目录缓存和元数据旁路文件的情况下（首次启动/试卷全部更新后），
+比较 QuestionManager.list_exams 在不同并行数、线程池/进程池下的耗时
+
+用法: python benchmarks/bench_list_parallel.py [试卷数量] [每份试卷题目数]
+"""
+
+import os
+import sys
+import tempfile
+
+from bench_common import make_exam, Timer
+
+from core.data_encryptor import encryptor, clear_key_cache
+from core.exam_catalog import CATALOG_FILENAME
+from core.exam_metadata import META_SUFFIX
+from core.question_manager import QuestionManager, LIST_EXECUTOR_THREAD, LIST_EXECUTOR_PROCESS
+
+
+def reset_caches(exams_dir: str):
+    """删除目录缓存、旁路文件并清空密钥缓存，保证每轮都是完整解密"""
+    for name in os.listdir(exams_dir):
+        if name == CATALOG_FILENAME or name.endswith(META_SUFFIX):
+            os.remove(os.path.join(exams_dir, name))
+    clear_key_cache()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    question_count = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    cpus = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, 8, cpus} & set(range(1, cpus + 1)))
+    print(f"试卷数量: {count}，每份 {question_count} 题，CPU 核数: {cpus}")
+    print("-" * 60)
+
+    with tempfile.TemporaryDirectory() as exams_dir:
+        for i in range(count):
+            exam_id = f"exam_{i + 1:03d}"
+            # 每份试卷使用独立的随机盐值，模拟最坏情况：每个文件都需要一次 PBKDF2
+            with open(os.path.join(exams_dir, f"{exam_id}.json.enc"), 'w', encoding='utf-8') as f:
+                f.write(encryptor.encrypt_data(make_exam(exam_id, question_count)))
+
+        baseline = None
+        for executor in (LIST_EXECUTOR_THREAD, LIST_EXECUTOR_PROCESS):
+            for workers in worker_counts:
+                reset_caches(exams_dir)
+                manager = QuestionManager(exams_dir, list_workers=workers, list_executor=executor)
+                with Timer() as t:
+                    exams = manager.list_exams()
+                if baseline is None:
+                    baseline = t.elapsed
+                print(f"{executor:7s} x{workers:<2d}: {t.elapsed:9.1f} ms  "
+                      f"({len(exams)} 份试卷，加速比 {baseline / t.elapsed:4.1f}x)")
+
+    print("-" * 60)
+    print("基准为串行（thread x1）；进程池包含启动工作进程的开销")
+
+
+if __name__ == "__main__":
+    main()
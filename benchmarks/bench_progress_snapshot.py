@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进度快照读写基准测试
+以合成的大进度文件（默认约 50 MB，按原格式计算）比较快照的保存和加载:
+1. 原实现：标准库 json，indent=2
+2. 紧凑 JSON（标准库）
+3. 紧凑 JSON（orjson，需要安装 orjson）
+4. msgpack（需要安装 msgpack）
+5. gzip 归档（默认序列化方式 + gzip）
+
+用法: python benchmarks/bench_progress_snapshot.py [原格式文件大小MB]
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+from bench_common import Timer
+
+from core.progress_codec import (JsonSerializer, MsgpackSerializer, ORJSON_AVAILABLE, MSGPACK_AVAILABLE,
+                                 get_serializer, read_snapshot, write_snapshot)
+from core.progress_events import new_progress_data
+
+# 原格式下每条答题记录大约占用的字节数（用于估算需要生成的记录数）
+BYTES_PER_RECORD = 230
+QUESTIONS_PER_EXAM = 100
+
+
+def make_progress(target_mb: float) -> dict:
+    """生成答题记录总量约为 target_mb（原格式）的进度数据"""
+    record_count = int(target_mb * 1024 * 1024 / BYTES_PER_RECORD)
+    history_per_question = 50
+    question_count = max(1, record_count // history_per_question)
+    progress_data = new_progress_data()
+    for q in range(question_count):
+        exam = progress_data["exams"].setdefault(f"exam_{q // QUESTIONS_PER_EXAM:04d}", {
+            "total_attempts": 0, "correct_attempts": 0, "questions": {}, "last_attempt": None,
+            "best_score": 0, "total_questions": QUESTIONS_PER_EXAM, "last_correct_count": 0
+        })
+        history = [{
+            "timestamp": f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}T10:{i % 60:02d}:00.123456",
+            "correct": (q + i) % 3 != 0,
+            "user_answer": ["chmod 755 文件名"],
+            "session_id": f"session_{i:05d}"
+        } for i in range(history_per_question)]
+        correct = sum(1 for record in history if record["correct"])
+        exam["questions"][f"q{q % QUESTIONS_PER_EXAM + 1}"] = {
+            "attempts": history_per_question, "correct": correct,
+            "last_attempt": history[-1]["timestamp"], "last_correct": history[-1]["correct"],
+            "history": history
+        }
+        exam["total_attempts"] += history_per_question
+        exam["correct_attempts"] += correct
+    return progress_data
+
+
+def legacy_save(path: str, progress_data: dict) -> None:
+    """原 _save_progress_data 的写入方式（作为对照基线）"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(progress_data, f, ensure_ascii=False, indent=2)
+
+
+def legacy_load(path: str) -> dict:
+    """原 _load_progress_data 的读取方式（作为对照基线）"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    target_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 50
+    progress_data = make_progress(target_mb)
+
+    variants = [("紧凑 JSON（标准库）", JsonSerializer(use_orjson=False), False)]
+    if ORJSON_AVAILABLE:
+        variants.append(("紧凑 JSON（orjson）", JsonSerializer(use_orjson=True), False))
+    if MSGPACK_AVAILABLE:
+        variants.append(("msgpack", MsgpackSerializer(), False))
+    variants.append(("gzip 归档", get_serializer(), True))
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        legacy_file = os.path.join(data_dir, "legacy_progress.json")
+        with Timer() as legacy_write:
+            legacy_save(legacy_file, progress_data)
+        with Timer() as legacy_read:
+            expected = legacy_load(legacy_file)
+        legacy_size = os.path.getsize(legacy_file)
+
+        # 新的读取函数同样能读取旧格式文件
+        assert read_snapshot(legacy_file) == expected
+
+        results = []
+        for name, serializer, compress in variants:
+            path = os.path.join(data_dir, f"progress_{len(results)}.snapshot")
+            with Timer() as write:
+                write_snapshot(path, progress_data, serializer, compress)
+            with Timer() as read:
+                loaded = read_snapshot(path)
+            assert loaded == expected
+            results.append((name, write.elapsed, read.elapsed, os.path.getsize(path)))
+
+    print(f"进度数据: {sum(len(e['questions']) for e in expected['exams'].values())} 道题，"
+          f"原格式文件 {legacy_size / 1024 / 1024:.1f} MB")
+    print("-" * 64)
+    print(f"{'格式':<20}{'保存(ms)':>10}{'加载(ms)':>10}{'大小(MB)':>10}")
+    print(f"{'原实现 indent=2':<20}{legacy_write.elapsed:>10.0f}{legacy_read.elapsed:>10.0f}"
+          f"{legacy_size / 1024 / 1024:>10.1f}")
+    for name, write_ms, read_ms, size in results:
+        print(f"{name:<20}{write_ms:>10.0f}{read_ms:>10.0f}{size / 1024 / 1024:>10.1f}")
+    print("-" * 64)
+    name, write_ms, read_ms, _ = results[1] if ORJSON_AVAILABLE else results[0]
+    print(f"默认格式（{name}）加速比: 保存 {legacy_write.elapsed / write_ms:.1f}x，"
+          f"加载 {legacy_read.elapsed / read_ms:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+记录答题进度基准测试
+模拟交卷时逐题调用 UserProgressManager.record_answer：
+1. 原实现：每次答题都以 indent=2 整体重写 user_progress.json
+2. 快照 + 只追加日志：每次答题只追加一行事件
+3. SQLite 存储：每次答题在一个事务中插入一条记录
+4. 延迟合并写入（默认配置）：整次交卷的答题合并为一次日志写入
+
+用法: python benchmarks/bench_progress_write.py [已有答题记录数] [本次交卷题数]
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+from bench_common import Timer
+
+from core.user_progress_manager import UserProgressManager, STORAGE_SQLITE
+
+
+def make_progress(manager: UserProgressManager, record_count: int) -> None:
+    """生成已有的答题历史（分布在 10 份试卷、每份 100 题中）"""
+    for i in range(record_count):
+        manager.record_answer(f"exam_{i % 10:02d}", f"q{(i // 10) % 100}", i % 3 != 0, ["answer"],
+                              f"session_{i // 1000}")
+    manager.compact()
+
+
+def legacy_record_answer(progress_data: dict, progress_file: str, *args) -> None:
+    """原实现：修改内存数据后整体重写进度文件（作为对照基线）"""
+    progress_data["exams"].setdefault("bench", {"questions": {}})
+    progress_data["exams"]["bench"]["questions"][args[1]] = {"history": [list(args)]}
+    with open(progress_file, 'w', encoding='utf-8') as f:
+        json.dump(progress_data, f, ensure_ascii=False, indent=2)
+
+
+def main():
+    record_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    answer_count = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        manager = UserProgressManager(data_dir, write_delay=0)
+        make_progress(manager, record_count)
+        size = os.path.getsize(manager.progress_file)
+        print(f"已有答题记录: {record_count}（进度文件 {size / 1024 / 1024:.1f} MB），本次交卷 {answer_count} 题")
+        print("-" * 50)
+
+        legacy_data = json.loads(json.dumps(manager.progress_data))
+        legacy_file = os.path.join(data_dir, "legacy_progress.json")
+        with Timer() as legacy:
+            for i in range(answer_count):
+                legacy_record_answer(legacy_data, legacy_file, "bench", f"q{i}", True, ["answer"], "session_bench")
+
+        with Timer() as journal:
+            for i in range(answer_count):
+                manager.record_answer("bench", f"q{i}", True, ["answer"], "session_bench")
+
+        with Timer() as reload:
+            reloaded = UserProgressManager(data_dir)
+        assert reloaded.progress_data["exams"] == manager.progress_data["exams"]
+        manager.close()
+        reloaded.close()
+
+        deferred_manager = UserProgressManager(data_dir)
+        with Timer() as deferred:
+            for i in range(answer_count):
+                deferred_manager.record_answer("bench", f"q{i}", False, ["answer"], "session_bench")
+            deferred_manager.flush()
+        deferred_manager.close()
+        deferred_reloaded = UserProgressManager(data_dir)
+        assert deferred_reloaded.progress_data["exams"] == deferred_manager.progress_data["exams"]
+        deferred_reloaded.close()
+
+        with tempfile.TemporaryDirectory() as db_dir:
+            sqlite_manager = UserProgressManager(db_dir, storage=STORAGE_SQLITE, write_delay=0)
+            sqlite_manager.progress_data = legacy_data
+            legacy_data["exams"].pop("bench")
+            sqlite_manager.compact()
+            with Timer() as sqlite:
+                for i in range(answer_count):
+                    sqlite_manager.record_answer("bench", f"q{i}", True, ["answer"], "session_bench")
+            with Timer() as sqlite_reload:
+                UserProgressManager(db_dir, storage=STORAGE_SQLITE).close()
+            sqlite_manager.close()
+
+    print(f"整体重写        : {legacy.elapsed:9.1f} ms  ({legacy.elapsed / answer_count:.2f} ms/题)")
+    print(f"追加日志        : {journal.elapsed:9.1f} ms  ({journal.elapsed / answer_count:.3f} ms/题)")
+    print(f"SQLite          : {sqlite.elapsed:9.1f} ms  ({sqlite.elapsed / answer_count:.3f} ms/题)")
+    print(f"延迟合并写入    : {deferred.elapsed:9.1f} ms  ({deferred.elapsed / answer_count:.3f} ms/题)")
+    print(f"启动（快照+回放）: {reload.elapsed:9.1f} ms")
+    print(f"启动（SQLite）  : {sqlite_reload.elapsed:9.1f} ms")
+    print("-" * 50)
+    print(f"加速比: {legacy.elapsed / journal.elapsed:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
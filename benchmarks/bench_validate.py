@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+试卷格式校验基准测试
+1. 编译后的校验器对一份大型合成试卷（默认 5000 题）的单次完整校验耗时
+2. 一次遍历收集全部错误：随机破坏部分题目后的校验耗时与错误数量
+3. QuestionManager.load_exam：普通模式与可信模式（内容哈希已校验过则跳过校验）的对比
+
+用法: python benchmarks/bench_validate.py [题目数量]
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+
+from bench_common import make_exam, Timer
+
+from core.exam_schema import validator
+from core.question_manager import QuestionManager
+
+ROUNDS = 20
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    exam = make_exam("exam_validate", count)
+    print(f"题目数量: {count}")
+    print("-" * 50)
+
+    # 1. 完整校验
+    with Timer() as t:
+        for _ in range(ROUNDS):
+            validator.validate_exam(exam)
+    print(f"完整校验（通过）    : {t.elapsed / ROUNDS:8.2f} ms")
+
+    # 2. 破坏 1% 的题目，一次遍历收集全部错误
+    broken = json.loads(json.dumps(exam))
+    random.seed(0)
+    for question in random.sample(broken["questions"], max(1, count // 100)):
+        question.pop("id")
+        if "items" in question:
+            question["items"][0].pop("answer")
+    with Timer() as t:
+        for _ in range(ROUNDS):
+            errors = validator.exam_errors(broken)
+    print(f"完整校验（含错误）  : {t.elapsed / ROUNDS:8.2f} ms  (收集到 {len(errors)} 处错误)")
+
+    # 3. 加载试卷：普通模式与可信模式
+    with tempfile.TemporaryDirectory() as exams_dir:
+        with open(os.path.join(exams_dir, "exam_validate.json"), 'w', encoding='utf-8') as f:
+            json.dump(exam, f, ensure_ascii=False)
+
+        # 关闭内存缓存，只比较读取 + 校验的开销
+        manager = QuestionManager(exams_dir, cache_entries=0, trust_validated=False)
+        with Timer() as untrusted:
+            for _ in range(ROUNDS):
+                manager.load_exam("exam_validate")
+
+        manager = QuestionManager(exams_dir, cache_entries=0, trust_validated=True)
+        manager.load_exam("exam_validate")  # 首次加载：校验并记录到目录缓存
+        with Timer() as trusted:
+            for _ in range(ROUNDS):
+                manager.load_exam("exam_validate")
+
+    print(f"load_exam 普通模式  : {untrusted.elapsed / ROUNDS:8.2f} ms")
+    print(f"load_exam 可信模式  : {trusted.elapsed / ROUNDS:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
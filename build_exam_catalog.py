@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+试卷目录缓存预热脚本
+发布或批量更新试卷后运行，提前生成 data/exams/.catalog，使程序首次打开试卷列表时无需解密试卷
+
+用法:
+    python build_exam_catalog.py              # 增量更新（只处理变化的文件）
+    python build_exam_catalog.py --rebuild    # 丢弃现有缓存并全部重建
+    python build_exam_catalog.py --dir 路径   # 指定试卷目录
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# 确保可以找到 core 文件夹
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(project_root)
+
+try:
+    from core.question_manager import QuestionManager
+except ImportError as e:
+    print(f"错误: 无法导入试卷管理模块，请检查目录结构。{e}")
+    sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成或重建试卷目录缓存")
+    parser.add_argument('--dir', default=os.path.join(project_root, "data", "exams"),
+                        help="试卷目录（默认 data/exams）")
+    parser.add_argument('--rebuild', action='store_true', help="丢弃现有缓存并全部重建")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.dir):
+        print(f"试卷目录不存在: {args.dir}")
+        return 1
+
+    manager = QuestionManager(args.dir)
+    start = time.perf_counter()
+    exams = manager.rebuild_catalog() if args.rebuild else manager.list_exams()
+    elapsed = (time.perf_counter() - start) * 1000
+
+    for exam in exams:
+        print(f"  {exam['id']}: {exam['name']} ({exam['total_questions']} 题)")
+    print(f"\n共 {len(exams)} 份试卷，耗时 {elapsed:.1f} ms")
+    print(f"缓存文件: {manager.catalog.catalog_file}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
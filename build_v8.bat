@@ -52,6 +52,28 @@ if exist "dist\staging\data\user_progress.json" (
     del "dist\staging\data\user_progress.json"
     echo   - 已排除: user_progress.json
 )
+if exist "dist\staging\data\user_progress.journal" (
+    del "dist\staging\data\user_progress.journal"
+    echo   - 已排除: user_progress.journal
+)
+if exist "dist\staging\data\*.tmp" (
+    del /S /Q "dist\staging\data\*.tmp" >nul
+    echo   - 已排除: *.tmp 临时文件
+)
+for %%F in (user_progress.db user_progress.db-wal user_progress.db-shm) do (
+    if exist "dist\staging\data\%%F" (
+        del "dist\staging\data\%%F"
+        echo   - 已排除: %%F
+    )
+)
+if exist "dist\staging\data\*.migrated" (
+    del /Q "dist\staging\data\*.migrated"
+    echo   - 已排除: *.migrated 迁移备份
+)
+if exist "dist\staging\data\user_progress.lock" (
+    del "dist\staging\data\user_progress.lock"
+    echo   - 已排除: user_progress.lock
+)
 
 REM 2. 删除激活记录 (建议排除，让用户重新激活)
 if exist "dist\staging\data\activations.json" (
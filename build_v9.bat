@@ -58,6 +58,13 @@ REM ========================================================
 echo 正在清理敏感用户数据...
 if exist "dist\staging\data\questions.json" del "dist\staging\data\questions.json"
 if exist "dist\staging\data\user_progress.json" del "dist\staging\data\user_progress.json"
+if exist "dist\staging\data\user_progress.journal" del "dist\staging\data\user_progress.journal"
+if exist "dist\staging\data\*.tmp" del /S /Q "dist\staging\data\*.tmp" >nul
+if exist "dist\staging\data\user_progress.db" del "dist\staging\data\user_progress.db"
+if exist "dist\staging\data\user_progress.db-wal" del "dist\staging\data\user_progress.db-wal"
+if exist "dist\staging\data\user_progress.db-shm" del "dist\staging\data\user_progress.db-shm"
+if exist "dist\staging\data\*.migrated" del /Q "dist\staging\data\*.migrated"
+if exist "dist\staging\data\user_progress.lock" del "dist\staging\data\user_progress.lock"
 if exist "dist\staging\data\user_progress.dat" del "dist\staging\data\user_progress.dat"
 if exist "dist\staging\data\activations.json" del "dist\staging\data\activations.json"
 if exist "dist\staging\data\user_stats.json" del "dist\staging\data\user_stats.json"
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+用户进度压缩脚本
+按保留策略截断每道题的答题历史和每份试卷的会话记录（更早的记录汇总为计数），重写进度文件并报告节省的空间
+
+用法:
+    python compact_progress.py                # 使用默认保留策略（每题保留最近 50 条记录，每份试卷保留最近 200 次会话）
+    python compact_progress.py --keep 20      # 每道题只保留最近 20 条记录
+    python compact_progress.py --keep-sessions 50   # 每份试卷只保留最近 50 次会话
+    python compact_progress.py --dir 路径     # 指定数据目录
+    python compact_progress.py --archive 备份.json.gz   # 压缩前先导出 gzip 归档备份
+    python compact_progress.py --serializer msgpack     # 快照改用 msgpack 格式（需要安装 msgpack）
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# 确保可以找到 core 文件夹
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(project_root)
+
+try:
+    from core.user_progress_manager import UserProgressManager, DEFAULT_HISTORY_LIMIT, DEFAULT_SESSION_LIMIT
+    from core.progress_codec import SERIALIZERS
+except ImportError as e:
+    print(f"错误: 无法导入进度管理模块，请检查目录结构。{e}")
+    sys.exit(1)
+
+
+def format_size(size: int) -> str:
+    """字节数转为易读的形式"""
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按保留策略压缩用户进度数据")
+    parser.add_argument('--dir', default=os.path.join(project_root, "data"), help="数据目录（默认 data）")
+    parser.add_argument('--keep', type=int, default=DEFAULT_HISTORY_LIMIT,
+                        help=f"每道题保留的最近答题记录数（默认 {DEFAULT_HISTORY_LIMIT}）")
+    parser.add_argument('--keep-sessions', type=int, default=DEFAULT_SESSION_LIMIT,
+                        help=f"每份试卷保留的最近会话数（默认 {DEFAULT_SESSION_LIMIT}）")
+    parser.add_argument('--archive', help="压缩前把全部进度导出为 gzip 归档（可直接作为 user_progress.json 恢复）")
+    parser.add_argument('--serializer', choices=sorted(SERIALIZERS), default=None,
+                        help="JSON 存储的快照序列化方式（默认 json）")
+    args = parser.parse_args()
+    if args.keep < 0:
+        print("--keep 不能为负数")
+        return 1
+    if args.keep_sessions < 0:
+        print("--keep-sessions 不能为负数")
+        return 1
+
+    manager = UserProgressManager(args.dir, history_limit=args.keep, serializer=args.serializer,
+                                  session_limit=args.keep_sessions)
+    if args.archive:
+        if not manager.export_archive(args.archive):
+            manager.close()
+            return 1
+        print(f"已导出归档: {args.archive} ({format_size(os.path.getsize(args.archive))})")
+    before = manager.storage_size()
+    start = time.perf_counter()
+    removed = manager.apply_retention()
+    # 即使没有可截断的记录也重写一次：JSON 存储合并日志，SQLite 存储回收空间
+    manager.compact()
+    manager.store.vacuum()
+    elapsed = (time.perf_counter() - start) * 1000
+    after = manager.storage_size()
+    manager.close()
+
+    saved = before - after
+    print(f"存储方式: {manager.storage}，每道题保留最近 {args.keep} 条记录，每份试卷保留最近 {args.keep_sessions} 次会话")
+    print(f"汇总并移除 {removed} 条旧答题和会话记录，耗时 {elapsed:.1f} ms")
+    print(f"压缩前: {format_size(before)}  压缩后: {format_size(after)}  "
+          f"节省: {format_size(max(saved, 0))} ({saved / before * 100 if before else 0:.1f}%)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
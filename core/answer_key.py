@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+预编译答案 - 判题时不再重复整理和规范化正确答案
+
+每道题在加载时编译为一个紧凑的 AnswerKey：每个空可接受答案的规范形式集合、每个空的分值元组以及题型标记。
+判题时只需把用户答案规范化一次，再在集合中做一次哈希查找，与可接受答案的数量无关。
+
+规范化由可插拔的步骤流水线完成（AnswerNormalizer）。默认流水线（DEFAULT_PIPELINE）只有 lower，
+与原有的 strip().lower() 精确匹配完全相同；以下步骤需要显式启用（如 FUZZY_PIPELINE）。
+可以按题型使用不同的流水线（AnswerKeyTable 的 type_normalizers）：全局共享的试题管理器对需要手动输入答案的题型
+（TEXT_INPUT_TYPES）使用 FUZZY_PIPELINE，单选题仍按原规则判定:
+    nfkc                 Unicode NFKC 规范化（全角字母数字、全角空格、全角符号折叠为半角）
+    collapse_whitespace  连续空白折叠为一个空格并去除首尾空白（"ls  -l" 与 "ls -l" 等价）
+    strip_quotes         去掉整体包裹答案的引号（"'/etc/passwd'" 与 "/etc/passwd" 等价），不会把答案去成空串
+    lower                转为小写
+
+题目可以为答案提供别名（同样会被规范化后加入可接受集合）:
+    单选题/填空题: 题目的 aliases 字段，与 answer 按下标对应，每项为字符串或字符串列表
+    综合题/完形填空组: item 的 aliases 字段，字符串列表（item 的 answer 为列表时，与之按下标对应的列表的列表）
+"""
+
+import threading
+import unicodedata
+from typing import Any, Callable, Dict, FrozenSet, List, Sequence, Tuple, Union
+
+# 按空判分的题型（答案和分值在 items 中）
+ITEM_SCORED_TYPES = ('cloze_group', 'comprehensive')
+
+# 缓存的答案数量上限（超过时淘汰最早编译的题目）
+ANSWER_KEY_CACHE_SIZE = 20000
+
+
+def normalize_answer(answer: Any) -> str:
+    """答案规范化：去除首尾空格并转为小写（原有的精确匹配规则，对应 LEGACY_PIPELINE）"""
+    return str(answer).strip().lower()
+
+
+# 成对的包裹引号（NFKC 之后全角引号已折叠为半角，中文引号仍需单独列出）
+_QUOTE_PAIRS = {'"': '"', "'": "'", '`': '`', '“': '”', '‘': '’'}
+
+
+def _nfkc(text: str) -> str:
+    # 纯 ASCII 文本的 NFKC 结果不变，跳过以加快常见的命令类答案
+    return text if text.isascii() else unicodedata.normalize('NFKC', text)
+
+
+def _collapse_whitespace(text: str) -> str:
+    return ' '.join(text.split())
+
+
+def _strip_quotes(text: str) -> str:
+    # 逐层去掉包裹的引号直到没有为止（保证幂等）；去掉后为空的（如 "''"）保持原样，空答案不能与引号答案等价
+    while len(text) >= 2 and _QUOTE_PAIRS.get(text[0]) == text[-1]:
+        inner = text[1:-1].strip()
+        if not inner:
+            break
+        text = inner
+    return text
+
+
+# 可用的规范化步骤，可通过 register_normalizer 扩展
+NORMALIZERS: Dict[str, Callable[[str], str]] = {
+    'strip': str.strip,
+    'lower': str.lower,
+    'casefold': str.casefold,
+    'nfkc': _nfkc,
+    'collapse_whitespace': _collapse_whitespace,
+    'strip_quotes': _strip_quotes,
+}
+
+# 默认规则：与原 strip().lower() 精确匹配完全相同
+DEFAULT_PIPELINE = ('lower',)
+LEGACY_PIPELINE = DEFAULT_PIPELINE
+# 可选的宽松规则：折叠全半角和多余空白（包裹引号需要再显式加入 strip_quotes）
+FUZZY_PIPELINE = ('nfkc', 'collapse_whitespace', 'lower')
+
+
+def register_normalizer(name: str, func: Callable[[str], str]) -> None:
+    """注册自定义规范化步骤（函数接收并返回字符串），之后可在流水线中按名称引用"""
+    NORMALIZERS[name] = func
+
+
+class AnswerNormalizer:
+    """
+    答案规范化流水线
+
+    先转为字符串并去除首尾空白，再依次执行各步骤。
+    各步骤应保证幂等（对规范形式再次规范化结果不变），正确答案与用户答案使用同一条流水线。
+    """
+
+    def __init__(self, steps: Sequence[Union[str, Callable[[str], str]]] = DEFAULT_PIPELINE):
+        """
+        Args:
+            steps: 步骤名称（见 NORMALIZERS）或可调用对象组成的序列
+        """
+        funcs = []
+        for step in steps:
+            if callable(step):
+                funcs.append(step)
+            elif step in NORMALIZERS:
+                funcs.append(NORMALIZERS[step])
+            else:
+                raise ValueError(f"未知的答案规范化步骤: {step}")
+        self.steps = tuple(steps)
+        self._funcs = tuple(funcs)
+        # 判题时使用的规范化函数：与原规则相同的流水线直接使用 normalize_answer，省去逐步调用的开销
+        self.normalize = normalize_answer if self.steps == LEGACY_PIPELINE else self.__call__
+
+    def __call__(self, answer: Any) -> str:
+        text = str(answer).strip()
+        for func in self._funcs:
+            text = func(text)
+        return text
+
+    def accepted(self, answer: Any, aliases: Any = None) -> FrozenSet[str]:
+        """正确答案及其别名的规范形式集合"""
+        normalize = self.normalize
+        if aliases is None:
+            return frozenset((normalize(answer),))
+        forms = {normalize(answer)}
+        if isinstance(aliases, (list, tuple)):
+            forms.update(normalize(alias) for alias in aliases)
+        else:
+            forms.add(normalize(aliases))
+        return frozenset(forms)
+
+
+# 默认共享的规范化流水线
+default_normalizer = AnswerNormalizer()
+# 宽松规则的共享流水线
+fuzzy_normalizer = AnswerNormalizer(FUZZY_PIPELINE)
+
+# 需要手动输入答案的题型（全角、多余空白等输入差异常见），及对这些题型启用宽松规则的按题型流水线
+TEXT_INPUT_TYPES = ('fill_blank',) + ITEM_SCORED_TYPES
+TEXT_INPUT_NORMALIZERS: Dict[str, AnswerNormalizer] = {question_type: fuzzy_normalizer
+                                                       for question_type in TEXT_INPUT_TYPES}
+
+
+class AnswerKey:
+    """单道题的预编译答案"""
+
+    __slots__ = ('per_item', 'answers', 'scores', 'normalize')
+
+    def __init__(self, per_item: bool, answers: Tuple[FrozenSet[str], ...], scores: Tuple[Any, ...],
+                 normalize: Callable[[Any], str] = default_normalizer):
+        """
+        Args:
+            per_item: 是否按空判分（cloze_group/comprehensive）
+            answers: 每个空可接受答案的规范形式集合
+            scores: 每个空的分值（整体判分的题型为空元组）
+            normalize: 用户答案的规范化函数（须与编译正确答案时相同）
+        """
+        self.per_item = per_item
+        self.answers = answers
+        self.scores = scores
+        self.normalize = normalize
+
+    def check(self, user_answer: List[str]) -> Tuple[bool, List[bool], List[Any]]:
+        """
+        判定用户答案
+
+        Returns:
+            (整体是否正确, 每个空的正确性列表, 每个空的得分列表)；整体判分的题型后两项为空列表
+        """
+        # 用户答案与正确答案经过同一条流水线规范化后再比较
+        answers = self.answers
+        normalize = self.normalize
+        if not self.per_item:
+            # 整体答案匹配：数量不同时无需规范化即可判定
+            if len(user_answer) != len(answers):
+                return False, [], []
+            for user, accepted in zip(user_answer, answers):
+                if normalize(user) not in accepted:
+                    return False, [], []
+            return True, [], []
+
+        item_correctness = []
+        item_earned_scores = []
+        user_count = len(user_answer)
+        for i, accepted in enumerate(answers):
+            user = normalize(user_answer[i]) if i < user_count else ''
+            if not user:
+                # 用户没填写该空，不算对也不算错
+                item_correctness.append(False)
+                item_earned_scores.append(0)
+                continue
+            is_item_correct = user in accepted
+            # 用户填写了该空：正确得该空全部分值，否则得0分
+            item_correctness.append(is_item_correct)
+            item_earned_scores.append(self.scores[i] if is_item_correct else 0)
+
+        # 只要得了分就算部分正确
+        return sum(item_earned_scores) > 0, item_correctness, item_earned_scores
+
+
+def _alias_at(aliases: Any, index: int) -> Any:
+    """取与第 index 个答案对应的别名（格式不符时忽略）"""
+    if isinstance(aliases, list) and index < len(aliases):
+        return aliases[index]
+    return None
+
+
+def compile_answer_key(question: Dict[str, Any],
+                       normalizer: AnswerNormalizer = default_normalizer) -> AnswerKey:
+    """将题目编译为 AnswerKey"""
+    accepted = normalizer.accepted
+    if question.get('type', 'single_choice') not in ITEM_SCORED_TYPES:
+        # 单选题和填空题：直接从answer字段获取
+        aliases = question.get('aliases')
+        answers = tuple(accepted(ans, _alias_at(aliases, i)) for i, ans in enumerate(question.get('answer', [])))
+        return AnswerKey(False, answers, (), normalizer.normalize)
+
+    # 综合题和完形填空组：从items中提取答案和分值，列表形式的答案每个元素占一个空
+    answers = []
+    scores = []
+    for item in question.get('items', []):
+        item_answer = item.get('answer', '')
+        item_score = item.get('score', 1)
+        aliases = item.get('aliases')
+        if isinstance(item_answer, list):
+            answers.extend(accepted(ans, _alias_at(aliases, i)) for i, ans in enumerate(item_answer))
+            scores.extend([item_score] * len(item_answer))
+        else:
+            answers.append(accepted(item_answer, aliases))
+            scores.append(item_score)
+    return AnswerKey(True, tuple(answers), tuple(scores), normalizer.normalize)
+
+
+class AnswerKeyTable:
+    """
+    题目位置（试卷文件路径, 题目序号）到预编译答案的映射（线程安全）
+
+    只保存编译结果和题目 ID，不持有题目字典的引用，不影响已加载试卷缓存的内存上限；
+    取用时位置上的题目 ID 与记录不符则重新编译。试卷文件被重新读取时由调用方 invalidate。
+    超过容量时按编译顺序淘汰最早的记录（被淘汰的题目再次判题时重新编译）。
+    """
+
+    def __init__(self, max_entries: int = ANSWER_KEY_CACHE_SIZE,
+                 normalizer: AnswerNormalizer = default_normalizer,
+                 type_normalizers: Dict[str, AnswerNormalizer] = None):
+        """
+        Args:
+            max_entries: 最多缓存的题目数量
+            normalizer: 答案规范化流水线
+            type_normalizers: 按题型指定的流水线 {题型: 流水线}（未列出的题型使用 normalizer）
+        """
+        self.max_entries = max_entries
+        self.normalizer = normalizer
+        self.type_normalizers = dict(type_normalizers or {})
+        self._entries: Dict[Tuple[str, int], Tuple[Any, AnswerKey]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, question: Dict[str, Any], exam_path: str = None, index: int = None) -> AnswerKey:
+        """
+        获取题目的预编译答案
+
+        Args:
+            question: 题目数据
+            exam_path: 题目所属试卷文件路径（省略时直接编译，不缓存）
+            index: 题目在试卷中的序号
+        """
+        if exam_path is None or index is None:
+            return self.compile(question)
+        position = (exam_path, index)
+        question_id = question.get('id')
+        # 判题路径上只做一次字典查找（dict.get 在 GIL 下是原子操作，无需加锁）
+        entry = self._entries.get(position)
+        if entry is not None and entry[0] == question_id:
+            return entry[1]
+
+        answer_key = self.compile(question)
+        with self._lock:
+            self._entries.pop(position, None)
+            self._entries[position] = (question_id, answer_key)
+            while len(self._entries) > self.max_entries:
+                del self._entries[next(iter(self._entries))]
+        return answer_key
+
+    def compile(self, question: Dict[str, Any]) -> AnswerKey:
+        """按题型选用流水线编译题目（不缓存）"""
+        normalizer = self.normalizer
+        if self.type_normalizers:
+            normalizer = self.type_normalizers.get(question.get('type', 'single_choice'), normalizer)
+        return compile_answer_key(question, normalizer)
+
+    def compile_all(self, questions: List[Dict[str, Any]], exam_path: str) -> None:
+        """按试卷顺序预编译整卷题目的答案（位置上已有同一题目的记录时跳过）"""
+        for index, question in enumerate(questions):
+            self.get(question, exam_path, index)
+
+    def invalidate(self, exam_path: str) -> None:
+        """移除指定试卷的全部记录"""
+        with self._lock:
+            for position in [position for position in self._entries if position[0] == exam_path]:
+                del self._entries[position]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -4,21 +4,66 @@
 """
 数据加密模块 - 用于保护试卷数据
 使用 AES-256-CBC 加密算法，支持动态盐值与环境变量密钥管理
+
+支持两种存储格式：
+- 文本格式 (.json.enc): Base64(Salt[16B] + IV[16B] + CipherText[...])
+- 二进制容器 (.exb):    Header[8B] + Salt[16B] + IV[16B] + CipherText[...]
+  Header = Magic "QBEX"[4B] + 版本号[1B] + 标志位[1B] + 保留[2B]
+
+启用压缩时明文先经 zlib/lzma 压缩再加密，压缩算法记录在容器头的标志位中；
+文本格式启用压缩时保存为 Base64(二进制容器)，旧的无头格式仍可正常读取
 """
 
 import base64
+import binascii
+import codecs
 import json
+import lzma
 import os
 import hashlib
+import zlib
 import sys
+import threading
+from collections import OrderedDict
 from dotenv import load_dotenv
 from Crypto.Cipher import AES
 from Crypto.Util.Padding import pad, unpad
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, Iterator, List, Optional, Union
+from .json_stream import iter_json_events, write_json_events
 
 # 加载 .env 环境变量
 load_dotenv()
 
+# 派生密钥缓存的最大条目数（每个不同的盐值占用一个条目）
+KEY_CACHE_SIZE = 64
+
+# 进程级派生密钥缓存：(主密钥, 盐值) -> 派生密钥，仅保存在内存中
+_derived_key_cache: "OrderedDict[tuple, bytes]" = OrderedDict()
+_derived_key_cache_lock = threading.Lock()
+
+
+# 二进制容器格式常量
+CONTAINER_MAGIC = b'QBEX'
+CONTAINER_VERSION = 1
+CONTAINER_HEADER_SIZE = 8
+CONTAINER_PREFIX_SIZE = CONTAINER_HEADER_SIZE + 32  # Header + Salt + IV
+CONTAINER_EXTENSION = '.exb'
+
+# 容器头标志位：明文压缩算法
+FLAG_ZLIB = 0x01
+FLAG_LZMA = 0x02
+COMPRESSION_FLAGS = {'zlib': FLAG_ZLIB, 'lzma': FLAG_LZMA}
+
+# 流式解密时每次读取的块大小
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def clear_key_cache() -> None:
+    """清空进程级派生密钥缓存"""
+    with _derived_key_cache_lock:
+        _derived_key_cache.clear()
+
+
 class DataEncryptor:
     """数据加密器"""
 
@@ -33,20 +78,53 @@ class DataEncryptor:
         self.secret_key = master_key.encode('utf-8')
 
     def _generate_derived_key(self, salt: bytes) -> bytes:
-        """根据主密钥和动态盐值，通过 PBKDF2 派生出实际的 AES 密钥"""
-        return hashlib.pbkdf2_hmac(
+        """
+        根据主密钥和动态盐值，通过 PBKDF2 派生出实际的 AES 密钥
+        同一盐值的派生结果会进入进程级 LRU 缓存，避免重复执行 100000 次迭代
+        """
+        cache_key = (self.secret_key, bytes(salt))
+        with _derived_key_cache_lock:
+            derived_key = _derived_key_cache.get(cache_key)
+            if derived_key is not None:
+                _derived_key_cache.move_to_end(cache_key)
+                return derived_key
+
+        # PBKDF2 在锁外执行，hashlib 计算期间会释放 GIL
+        derived_key = hashlib.pbkdf2_hmac(
             'sha256',
             self.secret_key,
-            salt,
+            cache_key[1],
             100000,  # 迭代次数
             dklen=32  # 32字节长度对应 AES-256
         )
 
-    def encrypt_data(self, data: Union[Dict, List, str]) -> str:
+        with _derived_key_cache_lock:
+            _derived_key_cache[cache_key] = derived_key
+            _derived_key_cache.move_to_end(cache_key)
+            while len(_derived_key_cache) > KEY_CACHE_SIZE:
+                _derived_key_cache.popitem(last=False)
+        return derived_key
+
+    def clear_key_cache(self) -> None:
+        """清空派生密钥缓存（例如切换主密钥或退出前调用）"""
+        clear_key_cache()
+
+    def encrypt_data(self, data: Union[Dict, List, str], salt: bytes = None,
+                     compression: str = None) -> str:
         """
         加密数据 (动态盐值版)
         存储结构: Base64(Salt[16B] + IV[16B] + CipherText[...])
+        启用压缩时: Base64(Header[8B] + Salt[16B] + IV[16B] + CipherText[...])
+
+        Args:
+            data: 待加密数据
+            salt: 指定盐值（可选）。批量加密同一题库时可共用一个盐值，
+                  这样读取时整个题库只需派生一次密钥；IV 仍然每次随机生成
+            compression: 压缩算法（可选）: 'zlib' 或 'lzma'
         """
+        if compression:
+            return base64.b64encode(self.encrypt_container(data, salt, compression)).decode('utf-8')
+
         # 1. 序列化数据
         if isinstance(data, (dict, list)):
             json_str = json.dumps(data, ensure_ascii=False)
@@ -54,7 +132,10 @@ class DataEncryptor:
             json_str = str(data)
 
         # 2. 生成随机盐值和初始化向量
-        salt = os.urandom(16)
+        if salt is None:
+            salt = os.urandom(16)
+        elif len(salt) != 16:
+            raise ValueError("盐值长度必须为16字节")
         iv = os.urandom(16)
 
         # 3. 派生本次加密专用的密钥
@@ -68,6 +149,126 @@ class DataEncryptor:
         combined = salt + iv + encrypted_bytes
         return base64.b64encode(combined).decode('utf-8')
 
+    def encrypt_container(self, data: Union[Dict, List, str], salt: bytes = None,
+                          compression: str = None) -> bytes:
+        """
+        加密数据为二进制容器 (.exb)
+        存储结构: Header[8B] + Salt[16B] + IV[16B] + CipherText[...]，不做 Base64 编码
+
+        Args:
+            compression: 压缩算法（可选）: 'zlib' 或 'lzma'，写入容器头标志位
+        """
+        if compression and compression not in COMPRESSION_FLAGS:
+            raise ValueError(f"不支持的压缩算法: {compression}")
+
+        if isinstance(data, (dict, list)):
+            json_str = json.dumps(data, ensure_ascii=False)
+        else:
+            json_str = str(data)
+
+        plaintext = json_str.encode('utf-8')
+        flags = 0
+        if compression == 'zlib':
+            plaintext = zlib.compress(plaintext, 9)
+            flags = FLAG_ZLIB
+        elif compression == 'lzma':
+            plaintext = lzma.compress(plaintext)
+            flags = FLAG_LZMA
+
+        if salt is None:
+            salt = os.urandom(16)
+        elif len(salt) != 16:
+            raise ValueError("盐值长度必须为16字节")
+        iv = os.urandom(16)
+
+        cipher = AES.new(self._generate_derived_key(salt), AES.MODE_CBC, iv)
+        encrypted_bytes = cipher.encrypt(pad(plaintext, AES.block_size))
+
+        header = CONTAINER_MAGIC + bytes([CONTAINER_VERSION, flags, 0, 0])
+        return header + salt + iv + encrypted_bytes
+
+    @staticmethod
+    def _parse_container_header(head) -> Optional[int]:
+        """解析容器头，合法时返回标志位，否则返回 None"""
+        if len(head) < CONTAINER_HEADER_SIZE or bytes(head[:4]) != CONTAINER_MAGIC:
+            return None
+        version, flags, reserved1, reserved2 = head[4], head[5], head[6], head[7]
+        if not 1 <= version <= CONTAINER_VERSION or reserved1 or reserved2:
+            return None
+        if flags & ~(FLAG_ZLIB | FLAG_LZMA) or flags == FLAG_ZLIB | FLAG_LZMA:
+            return None
+        return flags
+
+    @staticmethod
+    def _make_decompressor(flags: int):
+        """根据标志位创建增量解压器（未压缩时返回 None）"""
+        if flags & FLAG_ZLIB:
+            return zlib.decompressobj()
+        if flags & FLAG_LZMA:
+            return lzma.LZMADecompressor()
+        return None
+
+    def decrypt_container(self, buffer) -> Union[Dict, List, str]:
+        """
+        解密二进制容器
+        buffer 为可写缓冲区（如 bytearray）时原地解密，全程通过 memoryview 切片，不产生中间副本
+        """
+        view = memoryview(buffer)
+        flags = self._parse_container_header(view[:CONTAINER_HEADER_SIZE])
+        if flags is None or len(view) < CONTAINER_PREFIX_SIZE:
+            raise ValueError("非法的加密容器格式")
+
+        salt = bytes(view[CONTAINER_HEADER_SIZE:CONTAINER_HEADER_SIZE + 16])
+        iv = bytes(view[CONTAINER_HEADER_SIZE + 16:CONTAINER_PREFIX_SIZE])
+        body = view[CONTAINER_PREFIX_SIZE:]
+        if len(body) == 0 or len(body) % AES.block_size:
+            raise ValueError("加密数据长度不足")
+
+        cipher = AES.new(self._generate_derived_key(salt), AES.MODE_CBC, iv)
+        try:
+            if view.readonly:
+                body = memoryview(cipher.decrypt(body))
+            else:
+                cipher.decrypt(body, output=body)
+
+            # 手动去除 PKCS#7 填充，避免 unpad 复制整块明文
+            pad_len = body[-1]
+            if not 1 <= pad_len <= AES.block_size or any(b != pad_len for b in body[-pad_len:]):
+                raise ValueError("填充校验失败")
+            plaintext = body[:len(body) - pad_len]
+            if flags & FLAG_ZLIB:
+                plaintext = zlib.decompress(plaintext)
+            elif flags & FLAG_LZMA:
+                plaintext = lzma.decompress(plaintext)
+            json_str = str(plaintext, 'utf-8')
+        except Exception:
+            raise ValueError("解密失败：可能是密钥错误或数据被篡改")
+
+        try:
+            return json.loads(json_str)
+        except json.JSONDecodeError:
+            return json_str
+
+    def load_file(self, file_path: str) -> Union[Dict, List, str]:
+        """
+        读取并解密文件，自动识别二进制容器与 Base64 文本格式
+        二进制容器通过 readinto 读入预分配缓冲区后原地解密
+        """
+        with open(file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            buffer = bytearray(size)
+            view = memoryview(buffer)
+            read = 0
+            while read < size:
+                n = f.readinto(view[read:])
+                if not n:
+                    break
+                read += n
+
+        if buffer.startswith(CONTAINER_MAGIC):
+            return self.decrypt_container(view[:read])
+        return self.decrypt_data(str(view[:read], 'utf-8').strip())
+
     def decrypt_data(self, encrypted_b64: str) -> Union[Dict, List, str]:
         """
         解密数据
@@ -79,6 +280,10 @@ class DataEncryptor:
         except Exception:
             raise ValueError("非法的加密字符串格式")
 
+        # 带头的容器长度为 16n+8，旧格式（Salt + IV + 密文）长度为 16n，二者不会混淆
+        if len(combined) % AES.block_size == CONTAINER_HEADER_SIZE and combined.startswith(CONTAINER_MAGIC):
+            return self.decrypt_container(bytearray(combined))
+
         if len(combined) < 32:
             raise ValueError("加密数据长度不足")
 
@@ -104,18 +309,173 @@ class DataEncryptor:
         except json.JSONDecodeError:
             return json_str
 
-    def encrypt_file(self, input_file: str, output_file: str = None) -> str:
-        """加密文件并保存"""
+    def _iter_payload(self, f, chunk_size: int) -> Iterator[bytes]:
+        """
+        从已打开的文件中逐块读取加密载荷（[Header] + Salt + IV + 密文）
+        二进制容器直接按块读取，Base64 文本格式逐块解码
+        """
+        head = f.read(len(CONTAINER_MAGIC))
+        if head == CONTAINER_MAGIC:
+            yield head
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+        # Base64 文本：按4字符对齐逐块解码，跨块的余数留到下一块
+        carry = b''
+        chunk = head
+        while chunk:
+            data = carry + b''.join(chunk.split())
+            usable = len(data) - len(data) % 4
+            carry = data[usable:]
+            if usable:
+                try:
+                    yield base64.b64decode(data[:usable])
+                except binascii.Error:
+                    raise ValueError("非法的加密字符串格式")
+            chunk = f.read(chunk_size)
+        if carry:
+            raise ValueError("非法的加密字符串格式")
+
+    def iter_decrypt_file(self, file_path: str, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        流式解密文件，逐块产出明文字节
+        任意时刻只保留一个密文块和一个明文块，峰值内存与文件大小无关
+
+        Args:
+            file_path: 加密文件路径（.json.enc 或 .exb）
+            chunk_size: 每次读取的字节数
+        """
+        with open(file_path, 'rb') as f:
+            source = self._iter_payload(f, chunk_size)
+
+            # 1. 收集容器头（如有）和 Salt + IV
+            prefix = b''
+            for chunk in source:
+                prefix += chunk
+                if len(prefix) >= CONTAINER_PREFIX_SIZE:
+                    break
+
+            flags = self._parse_container_header(prefix[:CONTAINER_HEADER_SIZE])
+            if flags is not None and len(prefix) >= CONTAINER_PREFIX_SIZE:
+                prefix = prefix[CONTAINER_HEADER_SIZE:]
+            else:
+                flags = 0
+            if len(prefix) < 32:
+                raise ValueError("加密数据长度不足")
+
+            cipher = AES.new(self._generate_derived_key(prefix[:16]), AES.MODE_CBC, prefix[16:32])
+            decompressor = self._make_decompressor(flags)
+
+            # 2. 逐块解密（并解压），始终保留最后一个分组用于去除填充
+            pending = bytearray(prefix[32:])
+            for chunk in source:
+                pending += chunk
+                usable = len(pending) - len(pending) % AES.block_size - AES.block_size
+                if usable > 0:
+                    block = cipher.decrypt(bytes(pending[:usable]))
+                    del pending[:usable]
+                    yield decompressor.decompress(block) if decompressor else block
+
+            if not pending or len(pending) % AES.block_size:
+                raise ValueError("加密数据长度不足")
+            try:
+                tail = unpad(cipher.decrypt(bytes(pending)), AES.block_size)
+                if decompressor:
+                    if tail and decompressor.eof:
+                        raise ValueError("压缩数据之后存在多余内容")
+                    tail = decompressor.decompress(tail) if tail else b''
+                    if flags & FLAG_ZLIB:
+                        tail += decompressor.flush()
+                    if not decompressor.eof:
+                        raise ValueError("压缩数据不完整")
+            except (ValueError, zlib.error, lzma.LZMAError):
+                raise ValueError("解密失败：可能是密钥错误或数据被篡改")
+            if tail:
+                yield tail
+
+    def iter_decrypt_text(self, file_path: str, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[str]:
+        """流式解密文件，逐块产出 UTF-8 解码后的文本（正确处理跨块的多字节字符）"""
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        try:
+            for block in self.iter_decrypt_file(file_path, chunk_size):
+                text = decoder.decode(block)
+                if text:
+                    yield text
+            text = decoder.decode(b'', final=True)
+        except UnicodeDecodeError:
+            raise ValueError("解密失败：可能是密钥错误或数据被篡改")
+        if text:
+            yield text
+
+    def iter_exam_events(self, file_path: str, chunk_size: int = STREAM_CHUNK_SIZE):
+        """
+        流式解密并增量解析试卷文件
+        顶层字段以 ('field', key, value) 产出，questions 数组逐题以 ('item', 'questions', question) 产出
+        """
+        return iter_json_events(self.iter_decrypt_text(file_path, chunk_size))
+
+    def decrypt_file_stream(self, input_file: str, output_file: str) -> Dict[str, Any]:
+        """
+        流式解密文件并写出格式化 JSON，输出内容与 decrypt_file 的旧实现一致
+
+        Returns:
+            统计信息: {'output_file': 输出路径, 'questions': 题目数, 'chars': 明文字符数}
+        """
+        stats = {'output_file': output_file, 'questions': 0, 'chars': 0}
+
+        def counted(chunks):
+            for chunk in chunks:
+                stats['chars'] += len(chunk)
+                yield chunk
+
+        temp_file = output_file + '.tmp'
+        try:
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                events = iter_json_events(counted(self.iter_decrypt_text(input_file)))
+                stats['questions'] = write_json_events(events, f)
+        except ValueError:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+            # 顶层不是对象（例如列表或纯文本）时退回整体解密
+            decrypted_data = self.load_file(input_file)
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(decrypted_data, f, ensure_ascii=False, indent=2)
+            stats['chars'] = len(json.dumps(decrypted_data, ensure_ascii=False))
+            return stats
+
+        os.replace(temp_file, output_file)
+        return stats
+
+    def encrypt_file(self, input_file: str, output_file: str = None, salt: bytes = None,
+                     binary: bool = False, compression: str = None) -> str:
+        """
+        加密文件并保存（salt、compression 参数含义同 encrypt_data）
+
+        Args:
+            binary: 是否输出二进制容器 (.exb)；输出文件名以 .exb 结尾时自动启用
+        """
+        if output_file and output_file.endswith(CONTAINER_EXTENSION):
+            binary = True
         if not output_file:
-            output_file = input_file + '.enc'
+            if binary:
+                base = input_file[:-5] if input_file.endswith('.json') else input_file
+                output_file = base + CONTAINER_EXTENSION
+            else:
+                output_file = input_file + '.enc'
 
         with open(input_file, 'r', encoding='utf-8') as f:
             data = json.load(f)
 
-        encrypted_data = self.encrypt_data(data)
-
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(encrypted_data)
+        if binary:
+            with open(output_file, 'wb') as f:
+                f.write(self.encrypt_container(data, salt=salt, compression=compression))
+        else:
+            encrypted_data = self.encrypt_data(data, salt=salt, compression=compression)
+            with open(output_file, 'w', encoding='utf-8') as f:
+                f.write(encrypted_data)
 
         print(f"✅ 文件已加密: {os.path.basename(input_file)} -> {os.path.basename(output_file)}")
         return output_file
@@ -123,15 +483,14 @@ class DataEncryptor:
     def decrypt_file(self, input_file: str, output_file: str = None) -> str:
         """解密文件并还原 JSON"""
         if not output_file:
-            output_file = input_file[:-4] if input_file.endswith('.enc') else input_file + '.dec'
-
-        with open(input_file, 'r', encoding='utf-8') as f:
-            encrypted_data = f.read().strip()
-
-        decrypted_data = self.decrypt_data(encrypted_data)
+            if input_file.endswith('.enc'):
+                output_file = input_file[:-4]
+            elif input_file.endswith(CONTAINER_EXTENSION):
+                output_file = input_file[:-len(CONTAINER_EXTENSION)] + '.json'
+            else:
+                output_file = input_file + '.dec'
 
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(decrypted_data, f, ensure_ascii=False, indent=2)
+        self.decrypt_file_stream(input_file, output_file)
 
         print(f"🔓 文件已解密: {os.path.basename(input_file)} -> {os.path.basename(output_file)}")
         return output_file
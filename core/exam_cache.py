@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+已加载试卷的内存缓存 - 避免反复打开同一试卷时重复解密与校验
+
+按试卷文件路径缓存已校验的试卷数据，同时限制缓存的试卷数量和估算内存占用，
+超出任一上限时淘汰最久未使用的试卷；文件大小或修改时间变化时缓存自动失效。
+缓存中的对象不会直接交给调用方：普通试卷以 pickle 序列化后的字节保存，每次取出时反序列化出一份独立副本
+（比 copy.deepcopy 快数倍，字节数也可精确统计）；分段索引试卷保存共享索引的克隆，
+因此界面层给题目补充 question_number/metadata 等字段不会污染缓存。
+"""
+
+import os
+import pickle
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from .lazy_exam import LazyExam
+
+EXAM_CACHE_ENTRIES = 8
+EXAM_CACHE_BYTES = 64 * 1024 * 1024
+
+
+def estimate_size(obj: Any) -> int:
+    """粗略估算 JSON 类对象（dict/list/str/数字）的内存占用（字节），用于分段索引试卷的索引"""
+    size = 0
+    stack = [obj]
+    while stack:
+        value = stack.pop()
+        size += sys.getsizeof(value)
+        if isinstance(value, dict):
+            stack.extend(value.keys())
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return size
+
+
+class ExamCache:
+    """按数量和字节数限制的试卷 LRU 缓存（线程安全）"""
+
+    def __init__(self, max_entries: int = EXAM_CACHE_ENTRIES, max_bytes: int = EXAM_CACHE_BYTES):
+        """
+        Args:
+            max_entries: 最多缓存的试卷数量（0 表示禁用缓存）
+            max_bytes: 缓存试卷的估算内存总上限
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, exam_path: str, stat: os.stat_result) -> Optional[Any]:
+        """
+        取出缓存的试卷副本
+
+        Returns:
+            试卷副本（调用方可随意修改）；未缓存或文件已变化时返回 None
+        """
+        with self._lock:
+            entry = self._entries.get(exam_path)
+            if entry is None:
+                self.misses += 1
+                return None
+            size, mtime_ns, exam_data, nbytes = entry
+            if size != stat.st_size or mtime_ns != stat.st_mtime_ns:
+                # 文件已被修改，丢弃旧数据
+                del self._entries[exam_path]
+                self.total_bytes -= nbytes
+                self.misses += 1
+                return None
+            self._entries.move_to_end(exam_path)
+            self.hits += 1
+        if isinstance(exam_data, bytes):
+            return pickle.loads(exam_data)
+        return exam_data.clone()
+
+    def contains(self, exam_path: str, stat: os.stat_result) -> bool:
+        """试卷是否已缓存且文件未变化（不影响 LRU 顺序和命中统计）"""
+        with self._lock:
+            entry = self._entries.get(exam_path)
+            return entry is not None and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns
+
+    def put(self, exam_path: str, stat: os.stat_result, exam_data: Any) -> bool:
+        """
+        缓存已校验的试卷数据（缓存保存的是独立副本，调用方之后可以继续使用和修改 exam_data）
+
+        Returns:
+            是否已缓存（缓存被禁用或试卷超过字节上限时返回 False）
+        """
+        if self.max_entries <= 0:
+            return False
+        if isinstance(exam_data, LazyExam):
+            # 分段索引试卷只缓存索引，题目由每个副本按需解密
+            nbytes = estimate_size(exam_data.metadata) + estimate_size(exam_data.records)
+            exam_data = exam_data.clone()
+        else:
+            exam_data = pickle.dumps(exam_data, pickle.HIGHEST_PROTOCOL)
+            nbytes = len(exam_data)
+        if nbytes > self.max_bytes:
+            return False
+
+        with self._lock:
+            old = self._entries.pop(exam_path, None)
+            if old is not None:
+                self.total_bytes -= old[3]
+            self._entries[exam_path] = (stat.st_size, stat.st_mtime_ns, exam_data, nbytes)
+            self.total_bytes += nbytes
+            while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.total_bytes -= evicted[3]
+        return True
+
+    def invalidate(self, exam_path: str) -> None:
+        """移除指定试卷的缓存"""
+        with self._lock:
+            entry = self._entries.pop(exam_path, None)
+            if entry is not None:
+                self.total_bytes -= entry[3]
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        """缓存统计信息"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.total_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+试卷目录缓存 - 持久化保存试卷列表信息
+
+缓存文件默认位于试卷目录下的 .catalog，按文件名记录 大小 / 修改时间 / 内容哈希 / 列表信息，
+以及该内容是否已通过格式校验（可信模式下加载试卷时跳过重复校验）。
+刷新列表时只处理发生变化的文件：
+1. 大小与修改时间均未变化 -> 直接命中
+2. 修改时间变化但内容哈希相同（如复制、touch）-> 只更新时间戳
+3. 内容发生变化或新增文件 -> 重新读取试卷信息
+整个缓存文件带有 HMAC 签名，被篡改时自动丢弃重建。
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+from .exam_metadata import INFO_FIELDS, sign_record
+
+CATALOG_FILENAME = '.catalog'
+CATALOG_VERSION = 1
+
+
+def file_sha256(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """分块计算文件内容的 SHA-256"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExamCatalog:
+    """试卷目录缓存"""
+
+    def __init__(self, data_dir: str, filename: str = CATALOG_FILENAME):
+        """
+        Args:
+            data_dir: 试卷目录
+            filename: 缓存文件名
+        """
+        self.data_dir = data_dir
+        self.catalog_file = os.path.join(data_dir, filename)
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.entries: Dict[str, Dict[str, Any]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """加载缓存文件，不存在、版本不符或签名无效时返回空缓存"""
+        try:
+            with open(self.catalog_file, 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+        if not isinstance(record, dict) or record.get('version') != CATALOG_VERSION:
+            return {}
+        signature = record.pop('signature', '')
+        if not hmac.compare_digest(str(signature), sign_record(record)):
+            print("试卷目录缓存签名无效，已丢弃")
+            return {}
+        entries = record.get('entries')
+        return entries if isinstance(entries, dict) else {}
+
+    def save(self) -> bool:
+        """缓存有变化时写回磁盘（临时文件 + 原子替换）"""
+        with self._lock:
+            if not self._dirty:
+                return True
+            record = {'version': CATALOG_VERSION, 'entries': self.entries}
+            record['signature'] = sign_record(record)
+            temp_file = self.catalog_file + '.tmp'
+            try:
+                with open(temp_file, 'w', encoding='utf-8') as f:
+                    json.dump(record, f, ensure_ascii=False)
+                os.replace(temp_file, self.catalog_file)
+                self._dirty = False
+                return True
+            except OSError as e:
+                print(f"保存试卷目录缓存失败: {e}")
+                return False
+
+    def get(self, filename: str, stat: os.stat_result) -> Optional[Dict[str, Any]]:
+        """大小与修改时间都未变化时返回缓存的试卷信息"""
+        with self._lock:
+            entry = self.entries.get(filename)
+        if entry and entry.get('size') == stat.st_size and entry.get('mtime_ns') == stat.st_mtime_ns:
+            return entry.get('info')
+        return None
+
+    def get_by_hash(self, filename: str, stat: os.stat_result, sha256: str) -> Optional[Dict[str, Any]]:
+        """内容哈希未变化时返回缓存的试卷信息，并刷新记录的时间戳"""
+        with self._lock:
+            entry = self.entries.get(filename)
+            if not entry or entry.get('size') != stat.st_size or entry.get('sha256') != sha256:
+                return None
+            entry['mtime_ns'] = stat.st_mtime_ns
+            self._dirty = True
+            return entry.get('info')
+
+    def put(self, filename: str, stat: os.stat_result, sha256: str, info: Dict[str, Any]) -> None:
+        """写入或更新一个文件的缓存记录"""
+        with self._lock:
+            self.entries[filename] = {
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'sha256': sha256,
+                'info': {field: info.get(field) for field in INFO_FIELDS},
+            }
+            self._dirty = True
+
+    def is_validated(self, filename: str, stat: os.stat_result, schema_version: int) -> bool:
+        """文件未变化且已按指定版本的格式定义校验通过"""
+        with self._lock:
+            entry = self.entries.get(filename)
+            return (entry is not None and entry.get('size') == stat.st_size
+                    and entry.get('mtime_ns') == stat.st_mtime_ns
+                    and entry.get('validated') == schema_version)
+
+    def mark_validated(self, filename: str, stat: os.stat_result, schema_version: int) -> bool:
+        """
+        记录文件已校验通过
+
+        Returns:
+            是否记录成功（文件没有缓存记录或记录已过期时返回 False，由调用方先 put）
+        """
+        with self._lock:
+            entry = self.entries.get(filename)
+            if entry is None or entry.get('size') != stat.st_size or entry.get('mtime_ns') != stat.st_mtime_ns:
+                return False
+            if entry.get('validated') != schema_version:
+                entry['validated'] = schema_version
+                self._dirty = True
+            return True
+
+    def prune(self, existing: Iterable[str]) -> None:
+        """删除已不存在的文件对应的缓存记录"""
+        existing = set(existing)
+        with self._lock:
+            for filename in [name for name in self.entries if name not in existing]:
+                del self.entries[filename]
+                self._dirty = True
+
+    def clear(self) -> None:
+        """清空所有缓存记录"""
+        with self._lock:
+            if self.entries:
+                self.entries = {}
+                self._dirty = True
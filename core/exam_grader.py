@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+整卷批量判分 - 交卷和答题进度弹窗共用同一份判分结果
+
+判分以"空"为单位：单选题/填空题每题一个空，综合题/完形填空组每个 item 一个空。
+逐题比较答案（使用预编译答案）后，把所有空的分值、作答掩码、正确掩码、得分汇总成数组，
+总分、得分、正确数、作答数以及按题型的统计均由数组运算一次求出。
+安装了 NumPy 时使用向量化计算，否则退化为等价的纯 Python 实现。
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# 尝试导入numpy，如果不可用则使用纯 Python 汇总
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+from .answer_key import AnswerKeyTable
+
+# 题型编码（数组中以下标表示题型）
+QUESTION_TYPES = ('single_choice', 'fill_blank', 'comprehensive', 'cloze_group')
+_TYPE_CODES = {name: code for code, name in enumerate(QUESTION_TYPES)}
+
+# 单选题/填空题未设置分值时的默认分值（与原交卷逻辑一致）
+DEFAULT_QUESTION_SCORE = 5
+
+
+def _as_number(value) -> Any:
+    """数组求和结果转为 Python 数字，整数值保持为 int"""
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+class ExamGradeResult:
+    """
+    整卷判分结果
+
+    逐空数组（长度为空的总数，NumPy 不可用时为列表）:
+        question_index: 所属题目下标
+        item_index: 在题目中的小空下标（整题判分的题型为 -1）
+        type_codes: 题型编码，见 QUESTION_TYPES
+        scores: 该空的满分
+        attempted: 是否作答
+        correct: 是否答对
+        earned: 实际得分
+
+    汇总字段: total_score, obtained_score, total_count, attempted_count, correct_count, accuracy, by_type
+    question_results: {题目ID: {"type", "correct", "score", "item_correctness", "item_earned_scores", "item_attempted"}}，
+        只包含作答过的题目（与 attempted 相同，规范化后为空的答案不算作答）；item_attempted 为每个小空是否作答，
+        整题判分的题型为空列表
+    """
+
+    def __init__(self, question_index, item_index, type_codes, scores, attempted, correct, earned,
+                 question_results: Dict[str, Dict[str, Any]]):
+        self.question_index = question_index
+        self.item_index = item_index
+        self.type_codes = type_codes
+        self.scores = scores
+        self.attempted = attempted
+        self.correct = correct
+        self.earned = earned
+        self.question_results = question_results
+        self._positions: Optional[Dict[Tuple[int, int], int]] = None
+
+        if NUMPY_AVAILABLE:
+            self._summarize_numpy()
+        else:
+            self._summarize_python()
+
+        self.accuracy = (self.correct_count / self.attempted_count * 100) if self.attempted_count > 0 else 0
+
+    def _summarize_numpy(self) -> None:
+        scores, attempted, correct, earned = self.scores, self.attempted, self.correct, self.earned
+        self.total_count = int(scores.size)
+        self.total_score = _as_number(scores.sum())
+        self.obtained_score = _as_number(earned.sum())
+        self.attempted_count = int(np.count_nonzero(attempted))
+        self.correct_count = int(np.count_nonzero(correct))
+
+        # 按题型分组求和
+        minlength = len(QUESTION_TYPES)
+        counts = np.bincount(self.type_codes, minlength=minlength)
+        attempted_counts = np.bincount(self.type_codes, weights=attempted, minlength=minlength)
+        correct_counts = np.bincount(self.type_codes, weights=correct, minlength=minlength)
+        total_scores = np.bincount(self.type_codes, weights=scores, minlength=minlength)
+        obtained_scores = np.bincount(self.type_codes, weights=earned, minlength=minlength)
+        self.by_type = {
+            name: {
+                'total_count': int(counts[code]),
+                'attempted_count': int(attempted_counts[code]),
+                'correct_count': int(correct_counts[code]),
+                'total_score': _as_number(total_scores[code]),
+                'obtained_score': _as_number(obtained_scores[code]),
+            }
+            for code, name in enumerate(QUESTION_TYPES) if counts[code]
+        }
+
+    def _summarize_python(self) -> None:
+        self.total_count = len(self.scores)
+        self.total_score = _as_number(sum(self.scores))
+        self.obtained_score = _as_number(sum(self.earned))
+        self.attempted_count = sum(self.attempted)
+        self.correct_count = sum(self.correct)
+
+        self.by_type = {}
+        for code, attempted, correct, score, earned in zip(self.type_codes, self.attempted, self.correct,
+                                                           self.scores, self.earned):
+            stats = self.by_type.setdefault(QUESTION_TYPES[code], {
+                'total_count': 0, 'attempted_count': 0, 'correct_count': 0,
+                'total_score': 0, 'obtained_score': 0,
+            })
+            stats['total_count'] += 1
+            stats['attempted_count'] += attempted
+            stats['correct_count'] += correct
+            stats['total_score'] += score
+            stats['obtained_score'] += earned
+        for stats in self.by_type.values():
+            stats['total_score'] = _as_number(stats['total_score'])
+            stats['obtained_score'] = _as_number(stats['obtained_score'])
+        # 与 NumPy 实现保持相同的题型顺序
+        self.by_type = {name: self.by_type[name] for name in QUESTION_TYPES if name in self.by_type}
+
+    @property
+    def wrong_count(self) -> int:
+        """作答但答错的空数"""
+        return self.attempted_count - self.correct_count
+
+    @property
+    def unanswered_count(self) -> int:
+        """未作答的空数"""
+        return self.total_count - self.attempted_count
+
+    def is_attempted(self, question_index: int, item_index: int = -1) -> bool:
+        """指定题目（或小空）是否已作答；整题判分的题型 item_index 传 -1"""
+        if self._positions is None:
+            self._positions = {(int(q), int(i)): pos for pos, (q, i)
+                               in enumerate(zip(self.question_index, self.item_index))}
+        pos = self._positions.get((question_index, item_index))
+        return pos is not None and bool(self.attempted[pos])
+
+    def summary(self) -> Dict[str, Any]:
+        """汇总数据（便于显示或记录）"""
+        return {
+            'total_score': self.total_score,
+            'obtained_score': self.obtained_score,
+            'total_count': self.total_count,
+            'attempted_count': self.attempted_count,
+            'correct_count': self.correct_count,
+            'accuracy': self.accuracy,
+            'by_type': self.by_type,
+        }
+
+
+def grade_exam(questions: Iterable[Dict[str, Any]], user_answers: Dict[str, List[str]],
+               answer_keys: AnswerKeyTable, exam_path: str = None) -> ExamGradeResult:
+    """
+    整卷判分
+
+    Args:
+        questions: 题目列表
+        user_answers: 用户答案字典 {question_id: answer_list}
+        answer_keys: 预编译答案表
+        exam_path: 题目所属试卷文件路径（提供时按题目序号复用已编译的答案）
+
+    Returns:
+        判分结果
+    """
+    question_index: List[int] = []
+    item_index: List[int] = []
+    type_codes: List[int] = []
+    scores: List[Any] = []
+    attempted: List[bool] = []
+    correct: List[bool] = []
+    earned: List[Any] = []
+    question_results: Dict[str, Dict[str, Any]] = {}
+
+    for q_idx, question in enumerate(questions):
+        question_type = question.get('type', 'single_choice')
+        code = _TYPE_CODES.get(question_type, 0)
+        question_id = question.get('id')
+        user_answer = user_answers.get(question_id, [])
+        key = answer_keys.get(question, exam_path, q_idx)
+
+        if key.per_item:
+            count = len(key.answers)
+            if user_answer:
+                is_correct, item_correctness, item_earned_scores = key.check(user_answer)
+            else:
+                is_correct, item_correctness, item_earned_scores = False, [False] * count, [0] * count
+            answered_count = len(user_answer)
+            question_index.extend([q_idx] * count)
+            item_index.extend(range(count))
+            type_codes.extend([code] * count)
+            scores.extend(key.scores)
+            # 与 check 相同：规范化后为空的空视为未作答
+            item_attempted = [i < answered_count and bool(key.normalize(user_answer[i])) for i in range(count)]
+            question_attempted = any(item_attempted)
+            attempted.extend(item_attempted)
+            correct.extend(item_correctness)
+            earned.extend(item_earned_scores)
+            earned_score = sum(item_earned_scores)
+        else:
+            # 只判定用户实际作答的题目（空答案不参与判分）
+            is_correct = key.check(user_answer)[0] if user_answer else False
+            item_correctness, item_earned_scores, item_attempted = [], [], []
+            question_score = question.get('score', DEFAULT_QUESTION_SCORE)
+            earned_score = question_score if is_correct else 0
+            question_index.append(q_idx)
+            item_index.append(-1)
+            type_codes.append(code)
+            scores.append(question_score)
+            question_attempted = any(key.normalize(answer) for answer in user_answer)
+            attempted.append(question_attempted)
+            correct.append(is_correct)
+            earned.append(earned_score)
+
+        if question_attempted:
+            question_results[question_id] = {
+                'type': question_type,
+                'correct': is_correct,
+                'score': earned_score,
+                'item_correctness': item_correctness,
+                'item_earned_scores': item_earned_scores,
+                'item_attempted': item_attempted,
+            }
+
+    if NUMPY_AVAILABLE:
+        return ExamGradeResult(
+            np.asarray(question_index, dtype=np.intp),
+            np.asarray(item_index, dtype=np.intp),
+            np.asarray(type_codes, dtype=np.intp),
+            np.asarray(scores, dtype=np.float64),
+            np.asarray(attempted, dtype=bool),
+            np.asarray(correct, dtype=bool),
+            np.asarray(earned, dtype=np.float64),
+            question_results,
+        )
+    return ExamGradeResult(question_index, item_index, type_codes, scores, attempted, correct, earned,
+                           question_results)
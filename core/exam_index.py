@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+试卷目录索引 - 按试卷ID直接定位试卷文件
+
+一次 os.scandir 遍历建立 试卷ID -> 文件路径 的映射，之后按ID查找只需一次字典查找，
+不再逐个尝试 {id}.json / {id}.json.enc / exam_{id}.exb ... 等候选文件名。
+目录的修改时间变化（新增、删除、重命名文件）时自动重建；查找未命中时也会重新扫描一次，
+避免修改时间精度较低的文件系统漏掉刚创建的文件。
+
+文件格式由文件头的少量字节判断（sniff_exam_format），结果按文件的 大小/修改时间 缓存。
+"""
+
+import os
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+from .data_encryptor import CONTAINER_MAGIC, CONTAINER_EXTENSION
+from .lazy_exam import INDEXED_MAGIC, INDEXED_EXTENSION
+
+# 试卷文件格式
+FORMAT_JSON = 'json'            # 明文 JSON
+FORMAT_ENCRYPTED = 'encrypted'  # Base64 文本加密或二进制加密容器（DataEncryptor.load_file 自动区分）
+FORMAT_INDEXED = 'indexed'      # 分段索引加密（LazyExam 按题解密）
+
+# 判断格式时读取的文件头字节数
+SNIFF_BYTES = 64
+
+# 后缀 -> (文件名即为该ID时的优先级, 文件名为 exam_{ID} 时的优先级)，数值越小越优先，
+# 与原先逐个尝试候选文件名的顺序一致
+_SUFFIX_PRIORITY: Tuple[Tuple[str, int, int], ...] = (
+    ('.json', 0, 3),
+    ('.json.enc', 1, 4),
+    (CONTAINER_EXTENSION, 2, 5),
+    (INDEXED_EXTENSION, 6, 7),
+)
+
+_ID_PREFIX = 'exam_'
+
+
+def sniff_exam_format(file_path: str) -> str:
+    """
+    根据文件开头的少量字节判断试卷文件格式
+
+    分段索引和二进制容器以魔数开头；明文 JSON 以 '{' 或 '[' 开头（允许 BOM 和空白）；其余视为 Base64 文本加密
+    """
+    with open(file_path, 'rb') as f:
+        head = f.read(SNIFF_BYTES)
+    if head.startswith(INDEXED_MAGIC):
+        return FORMAT_INDEXED
+    if head.startswith(CONTAINER_MAGIC):
+        return FORMAT_ENCRYPTED
+    if head.lstrip(b'\xef\xbb\xbf \t\r\n').startswith((b'{', b'[')):
+        return FORMAT_JSON
+    return FORMAT_ENCRYPTED
+
+
+def exam_ids_for_filename(filename: str) -> Iterable[Tuple[str, int]]:
+    """
+    文件名可对应的试卷ID及优先级
+
+    例如 exam_a.json 既对应ID "exam_a"，也对应ID "a"（优先级低于 a.json 等同名文件）
+    """
+    for suffix, priority, prefixed_priority in _SUFFIX_PRIORITY:
+        if filename.endswith(suffix):
+            base = filename[:-len(suffix)]
+            if base:
+                yield base, priority
+            if base.startswith(_ID_PREFIX) and len(base) > len(_ID_PREFIX):
+                yield base[len(_ID_PREFIX):], prefixed_priority
+            return
+
+
+class ExamIndex:
+    """试卷ID到文件路径的目录索引（线程安全）"""
+
+    def __init__(self, data_dir: str):
+        """
+        Args:
+            data_dir: 试卷目录
+        """
+        self.data_dir = data_dir
+        self._lock = threading.Lock()
+        self._dir_mtime_ns: Optional[int] = None
+        self._paths: Dict[str, str] = {}
+        # 文件路径 -> (大小, 修改时间, 格式)
+        self._formats: Dict[str, Tuple[int, int, str]] = {}
+
+    def _dir_mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.data_dir).st_mtime_ns
+        except OSError:
+            return None
+
+    def rebuild(self, filenames: Iterable[str] = None, dir_mtime_ns: int = None) -> None:
+        """
+        重建索引
+
+        Args:
+            filenames: 目录中的试卷文件名（已由调用方扫描时传入，避免重复遍历目录）
+            dir_mtime_ns: 调用方扫描前取得的目录修改时间
+        """
+        if filenames is None:
+            dir_mtime_ns = self._dir_mtime()
+            try:
+                with os.scandir(self.data_dir) as it:
+                    filenames = [entry.name for entry in it if entry.is_file()]
+            except OSError:
+                filenames = []
+
+        best: Dict[str, Tuple[int, str]] = {}
+        for filename in filenames:
+            for exam_id, priority in exam_ids_for_filename(filename):
+                current = best.get(exam_id)
+                if current is None or priority < current[0]:
+                    best[exam_id] = (priority, filename)
+
+        paths = {exam_id: os.path.join(self.data_dir, filename) for exam_id, (_, filename) in best.items()}
+        with self._lock:
+            self._paths = paths
+            self._dir_mtime_ns = dir_mtime_ns
+            live = set(paths.values())
+            self._formats = {path: fmt for path, fmt in self._formats.items() if path in live}
+
+    def invalidate(self) -> None:
+        """标记索引过期，下次查找时重新扫描目录"""
+        with self._lock:
+            self._dir_mtime_ns = None
+
+    def lookup(self, exam_id: str) -> Optional[str]:
+        """
+        查找试卷ID对应的文件
+
+        Returns:
+            试卷文件路径；找不到时返回 None
+        """
+        dir_mtime_ns = self._dir_mtime()
+        if dir_mtime_ns is None or dir_mtime_ns != self._dir_mtime_ns:
+            self.rebuild()
+            return self._paths.get(exam_id)
+
+        path = self._paths.get(exam_id)
+        if path is None:
+            # 未命中时重新扫描一次（文件可能在修改时间精度范围内刚刚创建）
+            self.rebuild()
+            path = self._paths.get(exam_id)
+        return path
+
+    def exam_format(self, exam_path: str, stat: os.stat_result = None) -> str:
+        """
+        试卷文件格式，文件未变化时直接使用缓存的判断结果
+
+        Args:
+            exam_path: 试卷文件路径
+            stat: 调用方已取得的 stat 结果（可选）
+        """
+        if stat is None:
+            stat = os.stat(exam_path)
+        cached = self._formats.get(exam_path)
+        if cached is not None and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        exam_format = sniff_exam_format(exam_path)
+        with self._lock:
+            self._formats[exam_path] = (stat.st_size, stat.st_mtime_ns, exam_format)
+        return exam_format
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+试卷元数据旁路文件 - 列出试卷时无需解密整份试卷
+
+每个试卷文件旁边保存一个 <试卷文件名>.meta，内容为明文 JSON：
+    {"version": 1, "source_size": ..., "source_mtime_ns": ..., "info": {...}, "signature": "..."}
+signature 为使用主密钥派生的 HMAC-SHA256 签名，防止元数据被篡改；
+源文件大小或修改时间变化时旁路文件视为失效，由调用方回退为完整解密并重新生成。
+"""
+
+import hashlib
+import hmac
+import json
+import os
+from typing import Any, Dict, Optional
+
+from .data_encryptor import encryptor
+from .lazy_exam import count_exam_items
+
+META_SUFFIX = '.meta'
+META_VERSION = 1
+
+# 列表页需要的试卷字段
+INFO_FIELDS = ('exam_id', 'exam_name', 'description', 'time_limit', 'total_score', 'total_questions')
+
+
+def _signing_key() -> bytes:
+    """元数据签名密钥：由主密钥经 HMAC 派生，与加密密钥用途隔离，无需执行 PBKDF2"""
+    return hmac.new(encryptor.secret_key, b'exam-metadata-signature', hashlib.sha256).digest()
+
+
+def sign_record(record: Dict[str, Any]) -> str:
+    """对记录（不含 signature 字段）计算 HMAC-SHA256 签名"""
+    payload = json.dumps(record, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hmac.new(_signing_key(), payload.encode('utf-8'), hashlib.sha256).hexdigest()
+
+
+def build_exam_info(exam_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    从试卷数据中提取列表页所需的元数据
+
+    Args:
+        exam_data: 试卷数据（普通字典或 LazyExam）
+
+    Returns:
+        元数据字典，字段见 INFO_FIELDS（exam_id 缺失时为 None）
+    """
+    total_questions = getattr(exam_data, 'total_questions', None)
+    if total_questions is None:
+        # 计算总题数（对于cloze_group和comprehensive类型，每个item算作一道题）
+        total_questions = sum(count_exam_items(q) for q in exam_data.get('questions', []))
+
+    return {
+        'exam_id': exam_data.get('exam_id'),
+        'exam_name': exam_data.get('exam_name', '未命名试卷'),
+        'description': exam_data.get('description', ''),
+        'time_limit': exam_data.get('time_limit', 120),
+        'total_score': exam_data.get('total_score', 0),
+        'total_questions': total_questions,
+    }
+
+
+def sidecar_path(exam_path: str) -> str:
+    """试卷文件对应的元数据旁路文件路径"""
+    return exam_path + META_SUFFIX
+
+
+def write_metadata_sidecar(exam_path: str, info: Dict[str, Any]) -> bool:
+    """
+    为试卷文件写入签名的元数据旁路文件
+
+    Returns:
+        是否写入成功（目录只读等情况下返回 False，不影响正常使用）
+    """
+    try:
+        stat = os.stat(exam_path)
+        record = {
+            'version': META_VERSION,
+            'source_size': stat.st_size,
+            'source_mtime_ns': stat.st_mtime_ns,
+            'info': {field: info.get(field) for field in INFO_FIELDS},
+        }
+        record['signature'] = sign_record(record)
+
+        meta_path = sidecar_path(exam_path)
+        temp_file = meta_path + '.tmp'
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(record, f, ensure_ascii=False)
+        os.replace(temp_file, meta_path)
+        return True
+    except OSError as e:
+        print(f"写入试卷元数据失败 {os.path.basename(exam_path)}: {e}")
+        return False
+
+
+def read_metadata_sidecar(exam_path: str, stat: os.stat_result = None) -> Optional[Dict[str, Any]]:
+    """
+    读取试卷文件的元数据旁路文件
+
+    Args:
+        exam_path: 试卷文件路径
+        stat: 试卷文件的 stat 结果（可选，调用方已有时可避免重复 stat）
+
+    Returns:
+        元数据字典；旁路文件不存在、签名无效或已过期时返回 None
+    """
+    try:
+        with open(sidecar_path(exam_path), 'r', encoding='utf-8') as f:
+            record = json.load(f)
+        if stat is None:
+            stat = os.stat(exam_path)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(record, dict) or record.get('version') != META_VERSION:
+        return None
+    signature = record.pop('signature', '')
+    if not hmac.compare_digest(str(signature), sign_record(record)):
+        return None
+    if record.get('source_size') != stat.st_size or record.get('source_mtime_ns') != stat.st_mtime_ns:
+        return None
+    return record.get('info')
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+试卷数据格式定义与校验器
+
+四种题型的格式以声明式结构描述（QUESTION_SCHEMAS），模块加载时编译为按题型分组的检查表，
+校验时每道题只做一次字典查找和 isinstance 判断，错误信息仅在出错时才格式化。
+与逐条 raise 的写法不同，一次遍历即可收集全部错误，便于出题人一次性修正。
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# 格式定义变更时递增，已记录为"校验通过"的试卷会因版本不同而重新校验
+SCHEMA_VERSION = 1
+
+# 所有题目都必须包含的字段
+COMMON_FIELDS = ('id', 'type', 'question')
+
+# 字段定义: (字段名, 允许的类型，None 表示不限类型)
+QUESTION_SCHEMAS: Dict[str, Dict[str, Any]] = {
+    'single_choice': {
+        'label': '单选题',
+        'fields': (('answer', list), ('options', list)),
+        'min_length': ('options', 2, '至少需要2个选项'),
+    },
+    'fill_blank': {
+        'label': '填空题',
+        'fields': (('answer', list),),
+    },
+    'comprehensive': {
+        'label': '综合题',
+        'items': {
+            'label': 'item',
+            'min_count': 1,
+            'fields': (('id', None), ('answer', str), ('score', (int, float))),
+        },
+    },
+    'cloze_group': {
+        'label': '完形填空组',
+        'items': {
+            'label': '空位',
+            'min_count': 1,
+            'fields': (('id', None), ('index', None), ('answer', str), ('score', None)),
+        },
+    },
+}
+
+_TYPE_NAMES = {list: '列表', str: '字符串', (int, float): '数字', dict: '字典'}
+_MISSING = object()
+
+# 错误信息不超过此数量，避免格式严重错误的试卷生成过长的提示
+MAX_REPORTED_ERRORS = 20
+
+
+class _CompiledType:
+    """单个题型编译后的检查表"""
+
+    __slots__ = ('label', 'fields', 'min_length', 'item_label', 'item_min', 'item_fields')
+
+    def __init__(self, schema: Dict[str, Any]):
+        self.label = schema['label']
+        self.fields: Tuple[Tuple[str, Optional[tuple]], ...] = tuple(schema.get('fields', ()))
+        self.min_length = schema.get('min_length')
+        items = schema.get('items')
+        self.item_label = items['label'] if items else None
+        self.item_min = items['min_count'] if items else 0
+        self.item_fields: Tuple[Tuple[str, Optional[tuple]], ...] = tuple(items['fields']) if items else ()
+
+
+def _type_name(types) -> str:
+    return _TYPE_NAMES.get(types, str(types))
+
+
+class ExamValidator:
+    """编译后的试卷校验器（无状态，可在多线程中共享）"""
+
+    def __init__(self, schemas: Dict[str, Dict[str, Any]] = QUESTION_SCHEMAS):
+        self._types = {name: _CompiledType(schema) for name, schema in schemas.items()}
+
+    def question_errors(self, i: int, question: Any, errors: List[str]) -> None:
+        """
+        校验单道题，把错误追加到 errors
+
+        Args:
+            i: 题目序号（从0开始）
+            question: 题目数据
+            errors: 错误信息列表
+        """
+        if not isinstance(question, dict):
+            errors.append(f"第{i+1}题必须是字典格式")
+            return
+
+        for field in COMMON_FIELDS:
+            if field not in question:
+                errors.append(f"第{i+1}题缺少{field}字段")
+
+        question_type = question.get('type')
+        compiled = self._types.get(question_type) if isinstance(question_type, str) else None
+        if compiled is None:
+            if 'type' in question:
+                errors.append(f"第{i+1}题题型无效: {question_type}")
+            return
+
+        get = question.get
+        for field, types in compiled.fields:
+            value = get(field, _MISSING)
+            if value is _MISSING:
+                errors.append(f"第{i+1}题({compiled.label})缺少{field}字段")
+            elif types is not None and not isinstance(value, types):
+                errors.append(f"第{i+1}题({compiled.label}){field}字段必须是{_type_name(types)}")
+
+        if compiled.min_length:
+            field, minimum, message = compiled.min_length
+            value = get(field)
+            if isinstance(value, list) and len(value) < minimum:
+                errors.append(f"第{i+1}题({compiled.label}){message}")
+
+        if compiled.item_label is None:
+            return
+
+        items = get('items', _MISSING)
+        if items is _MISSING:
+            errors.append(f"第{i+1}题({compiled.label})缺少items字段")
+            return
+        if not isinstance(items, list):
+            errors.append(f"第{i+1}题({compiled.label})items字段必须是列表")
+            return
+        if len(items) < compiled.item_min:
+            errors.append(f"第{i+1}题({compiled.label})至少需要{compiled.item_min}个{compiled.item_label}")
+
+        label = compiled.item_label
+        item_fields = compiled.item_fields
+        for j, item in enumerate(items):
+            if not isinstance(item, dict):
+                errors.append(f"第{i+1}题第{j+1}个{label}必须是字典格式")
+                continue
+            item_get = item.get
+            for field, types in item_fields:
+                value = item_get(field, _MISSING)
+                if value is _MISSING:
+                    errors.append(f"第{i+1}题第{j+1}个{label}缺少{field}字段")
+                elif types is not None and not isinstance(value, types):
+                    errors.append(f"第{i+1}题第{j+1}个{label}的{field}字段必须是{_type_name(types)}")
+
+    def validate_question(self, i: int, question: Any) -> None:
+        """
+        校验单道题
+
+        Raises:
+            ValueError: 题目格式错误（包含该题的全部错误）
+        """
+        errors: List[str] = []
+        self.question_errors(i, question, errors)
+        if errors:
+            raise ValueError(format_errors(errors))
+
+    def exam_errors(self, exam_data: Dict[str, Any]) -> List[str]:
+        """
+        一次遍历收集整份试卷的全部错误
+
+        Returns:
+            错误信息列表（为空表示校验通过）
+        """
+        errors: List[str] = []
+        for field in ('exam_id', 'exam_name', 'questions'):
+            if field not in exam_data:
+                errors.append(f"试卷数据缺少必要字段: {field}")
+
+        questions = exam_data.get('questions', [])
+        if not isinstance(questions, list):
+            errors.append("questions字段必须是列表")
+            return errors
+
+        question_errors = self.question_errors
+        for i, question in enumerate(questions):
+            question_errors(i, question, errors)
+        return errors
+
+    def validate_exam(self, exam_data: Dict[str, Any]) -> None:
+        """
+        校验整份试卷
+
+        Raises:
+            ValueError: 试卷格式错误（包含全部错误）
+        """
+        errors = self.exam_errors(exam_data)
+        if errors:
+            raise ValueError(format_errors(errors))
+
+
+def format_errors(errors: Sequence[str]) -> str:
+    """将错误列表合并为一条错误信息（只有一处错误时直接返回该错误）"""
+    if len(errors) == 1:
+        return errors[0]
+    lines = list(errors[:MAX_REPORTED_ERRORS])
+    if len(errors) > MAX_REPORTED_ERRORS:
+        lines.append(f"……另有 {len(errors) - MAX_REPORTED_ERRORS} 处错误")
+    return f"试卷数据格式错误（共 {len(errors)} 处）:\n" + "\n".join(lines)
+
+
+# 全局共享的校验器
+validator = ExamValidator()
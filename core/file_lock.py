@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进程间文件锁 - 多个程序实例同时读写同一个数据目录时串行化写入
+
+使用操作系统的建议性锁（POSIX 为 fcntl.flock，Windows 为 msvcrt.locking），
+进程退出时锁由操作系统自动释放，不会因为程序崩溃留下死锁。两者都不可用时退化为只在进程内加锁。
+"""
+
+import os
+import threading
+import time
+
+# 尝试导入fcntl（POSIX）
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    fcntl = None
+    FCNTL_AVAILABLE = False
+
+# 尝试导入msvcrt（Windows）
+try:
+    import msvcrt
+    MSVCRT_AVAILABLE = True
+except ImportError:
+    msvcrt = None
+    MSVCRT_AVAILABLE = False
+
+# Windows 下等待其他进程释放锁的最长秒数（超时后不加锁继续，避免界面卡死）
+LOCK_TIMEOUT = 10.0
+_RETRY_INTERVAL = 0.05
+
+
+class FileLock:
+    """基于锁文件的进程间互斥锁（同一进程内可重入，可用于 with 语句）"""
+
+    def __init__(self, lock_file: str, timeout: float = LOCK_TIMEOUT):
+        """
+        Args:
+            lock_file: 锁文件路径（不存在时自动创建，内容无意义）
+            timeout: Windows 下等待锁的最长秒数
+        """
+        self.lock_file = lock_file
+        self.timeout = timeout
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    def acquire(self) -> None:
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            try:
+                self._fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+                self._lock_fd()
+            except OSError as e:
+                # 锁文件无法创建（如只读目录）时只在进程内加锁
+                print(f"获取进度文件锁失败: {e}")
+        self._depth += 1
+
+    def _lock_fd(self) -> None:
+        if FCNTL_AVAILABLE:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        elif MSVCRT_AVAILABLE:
+            deadline = time.monotonic() + self.timeout
+            while True:
+                try:
+                    msvcrt.locking(self._fd, msvcrt.LK_NBLCK, 1)
+                    return
+                except OSError:
+                    if time.monotonic() >= deadline:
+                        print("等待进度文件锁超时，继续执行")
+                        return
+                    time.sleep(_RETRY_INTERVAL)
+
+    def release(self) -> None:
+        self._depth -= 1
+        if self._depth == 0 and self._fd is not None:
+            try:
+                if FCNTL_AVAILABLE:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+                elif MSVCRT_AVAILABLE:
+                    os.lseek(self._fd, 0, os.SEEK_SET)
+                    msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+            except OSError:
+                pass
+            finally:
+                os.close(self._fd)
+                self._fd = None
+        self._thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+增量 JSON 解析器 - 用于流式读取大型试卷文件
+逐块接收文本，按顶层字段输出事件；指定的数组字段（如 questions）逐个元素输出，
+因此内存占用只与单个元素的大小相关，而与整个文件大小无关。
+
+跨越多个文本块的字符串、对象和数组先由扫描器逐块跟踪引号和括号层级，找到结尾后才把各块拼接起来解码一次，
+解析耗时与值的大小成线性关系（不会在每读入一块后从头重新解码）。
+"""
+
+import json
+import re
+from typing import Any, Iterable, Iterator, Tuple
+
+# 事件类型
+FIELD = 'field'              # 普通顶层字段: (FIELD, key, value)
+BEGIN_ARRAY = 'begin_array'  # 流式数组开始: (BEGIN_ARRAY, key, None)
+ITEM = 'item'                # 流式数组元素: (ITEM, key, element)
+END_ARRAY = 'end_array'      # 流式数组结束: (END_ARRAY, key, None)
+
+_WHITESPACE = ' \t\n\r'
+_DELIMITERS = _WHITESPACE + ',]}'
+# 字符串外需要跟踪的字符（引号和括号）
+_STRUCTURAL = re.compile(r'[\[\]{}"]')
+
+
+class JsonObjectStream:
+    """顶层 JSON 对象的增量解析器"""
+
+    def __init__(self, chunks: Iterable[str], stream_keys: Tuple[str, ...] = ('questions',)):
+        """
+        Args:
+            chunks: 文本块迭代器
+            stream_keys: 需要逐元素输出的数组字段名
+        """
+        self._chunks = iter(chunks)
+        self._stream_keys = stream_keys
+        self._decoder = json.JSONDecoder()
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+        # 跨块扫描的状态
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def _next_chunk(self) -> str:
+        """读取下一个非空文本块（文件结束时返回空串）"""
+        if not self._eof:
+            for chunk in self._chunks:
+                if chunk:
+                    return chunk
+            self._eof = True
+        return ''
+
+    def _fill(self) -> bool:
+        """读取下一个文本块，返回是否读到了新数据"""
+        chunk = self._next_chunk()
+        if not chunk:
+            return False
+        # 丢弃已消费的前缀，保证缓冲区只保留未解析部分
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """跳过空白并返回下一个字符（文件结束时返回空串）"""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, char: str) -> None:
+        if self._peek() != char:
+            raise ValueError(f"JSON 格式错误: 期望 '{char}'，位置 {self._pos}")
+        self._pos += 1
+
+    def _scan(self, text: str, pos: int) -> int:
+        """
+        从 pos 继续扫描当前的字符串/对象/数组（状态跨文本块保留）
+
+        Returns:
+            值结束后的位置；值在 text 中尚未结束时返回 -1
+        """
+        end = len(text)
+        if self._escape:
+            # 上一块以转义符结尾，跳过被转义的字符
+            self._escape = False
+            pos += 1
+        quote = -1
+        while pos < end:
+            if self._in_string:
+                # 字符串内只需查找结束引号和转义符（str.find 比正则快得多，适合内嵌图片等超长字符串）
+                if quote < pos:
+                    quote = text.find('"', pos)
+                backslash = text.find('\\', pos, quote if quote >= 0 else end)
+                if backslash >= 0:
+                    pos = backslash + 1
+                    if pos >= end:
+                        self._escape = True
+                        return -1
+                    pos += 1
+                    continue
+                if quote < 0:
+                    return -1
+                pos = quote + 1
+                self._in_string = False
+                if self._depth == 0:
+                    return pos
+                continue
+            match = _STRUCTURAL.search(text, pos)
+            if match is None:
+                return -1
+            pos = match.end()
+            char = match.group()
+            if char == '"':
+                self._in_string = True
+            elif char in '[{':
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    return pos
+        return -1
+
+    def _value(self) -> Any:
+        """解析下一个完整的 JSON 值，数据不足时继续读取"""
+        if self._peek() in '"[{':
+            return self._compound_value()
+        # 数字、true/false/null 很短，数据不足时直接读入下一块后重试
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+                # 值后面没有分隔符时可能被截断（如数字 12|3、-2.|5），需再读一块确认
+                if (end < len(self._buf) and self._buf[end] in _DELIMITERS) or self._eof:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            self._fill()
+
+    def _compound_value(self) -> Any:
+        """解析字符串、对象或数组：先找到值的结尾，再一次性解码"""
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        text, start = self._buf, self._pos
+        end = self._scan(text, start)
+        if end >= 0:
+            value, self._pos = self._decoder.raw_decode(text, start)
+            return value
+
+        # 值跨越多个文本块：收集各块，找到结尾后拼接一次
+        parts = [text[start:]]
+        while end < 0:
+            text = self._next_chunk()
+            if not text:
+                raise ValueError("JSON 格式错误: 文件在值结束前截断")
+            end = self._scan(text, 0)
+            parts.append(text if end < 0 else text[:end])
+        value = self._decoder.decode(''.join(parts))
+        self._buf, self._pos = text, end
+        return value
+
+    def events(self) -> Iterator[Tuple[str, str, Any]]:
+        """逐个产生解析事件"""
+        self._expect('{')
+        first = True
+        while True:
+            char = self._peek()
+            if char == '}':
+                self._pos += 1
+                return
+            if not first:
+                self._expect(',')
+            first = False
+
+            key = self._value()
+            if not isinstance(key, str):
+                raise ValueError("JSON 格式错误: 对象键必须是字符串")
+            self._expect(':')
+
+            if key in self._stream_keys and self._peek() == '[':
+                self._pos += 1
+                yield BEGIN_ARRAY, key, None
+                first_item = True
+                while True:
+                    if self._peek() == ']':
+                        self._pos += 1
+                        break
+                    if not first_item:
+                        self._expect(',')
+                    first_item = False
+                    yield ITEM, key, self._value()
+                yield END_ARRAY, key, None
+            else:
+                yield FIELD, key, self._value()
+
+
+def iter_json_events(chunks: Iterable[str], stream_keys: Tuple[str, ...] = ('questions',)) -> Iterator[Tuple[str, str, Any]]:
+    """便捷函数：对文本块迭代器进行增量解析"""
+    return JsonObjectStream(chunks, stream_keys).events()
+
+
+def write_json_events(events: Iterable[Tuple[str, str, Any]], f) -> int:
+    """
+    将解析事件写回文件，输出与 json.dump(data, f, ensure_ascii=False, indent=2) 完全一致
+
+    Returns:
+        流式数组元素总数
+    """
+    item_count = 0
+    first = True
+    has_items = False
+    f.write('{')
+    for event, key, value in events:
+        if event == FIELD:
+            text = json.dumps(value, ensure_ascii=False, indent=2).replace('\n', '\n  ')
+            f.write(f"{'' if first else ','}\n  {json.dumps(key, ensure_ascii=False)}: {text}")
+            first = False
+        elif event == BEGIN_ARRAY:
+            f.write(f"{'' if first else ','}\n  {json.dumps(key, ensure_ascii=False)}: [")
+            first = False
+            has_items = False
+        elif event == ITEM:
+            text = json.dumps(value, ensure_ascii=False, indent=2).replace('\n', '\n    ')
+            f.write(f"{',' if has_items else ''}\n    {text}")
+            has_items = True
+            item_count += 1
+        elif event == END_ARRAY:
+            f.write('\n  ]' if has_items else ']')
+    f.write('}' if first else '\n}')
+    return item_count
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分段索引加密试卷 (.exi) - 支持按题随机访问
+
+文件结构:
+    Header[8B]   = Magic "QBIX"[4B] + 版本号[1B] + 标志位[1B] + 保留[2B]
+    Salt[16B]
+    IndexLen[4B] (大端无符号整数)
+    IndexRecord  = Nonce[12B] + Tag[16B] + CipherText[...]
+    QuestionRecord * N，结构同 IndexRecord
+
+每条记录使用 AES-256-GCM 独立加密，记录序号作为附加认证数据，防止记录被替换或调换顺序。
+索引中保存试卷元数据、题目数量及每道题相对于题目记录区起点的偏移量，因此打开试卷列表和显示第一题时无需解密其余题目。
+"""
+
+import copy
+import hashlib
+import hmac
+import json
+import os
+import struct
+import threading
+import zlib
+from collections.abc import Sequence
+from typing import Any, Callable, Dict, List, Optional
+
+from Crypto.Cipher import AES
+
+from .data_encryptor import encryptor, FLAG_ZLIB
+
+INDEXED_MAGIC = b'QBIX'
+INDEXED_VERSION = 1
+INDEXED_HEADER_SIZE = 8
+INDEXED_EXTENSION = '.exi'
+
+NONCE_SIZE = 12
+TAG_SIZE = 16
+_INDEX_LEN = struct.Struct('>I')
+_INDEX_AAD = b'index'
+
+# 统计题目数时按小题计数的题型
+ITEM_QUESTION_TYPES = ('cloze_group', 'comprehensive')
+
+
+def _record_key(derived_key: bytes) -> bytes:
+    """从 PBKDF2 派生密钥再派生出 GCM 记录密钥，与 CBC 格式的密钥用途隔离"""
+    return hmac.new(derived_key, b'indexed-exam-records', hashlib.sha256).digest()
+
+
+def _seal(key: bytes, plaintext: bytes, aad: bytes) -> bytes:
+    nonce = os.urandom(NONCE_SIZE)
+    cipher = AES.new(key, AES.MODE_GCM, nonce=nonce)
+    cipher.update(aad)
+    ciphertext, tag = cipher.encrypt_and_digest(plaintext)
+    return nonce + tag + ciphertext
+
+
+def _open(key: bytes, record: bytes, aad: bytes) -> bytes:
+    if len(record) < NONCE_SIZE + TAG_SIZE:
+        raise ValueError("加密记录长度不足")
+    cipher = AES.new(key, AES.MODE_GCM, nonce=record[:NONCE_SIZE])
+    cipher.update(aad)
+    try:
+        return cipher.decrypt_and_verify(record[NONCE_SIZE + TAG_SIZE:], record[NONCE_SIZE:NONCE_SIZE + TAG_SIZE])
+    except ValueError:
+        raise ValueError("解密失败：可能是密钥错误或数据被篡改")
+
+
+def count_exam_items(question: Dict[str, Any]) -> int:
+    """计算一道题折算的题目数（cloze_group/comprehensive 每个 item 算一道题）"""
+    if question.get('type', 'single_choice') in ITEM_QUESTION_TYPES:
+        return len(question.get('items', []))
+    return 1
+
+
+def build_indexed_exam(exam_data: Dict[str, Any], salt: bytes = None, compression: str = None) -> bytes:
+    """
+    将试卷数据编码为分段索引加密格式
+
+    Args:
+        exam_data: 试卷数据
+        salt: 指定盐值（可选，含义同 DataEncryptor.encrypt_data）
+        compression: 'zlib' 时对每条记录单独压缩
+
+    Returns:
+        完整文件内容
+    """
+    if compression not in (None, 'zlib'):
+        raise ValueError(f"分段索引格式不支持的压缩算法: {compression}")
+    if salt is None:
+        salt = os.urandom(16)
+    elif len(salt) != 16:
+        raise ValueError("盐值长度必须为16字节")
+
+    flags = FLAG_ZLIB if compression else 0
+    header = INDEXED_MAGIC + bytes([INDEXED_VERSION, flags, 0, 0])
+    key = _record_key(encryptor._generate_derived_key(salt))
+
+    def encode(obj) -> bytes:
+        raw = json.dumps(obj, ensure_ascii=False).encode('utf-8')
+        return zlib.compress(raw, 9) if compression else raw
+
+    questions = exam_data.get('questions', [])
+    sealed = [_seal(key, encode(q), header + struct.pack('>I', i)) for i, q in enumerate(questions)]
+
+    metadata = {k: v for k, v in exam_data.items() if k != 'questions'}
+    total_items = sum(count_exam_items(q) for q in questions)
+
+    # 索引记录: [偏移, 长度, 题型, 折算题数, 题目ID]，偏移相对于题目记录区起点
+    records = []
+    offset = 0
+    for question, record in zip(questions, sealed):
+        records.append([offset, len(record), question.get('type', 'single_choice'),
+                        count_exam_items(question), question.get('id')])
+        offset += len(record)
+    index = {
+        'metadata': metadata,
+        'question_count': len(questions),
+        'total_questions': total_items,
+        'records': records,
+    }
+
+    sealed_index = _seal(key, encode(index), header + _INDEX_AAD)
+    return b''.join([header, salt, _INDEX_LEN.pack(len(sealed_index)), sealed_index] + sealed)
+
+
+def write_indexed_exam(exam_data: Dict[str, Any], output_file: str, salt: bytes = None,
+                       compression: str = None) -> str:
+    """将试卷数据写入 .exi 文件（先写临时文件再原子替换）"""
+    temp_file = output_file + '.tmp'
+    with open(temp_file, 'wb') as f:
+        f.write(build_indexed_exam(exam_data, salt, compression))
+    os.replace(temp_file, output_file)
+    return output_file
+
+
+class LazyQuestionList(Sequence):
+    """按需解密的题目列表，支持 len/下标/迭代，行为与普通列表一致"""
+
+    def __init__(self, exam: 'LazyExam'):
+        self._exam = exam
+
+    def __len__(self) -> int:
+        return self._exam.question_count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._exam.get_question(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("题目索引超出范围")
+        return self._exam.get_question(index)
+
+    def type_of(self, index: int) -> str:
+        """从索引中读取题型，无需解密题目"""
+        return self._exam.records[index][2]
+
+    def item_count(self, index: int) -> int:
+        """从索引中读取题目折算数量，无需解密题目"""
+        return self._exam.records[index][3]
+
+
+class LazyExam:
+    """
+    按需解密的试卷对象
+    打开时只解密索引，题目在首次访问时才解密；对外提供与试卷字典相同的 get/[] 访问方式
+    """
+
+    def __init__(self, file_path: str, validator: Callable[[int, Dict[str, Any]], None] = None):
+        """
+        Args:
+            file_path: .exi 文件路径
+            validator: 题目校验函数（可选），每道题首次解密后调用，校验失败应抛出 ValueError
+        """
+        self.file_path = file_path
+        self._validator = validator
+        self._on_load: Optional[Callable[[int, Dict[str, Any]], None]] = None
+        self._cache: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+        with open(file_path, 'rb') as f:
+            prefix = f.read(INDEXED_HEADER_SIZE + 16 + _INDEX_LEN.size)
+            if len(prefix) < INDEXED_HEADER_SIZE + 16 + _INDEX_LEN.size or prefix[:4] != INDEXED_MAGIC:
+                raise ValueError("非法的分段索引试卷格式")
+            if not 1 <= prefix[4] <= INDEXED_VERSION:
+                raise ValueError(f"不支持的分段索引试卷版本: {prefix[4]}")
+            self._header = prefix[:INDEXED_HEADER_SIZE]
+            self._compressed = bool(prefix[5] & FLAG_ZLIB)
+            salt = prefix[INDEXED_HEADER_SIZE:INDEXED_HEADER_SIZE + 16]
+            (index_len,) = _INDEX_LEN.unpack(prefix[INDEXED_HEADER_SIZE + 16:])
+            sealed_index = f.read(index_len)
+        self._data_start = INDEXED_HEADER_SIZE + 16 + _INDEX_LEN.size + index_len
+
+        self._key = _record_key(encryptor._generate_derived_key(salt))
+        index = json.loads(self._decode(_open(self._key, sealed_index, self._header + _INDEX_AAD)))
+
+        self.metadata: Dict[str, Any] = index.get('metadata', {})
+        self.records: List[list] = index.get('records', [])
+        self.question_count: int = index.get('question_count', len(self.records))
+        self.total_questions: int = index.get('total_questions', 0)
+        self.questions = LazyQuestionList(self)
+
+    def clone(self) -> 'LazyExam':
+        """
+        创建共享索引和密钥、但拥有独立题目缓存与元数据的副本
+        无需重新执行 PBKDF2 和解密索引，副本上的修改（题号、回调等）互不影响
+        """
+        other = object.__new__(LazyExam)
+        other.file_path = self.file_path
+        other._validator = self._validator
+        other._on_load = None
+        other._cache = {}
+        other._lock = threading.Lock()
+        other._header = self._header
+        other._compressed = self._compressed
+        other._data_start = self._data_start
+        other._key = self._key
+        other.metadata = copy.deepcopy(self.metadata)
+        other.records = self.records
+        other.question_count = self.question_count
+        other.total_questions = self.total_questions
+        other.questions = LazyQuestionList(other)
+        return other
+
+    def _decode(self, plaintext: bytes) -> str:
+        if self._compressed:
+            plaintext = zlib.decompress(plaintext)
+        return plaintext.decode('utf-8')
+
+    def set_on_load(self, callback: Callable[[int, Dict[str, Any]], None]) -> None:
+        """设置题目首次解密后的回调（用于补充题号等显示信息），已解密的题目会立即补调"""
+        with self._lock:
+            self._on_load = callback
+            loaded = sorted(self._cache.items())
+        for index, question in loaded:
+            callback(index, question)
+
+    def get_question(self, index: int) -> Dict[str, Any]:
+        """解密并返回第 index 道题（结果会被缓存，多次访问返回同一对象）"""
+        with self._lock:
+            question = self._cache.get(index)
+        if question is not None:
+            return question
+
+        offset, length = self.records[index][0], self.records[index][1]
+        with open(self.file_path, 'rb') as f:
+            f.seek(self._data_start + offset)
+            record = f.read(length)
+        aad = self._header + struct.pack('>I', index)
+        question = json.loads(self._decode(_open(self._key, record, aad)))
+        if self._validator:
+            self._validator(index, question)
+
+        with self._lock:
+            # 并发访问时以先写入的对象为准，保证同一题只有一个实例
+            existing = self._cache.get(index)
+            if existing is not None:
+                return existing
+            self._cache[index] = question
+            callback = self._on_load
+        if callback:
+            callback(index, question)
+        return question
+
+    # ---- 与试卷字典兼容的访问接口 ----
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key == 'questions':
+            return self.questions
+        return self.metadata.get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        if key == 'questions':
+            return self.questions
+        return self.metadata[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key == 'questions':
+            raise TypeError("分段索引试卷的题目列表为只读")
+        self.metadata[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        return key == 'questions' or key in self.metadata
+
+    def keys(self):
+        return list(self.metadata.keys()) + ['questions']
+
+    def to_dict(self) -> Dict[str, Any]:
+        """解密全部题目，返回普通试卷字典"""
+        data = dict(self.metadata)
+        data['questions'] = [self.get_question(i) for i in range(self.question_count)]
+        return data
@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+学习数据分析 - 把用户进度一次性加载为列式数组，之后的统计查询都是数组运算
+
+列（NumPy 不可用时为 array 模块的数组）:
+    题目级（每道题/每个小空一行，来自累计统计，不受历史记录保留策略影响）:
+        q_exam, q_attempts, q_correct, q_last_correct
+    答题记录级（每条保留的答题历史一行）:
+        exam, question, correct, time（本地时间的微秒数，缺失为 MISSING_TIME）, day（天序号）, session（-1 表示无会话）
+
+查询:
+    weakest_questions      正确率最低的题目
+    accuracy_trend         按天 / 按会话的正确率变化
+    error_rates_by_category 按分类（如题型）汇总的错误率
+    time_between_attempts  同一道题相邻两次作答的间隔
+    overall                总体统计
+题目级查询使用累计统计；按天、按会话和作答间隔只能基于保留的答题历史（更早的记录已汇总为计数）。
+界面通过 UserProgressManager.analytics() 获取与当前进度对应的实例（进度变化后自动重建）。
+"""
+
+import statistics
+from array import array
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Union
+
+# 尝试导入numpy，如果不可用则使用纯 Python 实现
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+MISSING_TIME = -2 ** 63  # 与 numpy 的 NaT 相同
+US_PER_DAY = 86400 * 1000000
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_DATE = date(1970, 1, 1)
+UNCATEGORIZED = "未分类"
+
+# 分类来源：{(试卷ID, 题目ID) 或 题目ID: 分类}，或 函数(试卷ID, 题目ID) -> 分类
+CategorySource = Union[Mapping[Any, str], Callable[[str, str], Optional[str]]]
+
+
+def _parse_time(timestamp: Optional[str]) -> int:
+    """ISO 时间字符串转为本地时间的微秒数（带时区偏移的先换算为本地时间；无法解析时为 MISSING_TIME）"""
+    if not timestamp:
+        return MISSING_TIME
+    try:
+        dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    except (AttributeError, TypeError, ValueError):
+        return MISSING_TIME
+    if dt.tzinfo is not None:
+        dt = dt.astimezone().replace(tzinfo=None)
+    return (dt - _EPOCH) // timedelta(microseconds=1)
+
+
+def _parse_times(timestamps: List[Optional[str]]):
+    """批量解析时间（NumPy 一次解析全部字符串，格式异常或带时区偏移时逐条解析）"""
+    if NUMPY_AVAILABLE:
+        try:
+            texts = [t or 'NaT' for t in timestamps]
+            joined = ''.join(texts)
+            # NumPy 会把带时区偏移的时间换算为 UTC（而不是本地时间）：日期之外出现 +、Z 或多余的 - 时逐条解析
+            if '+' not in joined and 'Z' not in joined and joined.count('-') == 2 * (len(texts) - texts.count('NaT')):
+                return np.array(texts, dtype='datetime64[us]').astype(np.int64)
+        except (TypeError, ValueError):
+            pass
+        return np.array([_parse_time(t) for t in timestamps], dtype=np.int64)
+    return array('q', (_parse_time(t) for t in timestamps))
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    """线性插值的分位数（与 numpy.percentile 的默认算法相同）"""
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def question_categories(questions: List[Dict[str, Any]], field: str = 'type') -> Dict[str, str]:
+    """
+    由试卷题目生成 error_rates_by_category 使用的分类表
+
+    Args:
+        questions: 试卷题目列表
+        field: 作为分类的题目字段（默认为题型）
+
+    Returns:
+        {题目ID: 分类}
+    """
+    return {q.get('id'): q.get(field) or UNCATEGORIZED for q in questions if q.get('id') is not None}
+
+
+class ProgressAnalytics:
+    """用户进度的列式分析（构建一次，多次查询）"""
+
+    def __init__(self, progress_data: Dict[str, Any]):
+        """
+        Args:
+            progress_data: UserProgressManager.progress_data（构建后不再引用）
+        """
+        self.exam_ids: List[str] = []
+        self.question_keys: List[Tuple[str, str]] = []
+        self.session_ids: List[str] = []
+        self._exam_codes: Dict[str, int] = {}
+        session_codes: Dict[str, int] = {}
+
+        q_exam, q_attempts, q_correct, q_last_correct = array('i'), array('q'), array('q'), array('b')
+        exam, question, correct, session = array('i'), array('i'), array('b'), array('i')
+        timestamps: List[Optional[str]] = []
+
+        for exam_code, (exam_id, exam_data) in enumerate(progress_data.get("exams", {}).items()):
+            self.exam_ids.append(exam_id)
+            self._exam_codes[exam_id] = exam_code
+            for question_id, question_data in exam_data.get("questions", {}).items():
+                question_code = len(self.question_keys)
+                self.question_keys.append((exam_id, question_id))
+                q_exam.append(exam_code)
+                q_attempts.append(question_data.get("attempts", 0))
+                q_correct.append(question_data.get("correct", 0))
+                q_last_correct.append(bool(question_data.get("last_correct")))
+
+                history = question_data.get("history", [])
+                if not history:
+                    continue
+                exam.extend(array('i', [exam_code]) * len(history))
+                question.extend(array('i', [question_code]) * len(history))
+                correct.extend(array('b', [bool(record.get("correct")) for record in history]))
+                timestamps.extend([record.get("timestamp") for record in history])
+                # 会话ID按首次出现的顺序编码
+                session.extend(array('i', [session_codes.setdefault(session_id, len(session_codes)) if session_id else -1
+                                           for session_id in [record.get("session_id") for record in history]]))
+
+        self.session_ids = list(session_codes)
+        self.time = _parse_times(timestamps)
+        if NUMPY_AVAILABLE:
+            self.q_exam = np.frombuffer(q_exam, dtype=np.int32)
+            self.q_attempts = np.frombuffer(q_attempts, dtype=np.int64)
+            self.q_correct = np.frombuffer(q_correct, dtype=np.int64)
+            self.q_last_correct = np.frombuffer(q_last_correct, dtype=np.int8)
+            self.exam = np.frombuffer(exam, dtype=np.int32)
+            self.question = np.frombuffer(question, dtype=np.int32)
+            self.correct = np.frombuffer(correct, dtype=np.int8)
+            self.session = np.frombuffer(session, dtype=np.int32)
+            self.valid_time = self.time != MISSING_TIME
+            self.day = np.where(self.valid_time, self.time // US_PER_DAY, 0)
+            # 每个会话最早一条答题记录的时间（按会话排序用）
+            self.session_first = np.full(len(self.session_ids), np.iinfo(np.int64).max, dtype=np.int64)
+            has_session = (self.session >= 0) & self.valid_time
+            np.minimum.at(self.session_first, self.session[has_session], self.time[has_session])
+        else:
+            self.q_exam, self.q_attempts, self.q_correct, self.q_last_correct = q_exam, q_attempts, q_correct, q_last_correct
+            self.exam, self.question, self.correct, self.session = exam, question, correct, session
+            self.valid_time = array('b', (t != MISSING_TIME for t in self.time))
+            self.day = array('q', (t // US_PER_DAY if t != MISSING_TIME else 0 for t in self.time))
+            self.session_first = [None] * len(self.session_ids)
+            for code, t in zip(self.session, self.time):
+                if code >= 0 and t != MISSING_TIME and (self.session_first[code] is None or t < self.session_first[code]):
+                    self.session_first[code] = t
+        self._time_order = None
+
+    @property
+    def attempt_count(self) -> int:
+        """保留的答题记录数"""
+        return len(self.correct)
+
+    def _exam_code(self, exam_id: Optional[str]) -> Optional[int]:
+        """试卷ID转为编码（None 表示全部试卷，未知试卷为 -1）"""
+        if exam_id is None:
+            return None
+        return self._exam_codes.get(exam_id, -1)
+
+    # ---------- 题目级查询 ----------
+
+    def weakest_questions(self, limit: int = 10, exam_id: str = None, min_attempts: int = 1) -> List[Dict[str, Any]]:
+        """
+        正确率最低的题目（正确率相同时作答次数多的在前）
+
+        Args:
+            limit: 返回的题目数
+            exam_id: 只统计指定试卷（None 表示全部）
+            min_attempts: 至少作答过的次数
+
+        Returns:
+            [{"exam_id", "question_id", "attempts", "correct", "accuracy", "last_correct"}, ...]
+        """
+        exam_code = self._exam_code(exam_id)
+        min_attempts = max(min_attempts, 1)
+        if NUMPY_AVAILABLE:
+            selected = self.q_attempts >= min_attempts
+            if exam_code is not None:
+                selected &= self.q_exam == exam_code
+            candidates = np.flatnonzero(selected)
+            accuracy = self.q_correct[candidates] / self.q_attempts[candidates]
+            order = np.lexsort((-self.q_attempts[candidates], accuracy))
+            top = candidates[order[:limit]].tolist()
+        else:
+            candidates = [i for i, attempts in enumerate(self.q_attempts)
+                          if attempts >= min_attempts and (exam_code is None or self.q_exam[i] == exam_code)]
+            candidates.sort(key=lambda i: (self.q_correct[i] / self.q_attempts[i], -self.q_attempts[i]))
+            top = candidates[:limit]
+
+        result = []
+        for i in top:
+            exam_id_i, question_id = self.question_keys[i]
+            attempts, correct = int(self.q_attempts[i]), int(self.q_correct[i])
+            result.append({
+                "exam_id": exam_id_i,
+                "question_id": question_id,
+                "attempts": attempts,
+                "correct": correct,
+                "accuracy": correct / attempts * 100,
+                "last_correct": bool(self.q_last_correct[i])
+            })
+        return result
+
+    def _category_codes(self, categories: CategorySource) -> Tuple[List[str], List[int]]:
+        """每道题的分类编码（小空 q3_item1 按所属题目 q3 查找）"""
+        names: List[str] = []
+        name_codes: Dict[str, int] = {}
+        codes = []
+        for exam_id, question_id in self.question_keys:
+            base_id = question_id.split('_item', 1)[0]
+            if callable(categories):
+                category = categories(exam_id, question_id)
+            else:
+                category = categories.get((exam_id, question_id))
+                if category is None:
+                    category = categories.get(question_id)
+                if category is None and base_id != question_id:
+                    category = categories.get((exam_id, base_id), categories.get(base_id))
+            category = category or UNCATEGORIZED
+            code = name_codes.get(category)
+            if code is None:
+                code = name_codes[category] = len(names)
+                names.append(category)
+            codes.append(code)
+        return names, codes
+
+    def error_rates_by_category(self, categories: CategorySource, exam_id: str = None) -> List[Dict[str, Any]]:
+        """
+        按分类汇总的错误率（按错误率从高到低排列）
+
+        Args:
+            categories: 分类来源，见 CategorySource；可用 question_categories() 由试卷题目生成
+            exam_id: 只统计指定试卷（None 表示全部）
+
+        Returns:
+            [{"category", "questions", "attempts", "wrong", "error_rate"}, ...]，error_rate 为百分比
+        """
+        names, codes = self._category_codes(categories)
+        exam_code = self._exam_code(exam_id)
+        if NUMPY_AVAILABLE:
+            codes = np.array(codes, dtype=np.int64)
+            selected = self.q_attempts > 0
+            if exam_code is not None:
+                selected &= self.q_exam == exam_code
+            codes = codes[selected]
+            questions = np.bincount(codes, minlength=len(names))
+            attempts = np.bincount(codes, weights=self.q_attempts[selected], minlength=len(names))
+            wrong = np.bincount(codes, weights=self.q_attempts[selected] - self.q_correct[selected],
+                                minlength=len(names))
+        else:
+            questions, attempts, wrong = [0] * len(names), [0] * len(names), [0] * len(names)
+            for i, code in enumerate(codes):
+                if self.q_attempts[i] > 0 and (exam_code is None or self.q_exam[i] == exam_code):
+                    questions[code] += 1
+                    attempts[code] += self.q_attempts[i]
+                    wrong[code] += self.q_attempts[i] - self.q_correct[i]
+
+        result = []
+        for code, name in enumerate(names):
+            if not questions[code]:
+                continue
+            category_attempts, category_wrong = int(attempts[code]), int(wrong[code])
+            result.append({
+                "category": name,
+                "questions": int(questions[code]),
+                "attempts": category_attempts,
+                "wrong": category_wrong,
+                "error_rate": category_wrong / category_attempts * 100
+            })
+        result.sort(key=lambda item: -item["error_rate"])
+        return result
+
+    # ---------- 答题记录级查询 ----------
+
+    def _attempt_mask(self, exam_code: Optional[int]):
+        """有有效时间且属于指定试卷的答题记录"""
+        if NUMPY_AVAILABLE:
+            mask = self.valid_time
+            return mask if exam_code is None else mask & (self.exam == exam_code)
+        return [bool(valid) and (exam_code is None or e == exam_code) for valid, e in zip(self.valid_time, self.exam)]
+
+    def accuracy_trend(self, by: str = 'day', exam_id: str = None) -> List[Dict[str, Any]]:
+        """
+        正确率变化（按时间先后排列）
+
+        Args:
+            by: 'day' 按天，'session' 按会话（没有会话ID的记录不计入）
+            exam_id: 只统计指定试卷（None 表示全部）
+
+        Returns:
+            [{"key": 日期 YYYY-MM-DD 或会话ID, "attempts", "correct", "accuracy"}, ...]
+        """
+        if by not in ('day', 'session'):
+            raise ValueError(f"不支持的分组方式: {by}")
+        mask = self._attempt_mask(self._exam_code(exam_id))
+
+        if NUMPY_AVAILABLE:
+            if by == 'day':
+                days = self.day[mask]
+                if not days.size:
+                    return []
+                base = int(days.min())
+                groups = days - base
+                keys = None
+            else:
+                mask = mask & (self.session >= 0)
+                groups = self.session[mask]
+                base = 0
+            attempts = np.bincount(groups)
+            correct = np.bincount(groups, weights=self.correct[mask], minlength=attempts.size)
+            present = np.flatnonzero(attempts)
+            if by == 'session':
+                present = present[np.argsort(self.session_first[present], kind='stable')]
+        else:
+            attempts_by_group: Dict[int, int] = {}
+            correct_by_group: Dict[int, int] = {}
+            groups = self.day if by == 'day' else self.session
+            for selected, group, is_correct in zip(mask, groups, self.correct):
+                if not selected or group < 0:
+                    continue
+                attempts_by_group[group] = attempts_by_group.get(group, 0) + 1
+                correct_by_group[group] = correct_by_group.get(group, 0) + is_correct
+            base = 0
+            attempts, correct = attempts_by_group, correct_by_group
+            if by == 'day':
+                present = sorted(attempts_by_group)
+            else:
+                present = sorted(attempts_by_group, key=lambda code: self.session_first[code])
+
+        result = []
+        for group in present:
+            group = int(group)
+            if by == 'day':
+                key = (_EPOCH_DATE + timedelta(days=group + base)).isoformat()
+            else:
+                key = self.session_ids[group]
+            group_attempts, group_correct = int(attempts[group]), int(correct[group])
+            result.append({
+                "key": key,
+                "attempts": group_attempts,
+                "correct": group_correct,
+                "accuracy": group_correct / group_attempts * 100
+            })
+        return result
+
+    def time_between_attempts(self, exam_id: str = None) -> Dict[str, Any]:
+        """
+        同一道题相邻两次作答的时间间隔（秒）
+
+        Args:
+            exam_id: 只统计指定试卷（None 表示全部）
+
+        Returns:
+            {"count", "mean", "median", "p90", "min", "max"}；没有重复作答时除 count 外均为 None
+        """
+        exam_code = self._exam_code(exam_id)
+        if NUMPY_AVAILABLE:
+            if self._time_order is None:
+                # 记录按题目连续存放，历史通常已按时间排列，只有不满足时才按 (题目, 时间) 排序
+                question, time = self.question, self.time
+                if np.all((question[1:] != question[:-1]) | (time[1:] >= time[:-1])):
+                    self._time_order = slice(None)
+                else:
+                    self._time_order = np.lexsort((time, question))
+            order = self._time_order
+            question = self.question[order]
+            time = self.time[order]
+            valid = self.valid_time[order]
+            pair = (question[1:] == question[:-1]) & valid[1:] & valid[:-1]
+            if exam_code is not None:
+                pair &= self.exam[order][1:] == exam_code
+            gaps = (time[1:] - time[:-1])[pair] / 1e6
+            if not gaps.size:
+                return {"count": 0, "mean": None, "median": None, "p90": None, "min": None, "max": None}
+            return {
+                "count": int(gaps.size),
+                "mean": float(gaps.mean()),
+                "median": float(np.median(gaps)),
+                "p90": float(np.percentile(gaps, 90)),
+                "min": float(gaps.min()),
+                "max": float(gaps.max())
+            }
+
+        times_by_question: Dict[int, List[int]] = {}
+        for question, exam, t in zip(self.question, self.exam, self.time):
+            if t != MISSING_TIME and (exam_code is None or exam == exam_code):
+                times_by_question.setdefault(question, []).append(t)
+        gaps = []
+        for times in times_by_question.values():
+            times.sort()
+            gaps.extend((b - a) / 1e6 for a, b in zip(times, times[1:]))
+        if not gaps:
+            return {"count": 0, "mean": None, "median": None, "p90": None, "min": None, "max": None}
+        gaps.sort()
+        return {
+            "count": len(gaps),
+            "mean": statistics.fmean(gaps),
+            "median": statistics.median(gaps),
+            "p90": _percentile(gaps, 0.9),
+            "min": gaps[0],
+            "max": gaps[-1]
+        }
+
+    def overall(self, exam_id: str = None) -> Dict[str, Any]:
+        """
+        总体统计
+
+        Returns:
+            {"total_attempts", "total_correct", "accuracy", "questions_attempted", "days_studied", "sessions"}，
+            前四项来自累计统计，学习天数和会话数基于保留的答题历史
+        """
+        exam_code = self._exam_code(exam_id)
+        mask = self._attempt_mask(exam_code)
+        if NUMPY_AVAILABLE:
+            selected = self.q_attempts > 0
+            if exam_code is not None:
+                selected &= self.q_exam == exam_code
+            total_attempts = int(self.q_attempts[selected].sum())
+            total_correct = int(self.q_correct[selected].sum())
+            questions_attempted = int(np.count_nonzero(selected))
+            days_studied = int(np.unique(self.day[mask]).size)
+            sessions = self.session[mask]
+            session_count = int(np.unique(sessions[sessions >= 0]).size)
+        else:
+            selected = [i for i, attempts in enumerate(self.q_attempts)
+                        if attempts > 0 and (exam_code is None or self.q_exam[i] == exam_code)]
+            total_attempts = sum(self.q_attempts[i] for i in selected)
+            total_correct = sum(self.q_correct[i] for i in selected)
+            questions_attempted = len(selected)
+            days_studied = len({day for day, m in zip(self.day, mask) if m})
+            session_count = len({s for s, m in zip(self.session, mask) if m and s >= 0})
+        return {
+            "total_attempts": total_attempts,
+            "total_correct": total_correct,
+            "accuracy": (total_correct / total_attempts * 100) if total_attempts > 0 else 0,
+            "questions_attempted": questions_attempted,
+            "days_studied": days_studied,
+            "sessions": session_count
+        }
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+用户进度快照的序列化格式
+
+序列化方式:
+    json     紧凑 JSON（无缩进，默认）；安装了 orjson 时使用 orjson 编解码，否则使用标准库，两者生成的文件互相通用。
+             文件就是普通的 JSON 文本，不加头部，旧版程序和其他工具都可以直接读取
+    msgpack  MessagePack 二进制格式（需要安装 msgpack）
+
+二进制格式的文件带 8 字节头部: 魔数 QBPS + 格式版本(1字节) + 序列化方式(1字节) + 保留(2字节)，
+读取时按头部识别；没有头部的文件（包括旧版 indent=2 的 user_progress.json）按 JSON 读取。
+以 gzip 压缩的文件（归档备份）读取时自动解压。
+"""
+
+import codecs
+import gzip
+import json
+from typing import Any, Dict, Optional
+
+# 尝试导入orjson（更快的 JSON 编解码）
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+# 尝试导入msgpack（二进制序列化）
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+SNAPSHOT_MAGIC = b'QBPS'
+SNAPSHOT_VERSION = 2  # 版本 1 为没有头部的 JSON
+HEADER_SIZE = 8
+GZIP_MAGIC = b'\x1f\x8b'
+
+SERIALIZER_JSON = 'json'
+SERIALIZER_MSGPACK = 'msgpack'
+
+
+class JsonSerializer:
+    """紧凑 JSON（优先使用 orjson）"""
+
+    name = SERIALIZER_JSON
+    code = 1
+
+    def __init__(self, use_orjson: bool = ORJSON_AVAILABLE):
+        """
+        Args:
+            use_orjson: 是否使用 orjson（未安装时忽略）
+        """
+        self.use_orjson = use_orjson and ORJSON_AVAILABLE
+
+    def dumps(self, data: Any) -> bytes:
+        if self.use_orjson:
+            try:
+                return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+            except TypeError:
+                # orjson 不支持的数据（如超过 64 位的整数）交给标准库
+                pass
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def loads(self, payload: bytes) -> Any:
+        if self.use_orjson:
+            return orjson.loads(payload)
+        return json.loads(payload.decode('utf-8'))
+
+
+class MsgpackSerializer:
+    """MessagePack 二进制格式"""
+
+    name = SERIALIZER_MSGPACK
+    code = 2
+
+    def dumps(self, data: Any) -> bytes:
+        if not MSGPACK_AVAILABLE:
+            raise RuntimeError("未安装 msgpack，无法使用 msgpack 格式")
+        return msgpack.packb(data, use_bin_type=True)
+
+    def loads(self, payload: bytes) -> Any:
+        if not MSGPACK_AVAILABLE:
+            raise RuntimeError("进度文件为 msgpack 格式，但未安装 msgpack")
+        return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+
+
+SERIALIZERS = {
+    SERIALIZER_JSON: JsonSerializer(),
+    SERIALIZER_MSGPACK: MsgpackSerializer(),
+}
+_SERIALIZERS_BY_CODE = {serializer.code: serializer for serializer in SERIALIZERS.values()}
+
+
+def register_serializer(serializer) -> None:
+    """
+    注册自定义序列化方式
+
+    Args:
+        serializer: 具有 name、code（1-255，写入文件头部）、dumps、loads 的对象
+    """
+    SERIALIZERS[serializer.name] = serializer
+    _SERIALIZERS_BY_CODE[serializer.code] = serializer
+
+
+def get_serializer(name: Optional[str] = None):
+    """按名称获取序列化方式（None 表示默认的 json）"""
+    name = name or SERIALIZER_JSON
+    if name not in SERIALIZERS:
+        raise ValueError(f"未知的序列化方式: {name}")
+    return SERIALIZERS[name]
+
+
+def encode_snapshot(progress_data: Dict[str, Any], serializer=None, compress: bool = False) -> bytes:
+    """
+    把进度数据编码为快照文件内容
+
+    Args:
+        progress_data: 用户进度数据
+        serializer: 序列化方式（None 表示默认的 json）
+        compress: 是否以 gzip 压缩（用于归档备份）
+
+    Returns:
+        快照文件内容
+    """
+    serializer = serializer or get_serializer()
+    content = serializer.dumps(progress_data)
+    if serializer.name != SERIALIZER_JSON:
+        # 只有二进制格式需要头部，JSON 快照保持为普通 JSON 文本
+        content = SNAPSHOT_MAGIC + bytes((SNAPSHOT_VERSION, serializer.code, 0, 0)) + content
+    if compress:
+        content = gzip.compress(content, compresslevel=6)
+    return content
+
+
+def decode_snapshot(content: bytes) -> Dict[str, Any]:
+    """
+    解码快照文件内容（兼容旧版 JSON 文件、带头部的快照和 gzip 归档）
+
+    Raises:
+        ValueError: 版本或序列化方式不受支持，或内容无法解析
+    """
+    if content[:2] == GZIP_MAGIC:
+        content = gzip.decompress(content)
+
+    if content[:4] != SNAPSHOT_MAGIC:
+        # 没有头部的 JSON 文本（可能带有 UTF-8 BOM）
+        if content.startswith(codecs.BOM_UTF8):
+            content = content[len(codecs.BOM_UTF8):]
+        return get_serializer(SERIALIZER_JSON).loads(content)
+
+    if len(content) < HEADER_SIZE:
+        raise ValueError("进度文件头部不完整")
+    version, code = content[4], content[5]
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"不支持的进度文件版本: {version}")
+    serializer = _SERIALIZERS_BY_CODE.get(code)
+    if serializer is None:
+        raise ValueError(f"未知的序列化方式编号: {code}")
+    return serializer.loads(content[HEADER_SIZE:])
+
+
+def read_snapshot(path: str) -> Dict[str, Any]:
+    """读取快照文件"""
+    with open(path, 'rb') as f:
+        return decode_snapshot(f.read())
+
+
+def write_snapshot(path: str, progress_data: Dict[str, Any], serializer=None, compress: bool = False) -> None:
+    """写入快照文件（直接写入，调用方负责临时文件和原子替换）"""
+    content = encode_snapshot(progress_data, serializer, compress)
+    with open(path, 'wb') as f:
+        f.write(content)
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+用户进度事件 - 所有修改进度的操作都表示为一条事件
+
+事件是一个字典，op 字段表示类型:
+    answer           答题结果: exam_id, question_id, correct, user_answer, session_id, timestamp
+    session          交卷会话: exam_id, session_id, accuracy, timestamp, score（可选）
+    total_questions  试卷总题数: exam_id, total_questions
+    clear_exam       清除试卷进度: exam_id
+    batch            一组事件（如一次交卷），作为一个整体写入和回放: events
+
+UserProgressManager 直接修改内存数据与存储层回放日志使用同一套处理函数，保证两者结果一致。
+
+每份试卷的汇总数据在处理事件时以 O(1) 增量维护，并随进度数据一起保存:
+    last_correct_count     最后一次作答正确的题目数
+    last_session_accuracy  上次交卷正确率
+    best_score             最高得分（交卷事件带有 score 时更新）
+    session_index          按会话ID统计: {session_id: {attempts, correct, first_timestamp, last_timestamp,
+                           accuracy（交卷时记录）, score（交卷带得分时记录）}}，按会话开始的先后排列
+    last_session_id        最近一次答题所属的会话ID（最近一次答题没有会话ID时为 None）
+已做题目数即 questions 的长度。旧版本的进度数据在加载时由 prepare_progress_data 补齐
+（会话索引根据保留的答题历史重建，已汇总到 history_summary 的旧记录无法按会话还原）。
+
+历史记录保留策略：进度数据顶层的 history_limit 为每道题逐条保留的最近答题记录数（None 表示不限），
+超出的旧记录汇总到题目的 history_summary（attempts / correct / first_timestamp / last_timestamp）后删除。
+session_limit 为每份试卷保留的最近会话数（None 表示不限）：交卷记录 sessions 只保留最近的条目，
+会话索引中超出的最早会话（最近一次答题所属的会话除外）汇总到试卷的 session_summary
+（sessions / submitted / attempts / correct / first_timestamp / last_timestamp）后删除。
+题目的 attempts、correct 等累计统计不受影响。
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+
+def new_progress_data() -> Dict[str, Any]:
+    """空的进度数据"""
+    return {
+        "version": "1.0",
+        "last_updated": datetime.now().isoformat(),
+        "exams": {},  # 按试卷ID存储进度
+        "daily_stats": {}  # 按日期存储统计（向后兼容）
+    }
+
+
+def _new_exam_record(total_questions: int = 0) -> Dict[str, Any]:
+    """新试卷的进度记录"""
+    return {
+        "total_attempts": 0,
+        "correct_attempts": 0,
+        "questions": {},
+        "last_attempt": None,
+        "best_score": 0,
+        "total_questions": total_questions,  # 将在首次加载试卷时更新
+        "last_correct_count": 0,  # 最后一次作答正确的题目数
+        "session_index": {}  # 会话ID -> 该次会话的答题统计
+    }
+
+
+def _session_entry(exam_data: Dict[str, Any], session_id: str, timestamp: Optional[str]) -> Dict[str, Any]:
+    """取得会话索引中的条目（不存在时创建）"""
+    index = exam_data.setdefault("session_index", {})
+    entry = index.get(session_id)
+    if entry is None:
+        entry = index[session_id] = {
+            "attempts": 0,
+            "correct": 0,
+            "first_timestamp": timestamp,
+            "last_timestamp": timestamp
+        }
+    return entry
+
+
+def _index_answer(exam_data: Dict[str, Any], session_id: Optional[str], is_correct: bool,
+                  timestamp: Optional[str]) -> None:
+    """把一次答题计入会话索引（没有会话ID的答题不计入，只清除 last_session_id）"""
+    if not session_id:
+        exam_data["last_session_id"] = None
+        return
+    entry = _session_entry(exam_data, session_id, timestamp)
+    entry["attempts"] += 1
+    if is_correct:
+        entry["correct"] += 1
+    entry["last_timestamp"] = timestamp
+    exam_data["last_session_id"] = session_id
+
+
+def _build_session_index(exam_data: Dict[str, Any]) -> None:
+    """根据保留的答题历史和交卷记录重建会话索引（ISO 时间戳按字符串排序，不需要解析）"""
+    records = [record for q in exam_data.get("questions", {}).values() for record in q.get("history", [])]
+    records.sort(key=lambda record: record.get("timestamp") or "")
+    exam_data["session_index"] = {}
+    for record in records:
+        _index_answer(exam_data, record.get("session_id"), record.get("correct", False), record.get("timestamp"))
+    for session in exam_data.get("sessions", []):
+        _index_session(exam_data, session)
+
+
+def _index_session(exam_data: Dict[str, Any], session: Dict[str, Any]) -> None:
+    """把交卷记录的正确率和得分计入会话索引"""
+    entry = _session_entry(exam_data, session["session_id"], session.get("timestamp"))
+    entry["accuracy"] = session.get("accuracy")
+    if session.get("score") is not None:
+        entry["score"] = session["score"]
+
+
+def prepare_progress_data(progress_data: Dict[str, Any]) -> Dict[str, Any]:
+    """为旧版本的进度数据补齐增量维护的汇总字段（加载后、回放日志前调用）"""
+    for exam_data in progress_data.get("exams", {}).values():
+        if "last_correct_count" not in exam_data:
+            exam_data["last_correct_count"] = sum(
+                1 for q in exam_data.get("questions", {}).values() if q.get("last_correct", False))
+        if "session_index" not in exam_data:
+            _build_session_index(exam_data)
+    return progress_data
+
+
+def trim_history(question_data: Dict[str, Any], limit: Optional[int]) -> int:
+    """
+    按保留策略截断题目的答题历史，被移除的记录汇总到 history_summary
+
+    Returns:
+        移除的记录数
+    """
+    history = question_data.get("history", [])
+    if limit is None or len(history) <= limit:
+        return 0
+    excess = len(history) - limit
+    summary = question_data.setdefault("history_summary", {
+        "attempts": 0,
+        "correct": 0,
+        "first_timestamp": None,
+        "last_timestamp": None
+    })
+    for record in history[:excess]:
+        summary["attempts"] += 1
+        if record.get("correct"):
+            summary["correct"] += 1
+        if summary["first_timestamp"] is None:
+            summary["first_timestamp"] = record.get("timestamp")
+        summary["last_timestamp"] = record.get("timestamp")
+    del history[:excess]
+    return excess
+
+
+def trim_sessions(exam_data: Dict[str, Any], limit: Optional[int]) -> int:
+    """
+    按保留策略截断试卷的交卷记录和会话索引，被移除的会话汇总到 session_summary
+
+    Returns:
+        移除的交卷记录数与会话索引条目数之和
+    """
+    if limit is None:
+        return 0
+    removed = 0
+    sessions = exam_data.get("sessions")
+    if sessions and len(sessions) > limit:
+        removed = len(sessions) - limit
+        del sessions[:removed]
+
+    index = exam_data.get("session_index", {})
+    excess = len(index) - limit
+    if excess <= 0:
+        return removed
+    # 会话索引按会话开始的先后排列，从最早的会话开始移除（最近一次答题所属的会话始终保留）
+    last_session_id = exam_data.get("last_session_id")
+    expired = [session_id for session_id in index if session_id != last_session_id][:excess]
+    summary = exam_data.setdefault("session_summary", {
+        "sessions": 0,
+        "submitted": 0,
+        "attempts": 0,
+        "correct": 0,
+        "first_timestamp": None,
+        "last_timestamp": None
+    })
+    for session_id in expired:
+        entry = index.pop(session_id)
+        summary["sessions"] += 1
+        if entry.get("accuracy") is not None:
+            summary["submitted"] += 1
+        summary["attempts"] += entry["attempts"]
+        summary["correct"] += entry["correct"]
+        if summary["first_timestamp"] is None:
+            summary["first_timestamp"] = entry.get("first_timestamp")
+        summary["last_timestamp"] = entry.get("last_timestamp")
+    return removed + len(expired)
+
+
+def _apply_answer(progress_data: Dict[str, Any], event: Dict[str, Any]) -> None:
+    """答题事件：更新题目和试卷的统计"""
+    exams = progress_data["exams"]
+    exam_id = event["exam_id"]
+    question_id = event["question_id"]
+    is_correct = event["correct"]
+    timestamp = event["timestamp"]
+
+    # 确保试卷记录存在
+    if exam_id not in exams:
+        exams[exam_id] = _new_exam_record()
+    exam_data = exams[exam_id]
+
+    # 确保题目记录存在
+    question_data = exam_data["questions"].get(question_id)
+    if question_data is None:
+        question_data = exam_data["questions"][question_id] = {
+            "attempts": 0,
+            "correct": 0,
+            "last_attempt": None,
+            "last_correct": False,  # 最后一次是否正确
+            "history": []
+        }
+    was_correct = bool(question_data["last_correct"])
+
+    # 记录本次答题
+    question_data["history"].append({
+        "timestamp": timestamp,
+        "correct": is_correct,
+        "user_answer": event.get("user_answer") or [],
+        "session_id": event.get("session_id")  # 记录会话ID
+    })
+    trim_history(question_data, progress_data.get("history_limit"))
+    question_data["attempts"] += 1
+    if is_correct:
+        question_data["correct"] += 1
+    question_data["last_attempt"] = timestamp
+    question_data["last_correct"] = is_correct  # 记录最后一次是否正确
+
+    # 更新试卷统计
+    exam_data["total_attempts"] += 1
+    if is_correct:
+        exam_data["correct_attempts"] += 1
+    exam_data["last_attempt"] = timestamp
+    exam_data["last_correct_count"] += bool(is_correct) - was_correct
+    _index_answer(exam_data, event.get("session_id"), is_correct, timestamp)
+    trim_sessions(exam_data, progress_data.get("session_limit"))
+
+
+def _apply_session(progress_data: Dict[str, Any], event: Dict[str, Any]) -> None:
+    """交卷事件：记录会话正确率"""
+    exams = progress_data["exams"]
+    exam_id = event["exam_id"]
+    if exam_id not in exams:
+        exams[exam_id] = dict(_new_exam_record(),
+                              last_session_accuracy=0,  # 上次交卷正确率
+                              sessions=[])  # 交卷会话历史
+    exam_data = exams[exam_id]
+
+    if "sessions" not in exam_data:
+        exam_data["sessions"] = []
+    session = {
+        "session_id": event["session_id"],
+        "timestamp": event["timestamp"],
+        "accuracy": event["accuracy"]
+    }
+    exam_data["sessions"].append(session)
+    _index_session(exam_data, dict(session, score=event.get("score")))
+    trim_sessions(exam_data, progress_data.get("session_limit"))
+    exam_data["last_session_accuracy"] = event["accuracy"]
+    exam_data["last_attempt"] = event["timestamp"]
+    score = event.get("score")
+    if score is not None and score > exam_data.get("best_score", 0):
+        exam_data["best_score"] = score
+
+
+def _apply_total_questions(progress_data: Dict[str, Any], event: Dict[str, Any]) -> None:
+    """更新试卷总题数"""
+    exams = progress_data["exams"]
+    exam_id = event["exam_id"]
+    if exam_id not in exams:
+        exams[exam_id] = _new_exam_record(event["total_questions"])
+    else:
+        exams[exam_id]["total_questions"] = event["total_questions"]
+
+
+def _apply_clear_exam(progress_data: Dict[str, Any], event: Dict[str, Any]) -> None:
+    """清除试卷进度"""
+    progress_data["exams"].pop(event["exam_id"], None)
+
+
+def _apply_batch(progress_data: Dict[str, Any], event: Dict[str, Any]) -> None:
+    """按顺序应用一组事件"""
+    for child in event["events"]:
+        apply_event(progress_data, child)
+
+
+# 事件类型 -> 处理函数（新增的修改操作都应以事件的形式记录）
+_EVENT_HANDLERS = {
+    "answer": _apply_answer,
+    "session": _apply_session,
+    "total_questions": _apply_total_questions,
+    "clear_exam": _apply_clear_exam,
+    "batch": _apply_batch,
+}
+
+
+def apply_event(progress_data: Dict[str, Any], event: Dict[str, Any]) -> None:
+    """把一条事件应用到进度数据上（未知类型的事件忽略）"""
+    handler = _EVENT_HANDLERS.get(event.get("op"))
+    if handler is not None:
+        handler(progress_data, event)
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+用户进度的 JSON 存储 - 快照 + 只追加的 JSON Lines 事件日志
+
+每次答题、交卷等修改只向日志末尾追加一行事件，写入开销与进度文件大小无关；
+进度快照（user_progress.json）只在压缩时整体重写，格式见 progress_codec（默认为紧凑 JSON）。
+
+日志第一行为头部 {"journal": 日志ID, "version": 版本}，快照中记录对应的 journal_id：
+压缩时先原子替换快照，再原子替换为新的空日志。若两步之间程序崩溃，
+旧日志的ID与新快照不一致，启动时会被忽略，不会重复回放已经写入快照的事件。
+程序崩溃导致最后一行不完整时，回放到最后一条完整事件为止。
+一次写入多条事件（如一次交卷）时合并为一行 batch 事件，保证整组事件要么全部回放，要么全部丢弃。
+
+多个进程共用数据目录时（由 UserProgressManager 的文件锁串行化写入），
+changed() 按快照的修改时间/大小和日志长度检测其他进程的写入；
+只是日志被追加时，refresh() 只回放新追加的事件，不重新读取快照。
+"""
+
+import json
+import os
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from .progress_codec import encode_snapshot, get_serializer, read_snapshot
+from .progress_events import apply_event, new_progress_data, prepare_progress_data
+
+JOURNAL_SUFFIX = '.journal'
+JOURNAL_VERSION = 1
+
+# 日志累积的事件数达到此值时压缩为快照
+JOURNAL_COMPACT_EVENTS = 2000
+
+
+def new_journal_id() -> str:
+    """生成新的日志ID"""
+    return uuid.uuid4().hex
+
+
+class ProgressJournal:
+    """只追加的进度事件日志"""
+
+    def __init__(self, journal_file: str):
+        """
+        Args:
+            journal_file: 日志文件路径
+        """
+        self.journal_file = journal_file
+        self.journal_id: Optional[str] = None
+        self.event_count = 0
+        self.offset = 0  # 已读取或写入到的字节位置
+
+    @staticmethod
+    def _parse_events(lines: List[bytes]) -> Tuple[List[Dict[str, Any]], bool]:
+        """解析事件行，返回 (事件列表, 是否遇到不完整的记录)"""
+        events = []
+        for line in lines:
+            if not line:
+                continue
+            try:
+                event = json.loads(line)
+            except ValueError:
+                # 写入中途崩溃留下的不完整记录，之后的内容都不可信
+                return events, True
+            if isinstance(event, dict):
+                events.append(event)
+        return events, False
+
+    def read(self) -> Tuple[Optional[str], List[Dict[str, Any]], bool]:
+        """
+        读取日志
+
+        Returns:
+            (日志ID, 事件列表, 末尾是否有不完整的记录)；日志不存在或头部无效时日志ID为 None
+        """
+        try:
+            with open(self.journal_file, 'rb') as f:
+                content = f.read()
+        except OSError:
+            return None, [], False
+
+        lines = content.split(b'\n')
+        try:
+            header = json.loads(lines[0])
+        except ValueError:
+            return None, [], bool(lines[0])
+        if not isinstance(header, dict) or header.get('version') != JOURNAL_VERSION:
+            return None, [], False
+
+        events, torn = self._parse_events(lines[1:])
+        self.journal_id = header.get('journal')
+        self.event_count = len(events)
+        self.offset = len(content)
+        return self.journal_id, events, torn
+
+    def read_tail(self) -> Optional[List[Dict[str, Any]]]:
+        """
+        读取上次读取或写入之后其他进程追加的完整事件
+
+        Returns:
+            事件列表；日志被替换或末尾记录不完整时返回 None（需要完整重新加载）
+        """
+        try:
+            with open(self.journal_file, 'rb') as f:
+                f.seek(self.offset)
+                content = f.read()
+        except OSError:
+            return None
+        if content and not content.endswith(b'\n'):
+            return None
+        events, torn = self._parse_events(content.split(b'\n'))
+        if torn:
+            return None
+        self.event_count += len(events)
+        self.offset += len(content)
+        return events
+
+    def size(self) -> int:
+        """日志文件当前的字节数（不存在时为 0）"""
+        try:
+            return os.path.getsize(self.journal_file)
+        except OSError:
+            return 0
+
+    def append(self, events: List[Dict[str, Any]]) -> None:
+        """追加一组事件（一次写入后关闭文件，不长期占用文件句柄，其他进程可以替换日志）"""
+        content = ''.join(json.dumps(event, ensure_ascii=False, separators=(',', ':')) + '\n'
+                          for event in events).encode('utf-8')
+        with open(self.journal_file, 'ab') as f:
+            f.write(content)
+            self.offset = f.tell()
+        self.event_count += len(events)
+
+    def reset(self, journal_id: str) -> None:
+        """以新的日志ID开始一个空日志（临时文件 + 原子替换）"""
+        content = (json.dumps({'journal': journal_id, 'version': JOURNAL_VERSION}) + '\n').encode('utf-8')
+        temp_file = self.journal_file + '.tmp'
+        with open(temp_file, 'wb') as f:
+            f.write(content)
+        os.replace(temp_file, self.journal_file)
+        self.journal_id = journal_id
+        self.event_count = 0
+        self.offset = len(content)
+
+    def close(self) -> None:
+        """日志不保持打开的文件句柄，无需关闭"""
+
+
+class JsonProgressStore:
+    """
+    快照 + 日志的进度存储
+
+    与 SQLiteProgressStore 接口相同: load / record / checkpoint / close
+    """
+
+    def __init__(self, progress_file: str, compact_events: int = JOURNAL_COMPACT_EVENTS,
+                 serializer: Optional[str] = None):
+        """
+        Args:
+            progress_file: 快照文件路径（日志文件与之同名，后缀为 .journal）
+            compact_events: 日志累积多少条事件后压缩为快照
+            serializer: 快照的序列化方式（json / msgpack，None 表示 json）；读取时按文件头部自动识别
+        """
+        self.progress_file = progress_file
+        self.compact_events = compact_events
+        self.serializer = get_serializer(serializer)
+        self.journal = ProgressJournal(os.path.splitext(progress_file)[0] + JOURNAL_SUFFIX)
+        self._snapshot_stat = None  # 上次读取或写入后快照的 (修改时间, 大小)
+
+    def _stat_snapshot(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.progress_file)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def load(self) -> Dict[str, Any]:
+        """
+        读取快照并回放日志中的后续事件
+
+        Returns:
+            用户进度数据字典
+        """
+        progress_data = None
+        self._snapshot_stat = self._stat_snapshot()
+        if os.path.exists(self.progress_file):
+            try:
+                progress_data = read_snapshot(self.progress_file)
+            except Exception as e:
+                print(f"加载用户进度数据失败: {e}")
+
+        if progress_data is None:
+            # 初始化数据结构
+            progress_data = new_progress_data()
+        prepare_progress_data(progress_data)
+
+        # 只回放属于当前快照的日志（ID不一致说明日志中的事件已写入快照）
+        journal_id, events, torn = self.journal.read()
+        if journal_id is not None and journal_id == progress_data.get("journal_id"):
+            for event in events:
+                try:
+                    apply_event(progress_data, event)
+                except Exception as e:
+                    print(f"回放进度日志失败: {e}")
+            if torn or len(events) >= self.compact_events:
+                # 日志末尾不完整或过长：立即压缩，之后的追加从新的日志开始
+                self.checkpoint(progress_data)
+        return progress_data
+
+    def record(self, progress_data: Dict[str, Any], events: List[Dict[str, Any]]) -> bool:
+        """
+        持久化已应用到 progress_data 的事件
+
+        Returns:
+            是否保存成功
+        """
+        # 快照与日志不对应（首次运行、旧版本的进度文件或上次压缩失败）时，直接写入快照
+        if self.journal.journal_id is None or self.journal.journal_id != progress_data.get("journal_id"):
+            return self.checkpoint(progress_data)
+        if len(events) > 1:
+            events = [{"op": "batch", "events": events}]
+        try:
+            self.journal.append(events)
+        except Exception as e:
+            print(f"写入进度日志失败: {e}")
+            return self.checkpoint(progress_data)
+
+        if self.journal.event_count >= self.compact_events:
+            return self.checkpoint(progress_data)
+        return True
+
+    def checkpoint(self, progress_data: Dict[str, Any]) -> bool:
+        """
+        把全部进度写入快照（临时文件 + 原子替换）并清空日志
+
+        Returns:
+            是否保存成功
+        """
+        try:
+            journal_id = new_journal_id()
+            progress_data["last_updated"] = datetime.now().isoformat()
+            progress_data["journal_id"] = journal_id
+            content = encode_snapshot(progress_data, self.serializer)
+            temp_file = self.progress_file + '.tmp'
+            with open(temp_file, 'wb') as f:
+                f.write(content)
+            os.replace(temp_file, self.progress_file)
+            self.journal.reset(journal_id)
+            self._snapshot_stat = self._stat_snapshot()
+            return True
+        except Exception as e:
+            print(f"保存用户进度数据失败: {e}")
+            return False
+
+    def changed(self) -> bool:
+        """其他进程是否在上次读取或写入之后修改过快照或日志（只检查文件状态）"""
+        return self._stat_snapshot() != self._snapshot_stat or self.journal.size() != self.journal.offset
+
+    def refresh(self, progress_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        把其他进程的修改合并到 progress_data（只追加了日志时只回放新事件，否则完整重新加载）
+
+        Returns:
+            最新的进度数据（可能是新的字典）
+        """
+        if self._stat_snapshot() == self._snapshot_stat and self.journal.journal_id == progress_data.get("journal_id"):
+            events = self.journal.read_tail()
+            if events is not None:
+                for event in events:
+                    apply_event(progress_data, event)
+                return progress_data
+        return self.load()
+
+    def storage_files(self) -> List[str]:
+        """存储使用的文件"""
+        return [self.progress_file, self.journal.journal_file]
+
+    def vacuum(self) -> None:
+        """快照每次都完整重写，无需额外整理"""
+
+    def close(self) -> None:
+        self.journal.close()
@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+用户进度的 SQLite 存储（可选）
+
+表结构:
+    meta       顶层字段（version、last_updated、daily_stats 等，值为 JSON）
+    exams      每份试卷的统计
+    questions  每道题的统计，主键 (exam_id, question_id)
+    attempts   答题记录，索引 (exam_id, question_id) 和 timestamp
+    sessions   交卷记录，索引 (exam_id, timestamp)
+    session_stats  会话索引（见 progress_events 的 session_index），主键 (exam_id, session_id)
+表中没有单独列的字段以 JSON 保存在 extra 列，内存中的进度数据结构与 JSON 存储完全相同。
+
+数据库使用 WAL 模式；一次 record 调用（如一次交卷）中的全部事件在同一个事务中写入，
+只插入新的答题/交卷记录并更新受影响的试卷、题目和会话行，写入开销与历史记录数和会话数无关。
+其他进程（其他连接）的提交通过 PRAGMA data_version 检测，见 changed()。
+"""
+
+import json
+import threading
+from typing import Any, Dict, List, Optional
+
+from .progress_events import new_progress_data, prepare_progress_data
+
+# 尝试导入sqlite3（部分精简的 Python 发行版不包含）
+try:
+    import sqlite3
+    SQLITE_AVAILABLE = True
+except ImportError:
+    sqlite3 = None
+    SQLITE_AVAILABLE = False
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS exams (
+    exam_id TEXT PRIMARY KEY,
+    total_attempts INTEGER NOT NULL DEFAULT 0,
+    correct_attempts INTEGER NOT NULL DEFAULT 0,
+    last_attempt TEXT,
+    best_score NUMERIC,
+    total_questions INTEGER NOT NULL DEFAULT 0,
+    last_session_accuracy REAL,
+    extra TEXT
+);
+CREATE TABLE IF NOT EXISTS questions (
+    exam_id TEXT NOT NULL,
+    question_id TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    correct INTEGER NOT NULL DEFAULT 0,
+    last_attempt TEXT,
+    last_correct INTEGER NOT NULL DEFAULT 0,
+    extra TEXT,
+    PRIMARY KEY (exam_id, question_id)
+);
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    exam_id TEXT NOT NULL,
+    question_id TEXT NOT NULL,
+    timestamp TEXT,
+    correct INTEGER NOT NULL,
+    user_answer TEXT,
+    session_id TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_attempts_question ON attempts (exam_id, question_id);
+CREATE INDEX IF NOT EXISTS idx_attempts_timestamp ON attempts (timestamp);
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    exam_id TEXT NOT NULL,
+    session_id TEXT,
+    timestamp TEXT,
+    accuracy REAL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_exam ON sessions (exam_id, timestamp);
+CREATE TABLE IF NOT EXISTS session_stats (
+    exam_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    correct INTEGER NOT NULL DEFAULT 0,
+    first_timestamp TEXT,
+    last_timestamp TEXT,
+    accuracy REAL,
+    score NUMERIC,
+    PRIMARY KEY (exam_id, session_id)
+);
+"""
+
+# 有单独列的字段（其余字段保存在 extra 列）
+EXAM_COLUMNS = ('total_attempts', 'correct_attempts', 'last_attempt', 'best_score', 'total_questions',
+                'last_session_accuracy')
+QUESTION_COLUMNS = ('attempts', 'correct', 'last_attempt', 'last_correct')
+SESSION_STATS_COLUMNS = ('attempts', 'correct', 'first_timestamp', 'last_timestamp', 'accuracy', 'score')
+_EXAM_CHILDREN = ('questions', 'sessions', 'session_index')
+_QUESTION_CHILDREN = ('history',)
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def _extra(record: Dict[str, Any], columns: tuple, children: tuple) -> Optional[str]:
+    """没有单独列的字段编码为 JSON（没有时为 NULL）"""
+    extra = {key: value for key, value in record.items() if key not in columns and key not in children}
+    return _dumps(extra) if extra else None
+
+
+class SQLiteProgressStore:
+    """
+    SQLite 进度存储
+
+    与 JsonProgressStore 接口相同: load / record / checkpoint / close
+    """
+
+    def __init__(self, db_file: str):
+        """
+        Args:
+            db_file: 数据库文件路径（不存在时自动创建）
+        """
+        if not SQLITE_AVAILABLE:
+            raise RuntimeError("当前 Python 环境不支持 sqlite3，无法使用 SQLite 进度存储")
+        self.db_file = db_file
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+        self._data_version = None  # 上次读取或写入后的 data_version（只随其他连接的提交变化）
+
+    def _read_data_version(self) -> int:
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def load(self) -> Dict[str, Any]:
+        """
+        从数据库重建进度数据
+
+        Returns:
+            用户进度数据字典（结构与 JSON 存储相同）
+        """
+        progress_data = new_progress_data()
+        with self._lock:
+            conn = self._conn
+            self._data_version = self._read_data_version()
+            for key, value in conn.execute("SELECT key, value FROM meta"):
+                progress_data[key] = json.loads(value)
+
+            exams = progress_data["exams"] = {}
+            for row in conn.execute(f"SELECT exam_id, {', '.join(EXAM_COLUMNS)}, extra FROM exams"):
+                exam_id, total_attempts, correct_attempts, last_attempt, best_score, total_questions, \
+                    last_session_accuracy, extra = row
+                exam = {
+                    "total_attempts": total_attempts,
+                    "correct_attempts": correct_attempts,
+                    "questions": {},
+                    "last_attempt": last_attempt,
+                    "best_score": best_score,
+                    "total_questions": total_questions,
+                }
+                if last_session_accuracy is not None:
+                    exam["last_session_accuracy"] = last_session_accuracy
+                if extra:
+                    exam.update(json.loads(extra))
+                exams[exam_id] = exam
+
+            for row in conn.execute(f"SELECT exam_id, question_id, {', '.join(QUESTION_COLUMNS)}, extra FROM questions"):
+                exam_id, question_id, attempts, correct, last_attempt, last_correct, extra = row
+                exam = exams.get(exam_id)
+                if exam is None:
+                    continue
+                question = {
+                    "attempts": attempts,
+                    "correct": correct,
+                    "last_attempt": last_attempt,
+                    "last_correct": bool(last_correct),
+                    "history": [],
+                }
+                if extra:
+                    question.update(json.loads(extra))
+                exam["questions"][question_id] = question
+
+            for exam_id, question_id, timestamp, correct, user_answer, session_id in conn.execute(
+                    "SELECT exam_id, question_id, timestamp, correct, user_answer, session_id FROM attempts ORDER BY id"):
+                question = exams.get(exam_id, {}).get("questions", {}).get(question_id)
+                if question is not None:
+                    question["history"].append({
+                        "timestamp": timestamp,
+                        "correct": bool(correct),
+                        "user_answer": json.loads(user_answer) if user_answer else [],
+                        "session_id": session_id,
+                    })
+
+            for exam_id, session_id, timestamp, accuracy in conn.execute(
+                    "SELECT exam_id, session_id, timestamp, accuracy FROM sessions ORDER BY id"):
+                exam = exams.get(exam_id)
+                if exam is not None:
+                    exam.setdefault("sessions", []).append({
+                        "session_id": session_id,
+                        "timestamp": timestamp,
+                        "accuracy": accuracy,
+                    })
+
+            # 会话索引按插入顺序（即会话开始的先后）读取
+            session_indexes = {}
+            for row in conn.execute(
+                    f"SELECT exam_id, session_id, {', '.join(SESSION_STATS_COLUMNS)} FROM session_stats ORDER BY rowid"):
+                exam_id, session_id, attempts, correct, first_timestamp, last_timestamp, accuracy, score = row
+                entry = {"attempts": attempts, "correct": correct,
+                         "first_timestamp": first_timestamp, "last_timestamp": last_timestamp}
+                if accuracy is not None:
+                    entry["accuracy"] = accuracy
+                if score is not None:
+                    entry["score"] = score
+                session_indexes.setdefault(exam_id, {})[session_id] = entry
+            for exam_id, session_index in session_indexes.items():
+                if exam_id in exams:
+                    exams[exam_id]["session_index"] = session_index
+
+            prepare_progress_data(progress_data)
+            # 旧数据库没有 session_stats 表（或会话索引保存在 extra 列）：补写一次
+            with conn:
+                for exam_id, exam in exams.items():
+                    if exam_id not in session_indexes:
+                        for session_id, entry in exam.get("session_index", {}).items():
+                            self._upsert_session_stats(conn, exam_id, session_id, entry)
+        return progress_data
+
+    @staticmethod
+    def _upsert_exam(conn, exam_id: str, exam: Dict[str, Any]) -> None:
+        conn.execute(
+            f"INSERT OR REPLACE INTO exams (exam_id, {', '.join(EXAM_COLUMNS)}, extra) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (exam_id, exam.get("total_attempts", 0), exam.get("correct_attempts", 0), exam.get("last_attempt"),
+             exam.get("best_score", 0), exam.get("total_questions", 0), exam.get("last_session_accuracy"),
+             _extra(exam, EXAM_COLUMNS, _EXAM_CHILDREN)))
+
+    @staticmethod
+    def _upsert_question(conn, exam_id: str, question_id: str, question: Dict[str, Any]) -> None:
+        conn.execute(
+            f"INSERT OR REPLACE INTO questions (exam_id, question_id, {', '.join(QUESTION_COLUMNS)}, extra) "
+            f"VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (exam_id, question_id, question.get("attempts", 0), question.get("correct", 0),
+             question.get("last_attempt"), bool(question.get("last_correct")),
+             _extra(question, QUESTION_COLUMNS, _QUESTION_CHILDREN)))
+
+    @staticmethod
+    def _upsert_session_stats(conn, exam_id: str, session_id: str, entry: Dict[str, Any]) -> None:
+        # 使用 UPSERT 而不是 REPLACE，保持行的插入顺序
+        conn.execute(
+            f"INSERT INTO session_stats (exam_id, session_id, {', '.join(SESSION_STATS_COLUMNS)}) "
+            f"VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (exam_id, session_id) DO UPDATE SET "
+            f"{', '.join(f'{column} = excluded.{column}' for column in SESSION_STATS_COLUMNS)}",
+            (exam_id, session_id, entry.get("attempts", 0), entry.get("correct", 0), entry.get("first_timestamp"),
+             entry.get("last_timestamp"), entry.get("accuracy"), entry.get("score")))
+
+    @staticmethod
+    def _trim_sessions(conn, exam_id: str, exam: Dict[str, Any]) -> None:
+        """与内存中按保留策略截断后的交卷记录和会话索引保持一致（超出的旧会话已汇总到 session_summary）"""
+        conn.execute(
+            "DELETE FROM sessions WHERE id IN (SELECT id FROM sessions WHERE exam_id = ? "
+            "ORDER BY id DESC LIMIT -1 OFFSET ?)", (exam_id, len(exam.get("sessions", []))))
+        session_index = exam.get("session_index", {})
+        count = conn.execute("SELECT COUNT(*) FROM session_stats WHERE exam_id = ?", (exam_id,)).fetchone()[0]
+        if count > len(session_index):
+            stale = [(exam_id, session_id) for (session_id,) in conn.execute(
+                "SELECT session_id FROM session_stats WHERE exam_id = ?", (exam_id,))
+                if session_id not in session_index]
+            conn.executemany("DELETE FROM session_stats WHERE exam_id = ? AND session_id = ?", stale)
+
+    @staticmethod
+    def _delete_exam(conn, exam_id: str) -> None:
+        for table in ('exams', 'questions', 'attempts', 'sessions', 'session_stats'):
+            conn.execute(f"DELETE FROM {table} WHERE exam_id = ?", (exam_id,))
+
+    def record(self, progress_data: Dict[str, Any], events: List[Dict[str, Any]]) -> bool:
+        """
+        在一个事务中持久化已应用到 progress_data 的事件
+
+        Returns:
+            是否保存成功
+        """
+        exams = progress_data["exams"]
+        touched_exams = set()
+        touched_questions = set()
+        touched_sessions = set()
+        try:
+            with self._lock, self._conn as conn:
+                for event in events:
+                    op = event.get("op")
+                    exam_id = event.get("exam_id")
+                    if op == "clear_exam":
+                        self._delete_exam(conn, exam_id)
+                        continue
+                    touched_exams.add(exam_id)
+                    if event.get("session_id"):
+                        touched_sessions.add((exam_id, event["session_id"]))
+                    if op == "answer":
+                        touched_questions.add((exam_id, event["question_id"]))
+                        conn.execute(
+                            "INSERT INTO attempts (exam_id, question_id, timestamp, correct, user_answer, session_id) "
+                            "VALUES (?, ?, ?, ?, ?, ?)",
+                            (exam_id, event["question_id"], event.get("timestamp"), bool(event["correct"]),
+                             _dumps(event.get("user_answer") or []), event.get("session_id")))
+                    elif op == "session":
+                        conn.execute(
+                            "INSERT INTO sessions (exam_id, session_id, timestamp, accuracy) VALUES (?, ?, ?, ?)",
+                            (exam_id, event.get("session_id"), event.get("timestamp"), event.get("accuracy")))
+
+                # 受影响的试卷和题目按内存中的最新状态写入
+                for exam_id in touched_exams:
+                    if exam_id in exams:
+                        self._upsert_exam(conn, exam_id, exams[exam_id])
+                for exam_id, question_id in touched_questions:
+                    question = exams.get(exam_id, {}).get("questions", {}).get(question_id)
+                    if question is not None:
+                        self._upsert_question(conn, exam_id, question_id, question)
+                        # 与内存中按保留策略截断后的历史保持一致：只保留最近的记录
+                        conn.execute(
+                            "DELETE FROM attempts WHERE id IN (SELECT id FROM attempts WHERE exam_id = ? AND "
+                            "question_id = ? ORDER BY id DESC LIMIT -1 OFFSET ?)",
+                            (exam_id, question_id, len(question.get("history", []))))
+                for exam_id, session_id in touched_sessions:
+                    entry = exams.get(exam_id, {}).get("session_index", {}).get(session_id)
+                    if entry is not None:
+                        self._upsert_session_stats(conn, exam_id, session_id, entry)
+                # 新会话写入后再按保留策略删除已汇总的旧会话
+                for exam_id in touched_exams:
+                    if exam_id in exams:
+                        self._trim_sessions(conn, exam_id, exams[exam_id])
+                self._data_version = self._read_data_version()
+            return True
+        except Exception as e:
+            print(f"保存用户进度数据失败: {e}")
+            return False
+
+    def checkpoint(self, progress_data: Dict[str, Any]) -> bool:
+        """
+        在一个事务中用 progress_data 替换数据库中的全部进度（迁移、批量修改后使用）
+
+        Returns:
+            是否保存成功
+        """
+        try:
+            with self._lock, self._conn as conn:
+                for table in ('meta', 'exams', 'questions', 'attempts', 'sessions', 'session_stats'):
+                    conn.execute(f"DELETE FROM {table}")
+                conn.executemany(
+                    "INSERT INTO meta (key, value) VALUES (?, ?)",
+                    [(key, _dumps(value)) for key, value in progress_data.items()
+                     if key not in ("exams", "journal_id")])
+
+                for exam_id, exam in progress_data.get("exams", {}).items():
+                    self._upsert_exam(conn, exam_id, exam)
+                    for question_id, question in exam.get("questions", {}).items():
+                        self._upsert_question(conn, exam_id, question_id, question)
+                        conn.executemany(
+                            "INSERT INTO attempts (exam_id, question_id, timestamp, correct, user_answer, session_id) "
+                            "VALUES (?, ?, ?, ?, ?, ?)",
+                            [(exam_id, question_id, record.get("timestamp"), bool(record.get("correct")),
+                              _dumps(record.get("user_answer") or []), record.get("session_id"))
+                             for record in question.get("history", [])])
+                    conn.executemany(
+                        "INSERT INTO sessions (exam_id, session_id, timestamp, accuracy) VALUES (?, ?, ?, ?)",
+                        [(exam_id, session.get("session_id"), session.get("timestamp"), session.get("accuracy"))
+                         for session in exam.get("sessions", [])])
+                    for session_id, entry in exam.get("session_index", {}).items():
+                        self._upsert_session_stats(conn, exam_id, session_id, entry)
+                self._data_version = self._read_data_version()
+            return True
+        except Exception as e:
+            print(f"保存用户进度数据失败: {e}")
+            return False
+
+    def changed(self) -> bool:
+        """其他进程是否在上次读取或写入之后提交过修改"""
+        with self._lock:
+            return self._read_data_version() != self._data_version
+
+    def refresh(self, progress_data: Dict[str, Any]) -> Dict[str, Any]:
+        """合并其他进程的修改：从数据库重新加载（答题记录有索引，重建很快）"""
+        return self.load()
+
+    def question_history(self, exam_id: str, question_id: str) -> List[Dict[str, Any]]:
+        """按索引 (exam_id, question_id) 查询单道题的答题记录"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT timestamp, correct, user_answer, session_id FROM attempts "
+                "WHERE exam_id = ? AND question_id = ? ORDER BY id", (exam_id, question_id)).fetchall()
+        return [{"timestamp": timestamp, "correct": bool(correct),
+                 "user_answer": json.loads(user_answer) if user_answer else [], "session_id": session_id}
+                for timestamp, correct, user_answer, session_id in rows]
+
+    def attempts_between(self, start: str = None, end: str = None) -> List[tuple]:
+        """
+        按时间索引查询答题记录
+
+        Args:
+            start: 起始时间（ISO 格式，包含）
+            end: 结束时间（ISO 格式，不包含）
+
+        Returns:
+            [(exam_id, question_id, timestamp, correct, session_id), ...]，按时间排序
+        """
+        sql = "SELECT exam_id, question_id, timestamp, correct, session_id FROM attempts WHERE 1=1"
+        params = []
+        if start is not None:
+            sql += " AND timestamp >= ?"
+            params.append(start)
+        if end is not None:
+            sql += " AND timestamp < ?"
+            params.append(end)
+        with self._lock:
+            return self._conn.execute(sql + " ORDER BY timestamp", params).fetchall()
+
+    def storage_files(self) -> List[str]:
+        """存储使用的文件（含 WAL 文件）"""
+        return [self.db_file, self.db_file + '-wal', self.db_file + '-shm']
+
+    def vacuum(self) -> None:
+        """回收已删除记录占用的空间"""
+        with self._lock:
+            self._conn.execute("VACUUM")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -6,20 +6,77 @@
 
 import json
 import os
-from typing import Dict, List, Any, Optional
-from .data_encryptor import encryptor
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
+from .data_encryptor import encryptor, CONTAINER_EXTENSION
+from .lazy_exam import LazyExam, INDEXED_EXTENSION
+from .exam_metadata import build_exam_info, read_metadata_sidecar, write_metadata_sidecar
+from .exam_catalog import ExamCatalog, file_sha256
+from .exam_index import ExamIndex, sniff_exam_format, FORMAT_INDEXED, FORMAT_ENCRYPTED
+from .exam_cache import ExamCache, EXAM_CACHE_ENTRIES, EXAM_CACHE_BYTES
+from .exam_schema import validator, format_errors, SCHEMA_VERSION
+from .answer_key import AnswerKeyTable, AnswerNormalizer, TEXT_INPUT_NORMALIZERS, default_normalizer
+from .exam_grader import ExamGradeResult, grade_exam
+
+# 支持的试卷文件后缀：明文 JSON、Base64 文本加密、二进制加密容器、分段索引加密
+EXAM_FILE_SUFFIXES = ('.json', '.json.enc', CONTAINER_EXTENSION, INDEXED_EXTENSION)
+
+# 列出试卷时的并行方式：线程池（PBKDF2/AES 会释放 GIL）或进程池（适合 JSON 解析占比高的大题库）
+LIST_EXECUTOR_THREAD = 'thread'
+LIST_EXECUTOR_PROCESS = 'process'
+
+
+def default_list_workers() -> int:
+    """默认并行度：CPU 核数，上限 8（试卷数量通常不多，过多线程只会增加调度开销）"""
+    return max(1, min(8, os.cpu_count() or 1))
+
+
+def _scan_exam_file(exam_path: str, cached_sha256: Optional[str]) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """
+    处理目录缓存未命中的单个试卷文件（可在线程池或进程池中执行）
+
+    Args:
+        exam_path: 试卷文件路径
+        cached_sha256: 目录缓存中记录的内容哈希（无记录时为 None）
+
+    Returns:
+        (内容哈希, 试卷元数据)；内容哈希与缓存一致时元数据为 None，由调用方沿用缓存
+    """
+    digest = file_sha256(exam_path)
+    if digest == cached_sha256:
+        return digest, None
+    manager = QuestionManager(os.path.dirname(exam_path))
+    return digest, manager._read_exam_info(exam_path)
 
 
 class QuestionManager:
     """试题管理器"""
 
-    def __init__(self, data_dir: str = "data/exams"):
+    def __init__(self, data_dir: str = "data/exams", list_workers: int = None,
+                 list_executor: str = LIST_EXECUTOR_THREAD, cache_entries: int = EXAM_CACHE_ENTRIES,
+                 cache_bytes: int = EXAM_CACHE_BYTES, trust_validated: bool = True,
+                 answer_normalizer: AnswerNormalizer = default_normalizer,
+                 answer_type_normalizers: Dict[str, AnswerNormalizer] = None):
         """
         初始化试题管理器
 
         Args:
             data_dir: 试题数据目录路径
+            list_workers: 列出试卷时的最大并行数（None 为 CPU 核数，1 为串行）
+            list_executor: 并行方式，'thread'（默认）或 'process'
+            cache_entries: 内存中最多缓存的已加载试卷数（0 表示不缓存）
+            cache_bytes: 已加载试卷缓存的估算内存上限
+            trust_validated: 可信模式，内容未变化且已校验通过的试卷文件不再重复校验
+            answer_normalizer: 判题时的答案规范化流水线（默认与原 strip().lower() 规则相同，见 answer_key）
+            answer_type_normalizers: 按题型指定的规范化流水线 {题型: 流水线}，未列出的题型使用 answer_normalizer
         """
+        if list_executor not in (LIST_EXECUTOR_THREAD, LIST_EXECUTOR_PROCESS):
+            raise ValueError(f"不支持的并行方式: {list_executor}")
+        self.list_workers = list_workers if list_workers is not None else default_list_workers()
+        self.list_executor = list_executor
+        self.trust_validated = trust_validated
+
         self.data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), data_dir)
 
         # 确保数据目录存在
@@ -27,9 +84,39 @@ class QuestionManager:
             os.makedirs(self.data_dir)
             print(f"创建数据目录: {self.data_dir}")
 
-    def list_exams(self) -> List[Dict[str, Any]]:
+        # 试卷ID -> 文件路径的目录索引
+        self.exam_index = ExamIndex(self.data_dir)
+
+        # 试卷目录缓存（首次列出试卷时加载）
+        self._catalog: Optional[ExamCatalog] = None
+
+        # 已加载试卷的内存缓存
+        self.exam_cache = ExamCache(cache_entries, cache_bytes)
+        # 每个试卷文件一把加载锁：后台预加载与界面同时打开同一试卷时只解密一次
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._load_locks_guard = threading.Lock()
+
+        # 预编译的答案（按试卷文件和题目序号缓存，整卷判分时复用）
+        self.answer_keys = AnswerKeyTable(normalizer=answer_normalizer, type_normalizers=answer_type_normalizers)
+        # 已加载试卷的ID -> 文件路径（逐题判题时据此定位已编译的答案，无需再查目录）
+        self._exam_paths: Dict[str, str] = {}
+
+    @property
+    def catalog(self) -> ExamCatalog:
+        """试卷目录缓存（延迟加载）"""
+        if self._catalog is None:
+            self._catalog = ExamCatalog(self.data_dir)
+        return self._catalog
+
+    def list_exams(self, workers: int = None, executor: str = None) -> List[Dict[str, Any]]:
         """
         列出所有试卷（支持加密文件）
+        查找顺序：目录缓存 -> 签名的元数据旁路文件 -> 完整解密；只有发生变化的文件才会被重新读取，
+        需要重新读取的文件在线程池/进程池中并行解密。结果按文件名排序，单个文件失败不影响其他试卷
+
+        Args:
+            workers: 本次调用的最大并行数（默认使用 self.list_workers）
+            executor: 本次调用的并行方式（默认使用 self.list_executor）
 
         Returns:
             试卷列表，每个试卷包含基本信息
@@ -39,51 +126,120 @@ class QuestionManager:
         if not os.path.exists(self.data_dir):
             return exams
 
-        for filename in os.listdir(self.data_dir):
-            # 支持.json和.json.enc文件
-            if filename.endswith('.json') or filename.endswith('.json.enc'):
-                exam_path = os.path.join(self.data_dir, filename)
+        catalog = self.catalog
+        seen = []
+        infos: Dict[str, Dict[str, Any]] = {}
+        pending = []  # 目录缓存未命中的文件: (文件名, 路径, stat)
+        dir_mtime_ns = os.stat(self.data_dir).st_mtime_ns
+        with os.scandir(self.data_dir) as it:
+            for entry in it:
+                filename = entry.name
+                # 支持.json、.json.enc、.exb和.exi文件
+                if not filename.endswith(EXAM_FILE_SUFFIXES) or not entry.is_file():
+                    continue
+                seen.append(filename)
                 try:
-                    # 检查是否是加密文件
-                    if filename.endswith('.enc') or encryptor.is_encrypted_file(exam_path):
-                        # 解密文件获取基本信息
-                        with open(exam_path, 'r', encoding='utf-8') as f:
-                            encrypted_data = f.read().strip()
-                        exam_data = encryptor.decrypt_data(encrypted_data)
+                    stat = entry.stat()
+                    info = catalog.get(filename, stat)
+                    if info is None:
+                        pending.append((filename, entry.path, stat))
                     else:
-                        # 普通JSON文件
-                        with open(exam_path, 'r', encoding='utf-8') as f:
-                            exam_data = json.load(f)
-
-                    # 提取试卷基本信息
-                    exam_id = filename.replace('.json', '').replace('.enc', '')
-
-                    # 计算总题数（对于cloze_group和comprehensive类型，每个item算作一道题）
-                    total_questions = 0
-                    questions = exam_data.get('questions', [])
-                    for question in questions:
-                        question_type = question.get('type', 'single_choice')
-                        if question_type == "cloze_group" or question_type == "comprehensive":
-                            items = question.get('items', [])
-                            total_questions += len(items)
-                        else:
-                            total_questions += 1
-
-                    exam_info = {
-                        'id': exam_data.get('exam_id', exam_id),
-                        'name': exam_data.get('exam_name', '未命名试卷'),
-                        'description': exam_data.get('description', ''),
-                        'time_limit': exam_data.get('time_limit', 120),
-                        'total_questions': total_questions,
-                        'total_score': exam_data.get('total_score', 0),
-                        'file_path': exam_path
-                    }
-                    exams.append(exam_info)
-                except Exception as e:
+                        infos[filename] = info
+                except OSError as e:
                     print(f"读取试卷文件 {filename} 失败: {e}")
 
+        # 同一次遍历的结果用于更新试卷ID索引
+        self.exam_index.rebuild(seen, dir_mtime_ns)
+
+        for filename, stat, result in self._scan_pending(pending, workers, executor):
+            if isinstance(result, Exception):
+                print(f"读取试卷文件 {filename} 失败: {result}")
+                continue
+            digest, info = result
+            if info is None:
+                info = catalog.get_by_hash(filename, stat, digest)
+            else:
+                catalog.put(filename, stat, digest, info)
+            infos[filename] = info
+
+        for filename in sorted(infos):
+            exams.append(self._make_exam_entry(os.path.join(self.data_dir, filename), infos[filename]))
+
+        catalog.prune(seen)
+        catalog.save()
         return exams
 
+    def _scan_pending(self, pending: list, workers: int = None, executor: str = None):
+        """
+        处理目录缓存未命中的文件，逐个产生 (文件名, stat, 结果或异常)
+
+        只有一个文件或并行数为 1 时直接在当前线程处理，避免创建线程池的开销
+        """
+        workers = min(workers or self.list_workers, len(pending))
+        executor = executor or self.list_executor
+        tasks = [(filename, path, stat, self.catalog.entries.get(filename, {}).get('sha256'))
+                 for filename, path, stat in pending]
+
+        if workers <= 1:
+            for filename, path, stat, cached_sha256 in tasks:
+                try:
+                    yield filename, stat, _scan_exam_file(path, cached_sha256)
+                except Exception as e:
+                    yield filename, stat, e
+            return
+
+        pool_class = ProcessPoolExecutor if executor == LIST_EXECUTOR_PROCESS else ThreadPoolExecutor
+        with pool_class(max_workers=workers) as pool:
+            futures = [(filename, stat, pool.submit(_scan_exam_file, path, cached_sha256))
+                       for filename, path, stat, cached_sha256 in tasks]
+            for filename, stat, future in futures:
+                try:
+                    yield filename, stat, future.result()
+                except Exception as e:
+                    yield filename, stat, e
+
+    def rebuild_catalog(self) -> List[Dict[str, Any]]:
+        """
+        丢弃试卷目录缓存并重新扫描全部试卷
+
+        Returns:
+            重新生成的试卷列表
+        """
+        self.catalog.clear()
+        return self.list_exams()
+
+    def _read_exam_info(self, exam_path: str, stat: os.stat_result = None) -> Dict[str, Any]:
+        """
+        读取单个试卷的元数据（不经过目录缓存）
+
+        Args:
+            exam_path: 试卷文件路径
+            stat: 试卷文件的 stat 结果（可选）
+
+        Returns:
+            元数据字典，字段见 exam_metadata.INFO_FIELDS
+        """
+        info = read_metadata_sidecar(exam_path, stat)
+        if info is None:
+            # 回退：完整解密后提取元数据，并写入旁路文件供下次使用
+            info = build_exam_info(self._read_exam_file(exam_path))
+            write_metadata_sidecar(exam_path, info)
+        return info
+
+    def _make_exam_entry(self, exam_path: str, info: Dict[str, Any]) -> Dict[str, Any]:
+        """将元数据转换为 list_exams 返回的试卷基本信息"""
+        # 提取试卷基本信息
+        exam_id = self._exam_id_from_filename(os.path.basename(exam_path))
+        return {
+            'id': info['exam_id'] if info.get('exam_id') is not None else exam_id,
+            'name': info.get('exam_name', '未命名试卷'),
+            'description': info.get('description', ''),
+            'time_limit': info.get('time_limit', 120),
+            'total_questions': info.get('total_questions', 0),
+            'total_score': info.get('total_score', 0),
+            'file_path': exam_path
+        }
+
     def load_exam(self, exam_id: str) -> Optional[Dict[str, Any]]:
         """
         加载指定试卷（支持加密文件）
@@ -92,50 +248,140 @@ class QuestionManager:
             exam_id: 试卷ID
 
         Returns:
-            试卷数据字典，包含所有题目
-        """
-        # 尝试多种可能的文件名（包括加密文件）
-        possible_filenames = [
-            f"{exam_id}.json",
-            f"{exam_id}.json.enc",  # 加密文件
-            f"exam_{exam_id}.json" if not exam_id.startswith('exam_') else f"{exam_id}.json",
-            f"exam_{exam_id}.json.enc" if not exam_id.startswith('exam_') else f"{exam_id}.json.enc",
-        ]
-
-        for filename in possible_filenames:
-            exam_path = os.path.join(self.data_dir, filename)
-            if os.path.exists(exam_path):
-                try:
-                    # 检查是否是加密文件
-                    if filename.endswith('.enc') or encryptor.is_encrypted_file(exam_path):
-                        # 解密文件
-                        with open(exam_path, 'r', encoding='utf-8') as f:
-                            encrypted_data = f.read().strip()
-                        exam_data = encryptor.decrypt_data(encrypted_data)
-                    else:
-                        # 普通JSON文件
-                        with open(exam_path, 'r', encoding='utf-8') as f:
-                            exam_data = json.load(f)
+            试卷数据字典，包含所有题目；分段索引格式 (.exi) 返回按需解密题目的 LazyExam。
+            同一文件未变化时直接从内存缓存返回，每次返回的都是独立副本，调用方可以随意修改
+        """
+        exam_path = self.find_exam_file(exam_id)
+        if exam_path is None:
+            print(f"未找到试卷文件: {exam_id}")
+            return None
 
-                    # 确保试卷ID正确
-                    exam_data['exam_id'] = exam_id
+        try:
+            exam_data = self._load_cached_exam(exam_path, exam_id)
+            # 同一文件可能通过不同的ID形式（带或不带 exam_ 前缀）加载
+            exam_data['exam_id'] = exam_id
+            self._exam_paths[exam_id] = exam_path
+            # 普通试卷在加载时预编译全部答案（已编译的直接跳过）；分段索引试卷在判题时按需编译
+            if not isinstance(exam_data, LazyExam):
+                self.answer_keys.compile_all(exam_data.get('questions', []), exam_path)
+            return exam_data
+        except Exception as e:
+            print(f"加载试卷 {exam_id} 失败: {e}")
+            import traceback
+            traceback.print_exc()
+            return None
 
-                    # 验证题目数据格式
-                    self._validate_exam_data(exam_data)
+    def prefetch_exam(self, exam_id: str) -> bool:
+        """
+        预先解密并校验试卷，只放入内存缓存而不生成副本（供后台线程调用）
 
-                    return exam_data
-                except Exception as e:
-                    print(f"加载试卷 {exam_id} 失败: {e}")
-                    import traceback
-                    traceback.print_exc()
-                    return None
+        Returns:
+            试卷是否已在缓存中
 
-        print(f"未找到试卷文件: {exam_id}")
-        return None
+        Raises:
+            FileNotFoundError: 找不到试卷文件
+            ValueError: 试卷解密或校验失败
+        """
+        exam_path = self.find_exam_file(exam_id)
+        if exam_path is None:
+            raise FileNotFoundError(f"未找到试卷文件: {exam_id}")
+        if not self.exam_cache.contains(exam_path, os.stat(exam_path)):
+            self._load_cached_exam(exam_path, exam_id)
+        return self.exam_cache.contains(exam_path, os.stat(exam_path))
+
+    def find_exam_file(self, exam_id: str) -> Optional[str]:
+        """
+        查找试卷ID对应的文件（{id} 或 exam_{id}，后缀 .json/.json.enc/.exb/.exi，见 exam_index）
+
+        Returns:
+            试卷文件路径；找不到时返回 None
+        """
+        return self.exam_index.lookup(exam_id)
+
+    def _load_cached_exam(self, exam_path: str, exam_id: str) -> Dict[str, Any]:
+        """
+        读取并校验试卷，优先使用内存缓存
+
+        Returns:
+            试卷数据（与缓存相互独立，调用方可随意修改）
+        """
+        with self._load_locks_guard:
+            lock = self._load_locks.setdefault(exam_path, threading.Lock())
+
+        with lock:
+            stat = os.stat(exam_path)
+            exam_data = self.exam_cache.get(exam_path, stat)
+            if exam_data is not None:
+                return exam_data
+
+            filename = os.path.basename(exam_path)
+            trusted = (self.trust_validated and os.path.dirname(exam_path) == self.data_dir
+                       and self.catalog.is_validated(filename, stat, SCHEMA_VERSION))
+            exam_data = self._read_exam_file(exam_path, validate=not trusted,
+                                             exam_format=self.exam_index.exam_format(exam_path, stat))
+            # 文件内容可能已变化，丢弃按题目序号缓存的旧答案
+            self.answer_keys.invalidate(exam_path)
+
+            # 确保试卷ID正确
+            exam_data['exam_id'] = exam_id
+
+            # 验证题目数据格式（可信模式下已校验过的文件跳过）
+            if not trusted:
+                self._validate_exam_data(exam_data)
+                if self.trust_validated and not isinstance(exam_data, LazyExam):
+                    self._mark_validated(exam_path, stat, exam_data)
+
+            self.exam_cache.put(exam_path, stat, exam_data)
+            return exam_data
+
+    def _mark_validated(self, exam_path: str, stat: os.stat_result, exam_data: Dict[str, Any]) -> None:
+        """在试卷目录缓存中记录该文件内容已校验通过"""
+        if os.path.dirname(exam_path) != self.data_dir:
+            return
+        catalog = self.catalog
+        filename = os.path.basename(exam_path)
+        if not catalog.mark_validated(filename, stat, SCHEMA_VERSION):
+            catalog.put(filename, stat, file_sha256(exam_path), build_exam_info(exam_data))
+            catalog.mark_validated(filename, stat, SCHEMA_VERSION)
+        catalog.save()
+
+    @staticmethod
+    def _exam_id_from_filename(filename: str) -> str:
+        """根据文件名推导试卷ID（去掉 .json/.enc/.exb/.exi 后缀）"""
+        for extension in (CONTAINER_EXTENSION, INDEXED_EXTENSION):
+            if filename.endswith(extension):
+                filename = filename[:-len(extension)]
+        return filename.replace('.json', '').replace('.enc', '')
+
+    def _read_exam_file(self, exam_path: str, validate: bool = True, exam_format: str = None) -> Dict[str, Any]:
+        """
+        读取试卷文件，自动识别格式
+
+        Args:
+            exam_path: 试卷文件路径
+            validate: 分段索引格式是否在解密题目时逐题校验
+            exam_format: 已知的文件格式（默认读取文件头判断，见 exam_index.sniff_exam_format）
+
+        Returns:
+            试卷数据字典（分段索引格式返回 LazyExam，题目在访问时才解密并校验）
+        """
+        if exam_format is None:
+            exam_format = sniff_exam_format(exam_path)
+
+        if exam_format == FORMAT_INDEXED:
+            return LazyExam(exam_path, validator=self._validate_question if validate else None)
+
+        # 加密文件（二进制容器或Base64文本）
+        if exam_format == FORMAT_ENCRYPTED:
+            return encryptor.load_file(exam_path)
+
+        # 普通JSON文件
+        with open(exam_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
 
     def _validate_exam_data(self, exam_data: Dict[str, Any]) -> None:
         """
-        验证试卷数据格式
+        验证试卷数据格式（一次遍历收集全部错误，格式定义见 exam_schema）
 
         Args:
             exam_data: 试卷数据
@@ -143,194 +389,72 @@ class QuestionManager:
         Raises:
             ValueError: 数据格式错误
         """
-        required_fields = ['exam_id', 'exam_name', 'questions']
-        for field in required_fields:
-            if field not in exam_data:
-                raise ValueError(f"试卷数据缺少必要字段: {field}")
-
-        # 验证题目数据
-        questions = exam_data.get('questions', [])
-        if not isinstance(questions, list):
-            raise ValueError("questions字段必须是列表")
-
-        for i, question in enumerate(questions):
-            if not isinstance(question, dict):
-                raise ValueError(f"第{i+1}题必须是字典格式")
-
-            # 检查必要字段
-            if 'id' not in question:
-                raise ValueError(f"第{i+1}题缺少id字段")
-            if 'type' not in question:
-                raise ValueError(f"第{i+1}题缺少type字段")
-            if 'question' not in question:
-                raise ValueError(f"第{i+1}题缺少question字段")
-
-            # 综合题和完形填空组不需要顶层的answer字段
-            question_type = question.get('type')
-            if question_type not in ['comprehensive', 'cloze_group'] and 'answer' not in question:
-                raise ValueError(f"第{i+1}题缺少answer字段")
-
-            # 验证题型
-            question_type = question.get('type')
-            if question_type not in ['single_choice', 'fill_blank', 'comprehensive', 'cloze_group']:
-                raise ValueError(f"第{i+1}题题型无效: {question_type}")
-
-            # 根据题型验证字段
-            if question_type == 'single_choice':
-                # 单选题需要answer字段
-                if 'answer' not in question:
-                    raise ValueError(f"第{i+1}题(单选题)缺少answer字段")
-                answer = question.get('answer')
-                if not isinstance(answer, list):
-                    raise ValueError(f"第{i+1}题(单选题)answer字段必须是列表")
-                if 'options' not in question:
-                    raise ValueError(f"第{i+1}题(单选题)缺少options字段")
-                if not isinstance(question['options'], list):
-                    raise ValueError(f"第{i+1}题(单选题)options字段必须是列表")
-                if len(question['options']) < 2:
-                    raise ValueError(f"第{i+1}题(单选题)至少需要2个选项")
-
-            elif question_type == 'fill_blank':
-                # 填空题需要answer字段
-                if 'answer' not in question:
-                    raise ValueError(f"第{i+1}题(填空题)缺少answer字段")
-                answer = question.get('answer')
-                if not isinstance(answer, list):
-                    raise ValueError(f"第{i+1}题(填空题)answer字段必须是列表")
-
-            elif question_type == 'comprehensive':
-                # 综合题使用items字段（类似cloze_group）
-                if 'items' not in question:
-                    raise ValueError(f"第{i+1}题(综合题)缺少items字段")
-                if not isinstance(question['items'], list):
-                    raise ValueError(f"第{i+1}题(综合题)items字段必须是列表")
-                if len(question['items']) == 0:
-                    raise ValueError(f"第{i+1}题(综合题)至少需要1个item")
-
-                # 验证items
-                for j, item in enumerate(question['items']):
-                    if not isinstance(item, dict):
-                        raise ValueError(f"第{i+1}题第{j+1}个item必须是字典格式")
-                    if 'id' not in item:
-                        raise ValueError(f"第{i+1}题第{j+1}个item缺少id字段")
-                    if 'answer' not in item:
-                        raise ValueError(f"第{i+1}题第{j+1}个item缺少answer字段")
-                    item_answer = item.get('answer')
-                    if not isinstance(item_answer, str):
-                        raise ValueError(f"第{i+1}题第{j+1}个item的answer字段必须是字符串")
-                    if 'score' not in item:
-                        raise ValueError(f"第{i+1}题第{j+1}个item缺少score字段")
-                    if not isinstance(item.get('score'), (int, float)):
-                        raise ValueError(f"第{i+1}题第{j+1}个item的score字段必须是数字")
-
-            elif question_type == 'cloze_group':
-                # 完形填空组不需要顶层的answer字段，但需要items
-                if 'items' not in question:
-                    raise ValueError(f"第{i+1}题(完形填空组)缺少items字段")
-                if not isinstance(question['items'], list):
-                    raise ValueError(f"第{i+1}题(完形填空组)items字段必须是列表")
-                if len(question['items']) == 0:
-                    raise ValueError(f"第{i+1}题(完形填空组)至少需要1个空位")
-
-                # 验证每个空位
-                for j, item in enumerate(question['items']):
-                    if not isinstance(item, dict):
-                        raise ValueError(f"第{i+1}题第{j+1}个空位必须是字典格式")
-                    if 'id' not in item:
-                        raise ValueError(f"第{i+1}题第{j+1}个空位缺少id字段")
-                    if 'index' not in item:
-                        raise ValueError(f"第{i+1}题第{j+1}个空位缺少index字段")
-                    if 'answer' not in item:
-                        raise ValueError(f"第{i+1}题第{j+1}个空位缺少answer字段")
-                    if 'score' not in item:
-                        raise ValueError(f"第{i+1}题第{j+1}个空位缺少score字段")
-                    item_answer = item.get('answer')
-                    if not isinstance(item_answer, str):
-                        raise ValueError(f"第{i+1}题第{j+1}个空位answer字段必须是字符串")
-
-    def check_answer(self, question: Dict[str, Any], user_answer: List[str]) -> tuple[bool, str, List[bool], List[int]]:
-        """
-        检查用户答案是否正确
+        # 分段索引格式的题目在解密时逐题校验
+        if isinstance(exam_data, LazyExam):
+            missing = [f"试卷数据缺少必要字段: {field}" for field in ('exam_id', 'exam_name') if field not in exam_data]
+            if missing:
+                raise ValueError(format_errors(missing))
+            return
+
+        validator.validate_exam(exam_data)
+
+    def _validate_question(self, i: int, question: Dict[str, Any]) -> None:
+        """
+        验证单道题目的数据格式
+
+        Args:
+            i: 题目序号（从0开始）
+            question: 题目数据
+
+        Raises:
+            ValueError: 数据格式错误
+        """
+        validator.validate_question(i, question)
+
+    def check_answer(self, question: Dict[str, Any], user_answer: List[str], exam_id: str = None,
+                     index: int = None) -> tuple[bool, str, List[bool], List[int]]:
+        """
+        检查单道题的用户答案是否正确（答案规则见 answer_key）
 
         Args:
             question: 题目数据
             user_answer: 用户答案列表
+            exam_id: 题目所属试卷ID（与 index 一起给出且试卷已通过 load_exam 加载时复用已编译的答案，
+                     否则每次调用都重新编译）
+            index: 题目在试卷中的序号
 
         Returns:
             (整体是否正确, 解析说明, 每个空的正确性列表, 每个空的得分列表)
         """
-        question_type = question.get('type', 'single_choice')
-        correct_answer = []
-        item_scores = []
-        item_correctness = []
-
-        # 根据题型获取正确答案
-        if question_type == "comprehensive":
-            # 综合题：从items中提取答案和分值（类似cloze_group）
-            items = question.get('items', [])
-            for item in items:
-                item_answer = item.get('answer', '')
-                item_score = item.get('score', 1)
-                if isinstance(item_answer, list):
-                    correct_answer.extend(item_answer)
-                    item_scores.extend([item_score] * len(item_answer))
-                else:
-                    correct_answer.append(str(item_answer))
-                    item_scores.append(item_score)
-        elif question_type == "cloze_group":
-            # 完形填空组：从items中提取答案和分值
-            items = question.get('items', [])
-            for item in items:
-                item_answer = item.get('answer', '')
-                item_score = item.get('score', 1)
-                if isinstance(item_answer, list):
-                    correct_answer.extend(item_answer)
-                    item_scores.extend([item_score] * len(item_answer))
-                else:
-                    correct_answer.append(str(item_answer))
-                    item_scores.append(item_score)
-        else:
-            # 单选题和填空题：直接从answer字段获取
-            correct_answer = question.get('answer', [])
-
-        # 清理答案（去除首尾空格，转为小写）
-        # 注意：这里不能过滤空字符串，因为需要保持索引对应关系
-        cleaned_user_answer = [str(ans).strip().lower() for ans in user_answer]
-        cleaned_correct_answer = [str(ans).strip().lower() for ans in correct_answer]
-
-        # 对于cloze_group和comprehensive类型，计算每个空的正确性和得分
-        if question_type == "cloze_group" or question_type == "comprehensive":
-            item_correctness = []
-            item_earned_scores = []
-            for i in range(len(cleaned_correct_answer)):
-                if i < len(cleaned_user_answer) and cleaned_user_answer[i]:  # 用户填写了该空
-                    is_item_correct = cleaned_user_answer[i] == cleaned_correct_answer[i]
-                    item_correctness.append(is_item_correct)
-                    # 如果正确，获得该空的全部分值；否则得0分
-                    item_score = item_scores[i] if i < len(item_scores) else 1
-                    item_earned_scores.append(item_score if is_item_correct else 0)
-                else:
-                    # 用户没填写该空，不算对也不算错
-                    item_correctness.append(False)  # 暂时标记为False，但实际应该不参与判题
-                    item_earned_scores.append(0)
-
-            # 对于cloze_group类型，is_correct应该基于实际得分
-            # 如果有任何一个item得分>0，就认为题目有部分正确
-            total_possible_score = sum(item_scores) if item_scores else len(cleaned_correct_answer)
-            earned_score = sum(item_earned_scores)
-            is_correct = earned_score > 0  # 只要得了分就算部分正确
-        else:
-            # 对于其他题型，使用整体答案匹配
-            is_correct = cleaned_user_answer == cleaned_correct_answer
-            # 对于其他题型，返回空列表
-            item_correctness = []
-            item_earned_scores = []
+        exam_path = self._exam_paths.get(exam_id) if exam_id is not None else None
+        answer_key = self.answer_keys.get(question, exam_path, index)
+        is_correct, item_correctness, item_earned_scores = answer_key.check(user_answer)
 
         # 获取解析
         analysis = question.get('analysis', '暂无解析')
 
         return is_correct, analysis, item_correctness, item_earned_scores
 
+    def grade_exam(self, exam: Any, user_answers: Dict[str, List[str]], exam_id: str = None) -> ExamGradeResult:
+        """
+        整卷批量判分（交卷和答题进度弹窗共用）
+
+        Args:
+            exam: 试卷数据（字典或 LazyExam），也可以直接传入按试卷顺序排列的题目列表
+            user_answers: 用户答案字典 {question_id: answer_list}
+            exam_id: 试卷ID（默认取试卷数据中的 exam_id；能找到试卷文件时复用已编译的答案）
+
+        Returns:
+            判分结果，见 exam_grader.ExamGradeResult
+        """
+        if hasattr(exam, 'get'):
+            exam_id = exam_id or exam.get('exam_id')
+            questions = exam.get('questions', [])
+        else:
+            questions = exam
+        exam_path = self.find_exam_file(exam_id) if exam_id else None
+        return grade_exam(questions, user_answers, self.answer_keys, exam_path)
+
     def create_exam_template(self, exam_id: str, exam_name: str, description: str = "") -> Dict[str, Any]:
         """
         创建试卷模板
@@ -374,12 +498,29 @@ class QuestionManager:
             self._validate_exam_data(exam_data)
 
             # 保存到文件
+            self.exam_cache.invalidate(filepath)
+            self.answer_keys.invalidate(filepath)
+            self.exam_index.invalidate()
             with open(filepath, 'w', encoding='utf-8') as f:
                 json.dump(exam_data, f, ensure_ascii=False, indent=2)
+            write_metadata_sidecar(filepath, build_exam_info(exam_data))
 
             print(f"试卷已保存: {filepath}")
             return True
 
         except Exception as e:
             print(f"保存试卷失败: {e}")
-            return False
\ No newline at end of file
+            return False
+
+# 全局共享的试题管理器（试卷列表、答题窗口等共用同一份目录缓存和试卷缓存）
+_shared_manager: Optional[QuestionManager] = None
+_shared_manager_lock = threading.Lock()
+
+
+def get_question_manager() -> QuestionManager:
+    """获取全局共享的试题管理器（填空、完形填空组和综合题按宽松规则判题，见 answer_key.TEXT_INPUT_NORMALIZERS）"""
+    global _shared_manager
+    with _shared_manager_lock:
+        if _shared_manager is None:
+            _shared_manager = QuestionManager(answer_type_normalizers=TEXT_INPUT_NORMALIZERS)
+        return _shared_manager
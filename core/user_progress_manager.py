@@ -2,19 +2,83 @@
 # -*- coding: utf-8 -*-
 """
 用户进度管理器 - 管理用户做题进度和正确率
+
+所有修改都表示为事件（见 progress_events），先应用到内存中的进度数据，再交给存储层持久化:
+    json    快照（user_progress.json）+ 只追加的事件日志（user_progress.journal），见 progress_journal
+    sqlite  SQLite 数据库（user_progress.db，WAL 模式），见 progress_sqlite；
+            可用 migrate_progress_to_sqlite.py 从 JSON 文件迁移
+
+写入默认延迟合并（write_delay）：修改立即生效于内存，短时间内的多次修改合并为一次后台写入；
+关闭窗口或程序退出时调用 flush() 保证落盘。快照总是原子替换，程序崩溃最多丢失尚未写入的最近修改。
+
+程序内各窗口通过 get_progress_manager() 共用同一个管理器。多个程序实例共用数据目录时:
+写入在进程间文件锁（user_progress.lock）内进行，写入前检查存储的版本（文件状态 / data_version），
+其他进程写入过时先合并它们的修改，再写入本进程尚未保存的事件，双方的修改都不会丢失；
+reload_data() 只在存储确实被其他进程修改时才合并，未变化时不读取文件。
 """
 import sys
 import json
 import os
-from typing import Dict, List, Any, Optional
+import atexit
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Any, Optional, Tuple
 from datetime import datetime
 
+from .file_lock import FileLock
+from .progress_analytics import ProgressAnalytics
+from .progress_codec import encode_snapshot, get_serializer
+from .progress_events import apply_event, trim_history, trim_sessions
+from .progress_journal import JsonProgressStore, JOURNAL_COMPACT_EVENTS
+from .progress_sqlite import SQLiteProgressStore
+from .write_behind import DebouncedFlusher
+
+# 每道题默认逐条保留的最近答题记录数（更早的记录汇总为计数，None 表示不限）
+DEFAULT_HISTORY_LIMIT = 50
+# 每份试卷默认保留的最近会话数（交卷记录和会话索引，更早的会话汇总为计数，None 表示不限）
+DEFAULT_SESSION_LIMIT = 200
+
+# 延迟合并写入：最后一次修改后等待的秒数，以及第一次修改后最多等待的秒数（write_delay 为 0 时同步写入）
+DEFAULT_WRITE_DELAY = 0.5
+MAX_WRITE_DELAY = 5.0
+
+# 进度存储方式
+STORAGE_JSON = 'json'
+STORAGE_SQLITE = 'sqlite'
+
+PROGRESS_FILENAME = "user_progress.json"
+PROGRESS_DB_FILENAME = "user_progress.db"
+PROGRESS_LOCK_FILENAME = "user_progress.lock"
+
+# 尚未关闭的进度管理器（程序退出时写入它们尚未保存的修改）
+_live_managers = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all_managers() -> None:
+    for manager in list(_live_managers):
+        manager.flush()
+
+
 class UserProgressManager:
-    """用户进度管理器"""
+    """用户进度管理器（界面中请通过 get_progress_manager() 获取共享实例）"""
 
-    def __init__(self, data_dir: str = "data"):
+    def __init__(self, data_dir: str = "data", compact_events: int = JOURNAL_COMPACT_EVENTS,
+                 storage: str = None, history_limit: Optional[int] = DEFAULT_HISTORY_LIMIT,
+                 write_delay: float = DEFAULT_WRITE_DELAY, serializer: Optional[str] = None,
+                 session_limit: Optional[int] = DEFAULT_SESSION_LIMIT):
         """
         初始化用户进度管理器
+
+        Args:
+            data_dir: 数据目录（相对于程序所在目录）
+            compact_events: JSON 存储的日志累积多少条事件后压缩为快照
+            storage: 存储方式 'json' 或 'sqlite'；默认数据目录中已有 user_progress.db 时使用 SQLite，否则使用 JSON
+            history_limit: 每道题逐条保留的最近答题记录数，更早的记录汇总为计数（None 表示不限）
+            write_delay: 延迟合并写入的防抖秒数（0 表示每次修改立即同步写入）
+            serializer: JSON 存储的快照序列化方式 'json' 或 'msgpack'（None 表示 json），见 progress_codec
+            session_limit: 每份试卷保留的最近会话数，更早的会话汇总为计数（None 表示不限）
         """
         # === 【核心修改开始】 ===
         # 判断是打包后的环境(frozen)还是开发环境
@@ -29,7 +93,8 @@ class UserProgressManager:
         self.data_dir = os.path.join(base_path, data_dir)
         # === 【核心修改结束】 ===
         
-        self.progress_file = os.path.join(self.data_dir, "user_progress.json")
+        self.progress_file = os.path.join(self.data_dir, PROGRESS_FILENAME)
+        self.db_file = os.path.join(self.data_dir, PROGRESS_DB_FILENAME)
 
         # 确保数据目录存在
         # 这里非常重要：因为打包时我们排除了data目录里的动态文件
@@ -37,6 +102,35 @@ class UserProgressManager:
         if not os.path.exists(self.data_dir):
             os.makedirs(self.data_dir)
 
+        if storage is None:
+            storage = STORAGE_SQLITE if os.path.exists(self.db_file) else STORAGE_JSON
+        if storage == STORAGE_SQLITE:
+            self.store = SQLiteProgressStore(self.db_file)
+        elif storage == STORAGE_JSON:
+            self.store = JsonProgressStore(self.progress_file, compact_events, serializer)
+        else:
+            raise ValueError(f"不支持的进度存储方式: {storage}")
+        self.storage = storage
+        self.history_limit = history_limit
+        self.session_limit = session_limit
+        self._file_lock = FileLock(os.path.join(self.data_dir, PROGRESS_LOCK_FILENAME))
+
+        # batch() 中暂存的事件（None 表示不在批量模式）
+        self._pending_events: Optional[List[Dict[str, Any]]] = None
+
+        # 延迟写入：已应用到内存、尚未写入存储的事件
+        self.write_delay = write_delay
+        self._lock = threading.RLock()
+        self._unflushed: List[Dict[str, Any]] = []
+        self._dirty = False
+        self._needs_checkpoint = False  # 上次写入失败，下次写入完整快照
+        self._flusher = DebouncedFlusher(self.flush, write_delay, max(write_delay, MAX_WRITE_DELAY))
+        # 进度数据的修改计数（analytics() 据此判断缓存的分析结果是否过期）
+        self._revision = 0
+        self._analytics: Optional[ProgressAnalytics] = None
+        self._analytics_revision = -1
+        _live_managers.add(self)
+
         # 加载或初始化进度数据
         self.progress_data = self._load_progress_data()
 
@@ -47,37 +141,238 @@ class UserProgressManager:
         Returns:
             用户进度数据字典
         """
-        if os.path.exists(self.progress_file):
-            try:
-                with open(self.progress_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"加载用户进度数据失败: {e}")
-
-        # 初始化数据结构
-        return {
-            "version": "1.0",
-            "last_updated": datetime.now().isoformat(),
-            "exams": {},  # 按试卷ID存储进度
-            "daily_stats": {}  # 按日期存储统计（向后兼容）
-        }
+        with self._file_lock:
+            progress_data = self.store.load()
+        # 新的答题记录和会话按当前的保留策略截断（已有记录由 apply_retention 统一处理）
+        progress_data["history_limit"] = self.history_limit
+        progress_data["session_limit"] = self.session_limit
+        return progress_data
+
+    def _merge_external_changes(self) -> bool:
+        """
+        合并其他进程写入的修改（在文件锁内调用）：以存储中的最新数据为基础，重新应用本进程尚未写入的事件
+
+        Returns:
+            是否有其他进程的修改
+        """
+        if not self.store.changed():
+            return False
+        if self._unflushed:
+            progress_data = self.store.load()
+            for event in self._unflushed:
+                apply_event(progress_data, event)
+        else:
+            progress_data = self.store.refresh(self.progress_data)
+        progress_data["history_limit"] = self.history_limit
+        progress_data["session_limit"] = self.session_limit
+        self.progress_data = progress_data
+        self._revision += 1
+        return True
 
     def _save_progress_data(self) -> bool:
         """
-        保存用户进度数据
+        立即保存全部用户进度数据（JSON 存储压缩为快照），包括尚未写入的修改
 
         Returns:
             是否保存成功
         """
+        with self._lock, self._file_lock:
+            self._merge_external_changes()
+            ok = self.store.checkpoint(self.progress_data)
+            if ok:
+                self._unflushed = []
+                self._dirty = False
+                self._needs_checkpoint = False
+                self._flusher.cancel()
+            return ok
+
+    @property
+    def dirty(self) -> bool:
+        """是否有尚未写入存储的修改"""
+        return self._dirty
+
+    def flush(self) -> bool:
+        """
+        把尚未写入的修改写入存储（后台线程到期时调用，也可手动调用）
+
+        Returns:
+            是否保存成功（没有待写入的修改时返回 True）
+        """
+        with self._lock:
+            if not self._dirty:
+                return True
+            with self._file_lock:
+                if self._needs_checkpoint:
+                    return self._save_progress_data()
+                self._merge_external_changes()
+                if self.store.record(self.progress_data, self._unflushed):
+                    self._unflushed = []
+                    self._dirty = False
+                    return True
+            # 写入失败：内存中的数据仍然完整，下次改为写入完整快照
+            self._needs_checkpoint = True
+            return False
+
+    def _commit_events(self, events: List[Dict[str, Any]]) -> bool:
+        """应用事件并登记写入（write_delay 为 0 时同步写入）"""
+        with self._lock:
+            for event in events:
+                apply_event(self.progress_data, event)
+            self._revision += 1
+            self._unflushed.extend(events)
+            self._dirty = True
+            if self.write_delay <= 0:
+                return self.flush()
+        self._flusher.schedule()
+        return True
+
+    def compact(self) -> bool:
+        """立即把全部进度写入存储（JSON 存储把日志压缩为快照）"""
+        return self._save_progress_data()
+
+    def _record_event(self, event: Dict[str, Any]) -> bool:
+        """
+        应用一条修改事件并持久化
+
+        Returns:
+            是否记录成功
+        """
+        if self._pending_events is not None:
+            # 批量模式：退出 batch() 时统一应用和保存
+            self._pending_events.append(event)
+            return True
+        return self._commit_events([event])
+
+    @contextmanager
+    def batch(self):
+        """
+        批量记录：with 块中的修改暂存在内存，退出时一次性应用并只保存一次
+
+        JSON 存储整组事件写为日志中的一行（写入中途崩溃时整组丢弃），SQLite 存储在同一个事务中写入；
+        延迟写入时与其他尚未写入的修改合并为一次写入。
+        with 块中抛出异常时暂存的修改全部丢弃；嵌套调用时并入最外层的批量记录。
+
+        用法:
+            with progress_manager.batch():
+                progress_manager.record_answer(...)
+                progress_manager.record_exam_session(...)
+        """
+        if self._pending_events is not None:
+            yield self
+            return
+
+        self._pending_events = []
+        try:
+            yield self
+            events = self._pending_events
+        finally:
+            self._pending_events = None
+
+        if events and not self._commit_events(events):
+            raise IOError("保存用户进度数据失败")
+
+    def record_submission(self, exam_id: str, session_id: str,
+                          answers: Iterable[Tuple[str, bool, List[str]]], accuracy: float = None,
+                          score: float = None) -> bool:
+        """
+        记录一次交卷：全部答题结果和交卷会话一次性保存
+
+        Args:
+            exam_id: 试卷ID
+            session_id: 会话ID
+            answers: 答题结果 [(题目ID, 是否正确, 用户答案), ...]
+            accuracy: 交卷正确率（为 None 时不记录交卷会话）
+            score: 交卷得分（可选，用于更新最高分）
+
+        Returns:
+            是否记录成功
+        """
+        try:
+            with self.batch():
+                for question_id, is_correct, user_answer in answers:
+                    self.record_answer(exam_id, question_id, is_correct, user_answer, session_id)
+                if accuracy is not None:
+                    self.record_exam_session(exam_id, accuracy, session_id, score)
+            return True
+        except Exception as e:
+            print(f"记录交卷结果失败: {e}")
+            return False
+
+    def apply_retention(self, history_limit: Optional[int] = None, session_limit: Optional[int] = None) -> int:
+        """
+        按保留策略截断全部题目的答题历史和全部试卷的会话并保存（超出的旧记录汇总为计数）
+
+        Args:
+            history_limit: 每道题保留的答题记录数（默认使用 self.history_limit）
+            session_limit: 每份试卷保留的会话数（默认使用 self.session_limit）
+
+        Returns:
+            移除的答题记录、交卷记录和会话索引条目数
+        """
+        limit = self.history_limit if history_limit is None else history_limit
+        session_limit = self.session_limit if session_limit is None else session_limit
+        removed = 0
+        with self._lock, self._file_lock:
+            # 先合并其他进程的修改，再截断并写入完整快照
+            self._merge_external_changes()
+            for exam_data in self.progress_data["exams"].values():
+                for question_data in exam_data["questions"].values():
+                    removed += trim_history(question_data, limit)
+                removed += trim_sessions(exam_data, session_limit)
+            if removed:
+                self._revision += 1
+                self._save_progress_data()
+        return removed
+
+    def analytics(self) -> ProgressAnalytics:
+        """
+        获取学习数据分析（薄弱题目、正确率趋势、分类错误率、作答间隔等，见 progress_analytics）
+
+        先合并其他进程写入的修改；进度未变化时返回缓存的实例，有新的修改时重新构建一次。
+        """
+        with self._lock:
+            if self.store.changed():
+                with self._file_lock:
+                    self._merge_external_changes()
+            if self._analytics is None or self._analytics_revision != self._revision:
+                self._analytics = ProgressAnalytics(self.progress_data)
+                self._analytics_revision = self._revision
+            return self._analytics
+
+    def storage_size(self) -> int:
+        """进度数据在磁盘上占用的字节数"""
+        return sum(os.path.getsize(path) for path in self.store.storage_files() if os.path.exists(path))
+
+    def export_archive(self, archive_file: str, serializer: Optional[str] = None) -> bool:
+        """
+        把全部进度导出为 gzip 压缩的快照归档（可直接作为 user_progress.json 恢复）
+
+        Args:
+            archive_file: 归档文件路径
+            serializer: 序列化方式（None 表示 json）
+
+        Returns:
+            是否导出成功
+        """
         try:
-            self.progress_data["last_updated"] = datetime.now().isoformat()
-            with open(self.progress_file, 'w', encoding='utf-8') as f:
-                json.dump(self.progress_data, f, ensure_ascii=False, indent=2)
+            with self._lock:
+                content = encode_snapshot(self.progress_data, get_serializer(serializer), compress=True)
+            temp_file = archive_file + '.tmp'
+            with open(temp_file, 'wb') as f:
+                f.write(content)
+            os.replace(temp_file, archive_file)
             return True
         except Exception as e:
-            print(f"保存用户进度数据失败: {e}")
+            print(f"导出进度归档失败: {e}")
             return False
 
+    def close(self) -> None:
+        """写入尚未保存的修改并关闭存储"""
+        self.flush()
+        self._flusher.close()
+        self.store.close()
+        _live_managers.discard(self)
+
     def record_answer(self, exam_id: str, question_id: str, is_correct: bool,
                       user_answer: List[str] = None, session_id: str = None) -> bool:
         """
@@ -94,54 +389,15 @@ class UserProgressManager:
             是否记录成功
         """
         try:
-            # 确保试卷记录存在
-            if exam_id not in self.progress_data["exams"]:
-                self.progress_data["exams"][exam_id] = {
-                    "total_attempts": 0,
-                    "correct_attempts": 0,
-                    "questions": {},
-                    "last_attempt": None,
-                    "best_score": 0,
-                    "total_questions": 0  # 将在首次加载试卷时更新
-                }
-
-            exam_data = self.progress_data["exams"][exam_id]
-
-            # 确保题目记录存在
-            if question_id not in exam_data["questions"]:
-                exam_data["questions"][question_id] = {
-                    "attempts": 0,
-                    "correct": 0,
-                    "last_attempt": None,
-                    "last_correct": False,  # 最后一次是否正确
-                    "history": []
-                }
-
-            question_data = exam_data["questions"][question_id]
-
-            # 记录本次答题
-            attempt_record = {
-                "timestamp": datetime.now().isoformat(),
+            return self._record_event({
+                "op": "answer",
+                "exam_id": exam_id,
+                "question_id": question_id,
                 "correct": is_correct,
                 "user_answer": user_answer if user_answer else [],
-                "session_id": session_id  # 记录会话ID
-            }
-
-            question_data["history"].append(attempt_record)
-            question_data["attempts"] += 1
-            if is_correct:
-                question_data["correct"] += 1
-            question_data["last_attempt"] = datetime.now().isoformat()
-            question_data["last_correct"] = is_correct  # 记录最后一次是否正确
-
-            # 更新试卷统计
-            exam_data["total_attempts"] += 1
-            if is_correct:
-                exam_data["correct_attempts"] += 1
-            exam_data["last_attempt"] = datetime.now().isoformat()
-
-            # 保存数据
-            return self._save_progress_data()
+                "session_id": session_id,  # 记录会话ID
+                "timestamp": datetime.now().isoformat()
+            })
 
         except Exception as e:
             print(f"记录答题结果失败: {e}")
@@ -149,7 +405,7 @@ class UserProgressManager:
 
     def get_exam_progress(self, exam_id: str) -> Dict[str, Any]:
         """
-        获取指定试卷的学习进度
+        获取指定试卷的学习进度（直接读取增量维护的汇总数据，见 progress_events）
 
         Args:
             exam_id: 试卷ID
@@ -157,130 +413,167 @@ class UserProgressManager:
         Returns:
             试卷进度信息
         """
-        if exam_id not in self.progress_data["exams"]:
-            return {
-                "exam_id": exam_id,
-                "total_questions": 0,
-                "attempted_questions": 0,
-                "correct_questions": 0,
-                "progress_percentage": 0,
-                "accuracy_percentage": 0,
-                "last_attempt": None,
-                "best_score": 0,
-                "last_accuracy": 0  # 上次正确率
-            }
+        with self._lock:
+            if exam_id not in self.progress_data["exams"]:
+                return {
+                    "exam_id": exam_id,
+                    "total_questions": 0,
+                    "attempted_questions": 0,
+                    "correct_questions": 0,
+                    "progress_percentage": 0,
+                    "accuracy_percentage": 0,
+                    "last_attempt": None,
+                    "best_score": 0,
+                    "last_accuracy": 0  # 上次正确率
+                }
 
-        exam_data = self.progress_data["exams"][exam_id]
-        questions = exam_data["questions"]
+            exam_data = self.progress_data["exams"][exam_id]
+            questions = exam_data["questions"]
 
-        # 计算进度：已做过的题目数 / 总题目数（全局累计）
-        attempted_questions = len(questions)
+            # 计算进度：已做过的题目数 / 总题目数（全局累计）
+            attempted_questions = len(questions)
 
-        # 获取上次交卷的正确率
-        last_accuracy = self.get_last_session_accuracy(exam_id)
+            # 获取上次交卷的正确率
+            last_accuracy = self.get_last_session_accuracy(exam_id)
 
-        # 注意：如果上次交卷正确率是0%，就显示0%，不要使用历史计算
-        # 只有完全没有交卷记录时（last_accuracy为0且没有sessions记录），才使用历史计算
-        if last_accuracy == 0.0:
-            # 检查是否有交卷记录
-            exam_data = self.progress_data["exams"].get(exam_id, {})
-            sessions = exam_data.get("sessions", [])
+            # 注意：如果上次交卷正确率是0%，就显示0%，不要使用历史计算
+            # 只有完全没有交卷记录时（last_accuracy为0且没有sessions记录），才使用历史计算
+            if last_accuracy == 0.0:
+                # 检查是否有交卷记录
+                exam_data = self.progress_data["exams"].get(exam_id, {})
+                sessions = exam_data.get("sessions", [])
 
-            # 如果有交卷记录，即使正确率是0%，也显示0%
-            # 只有完全没有交卷记录时，才使用历史计算
-            if not sessions:
-                last_accuracy = self._calculate_last_attempt_accuracy(exam_id, questions)
+                # 如果有交卷记录，即使正确率是0%，也显示0%
+                # 只有完全没有交卷记录时，才使用历史计算
+                if not sessions:
+                    last_accuracy = self._calculate_last_attempt_accuracy(exam_id)
 
-        return {
-            "exam_id": exam_id,
-            "total_questions": exam_data.get("total_questions", 0),
-            "attempted_questions": attempted_questions,
-            "correct_questions": sum(1 for q in questions.values() if q.get("last_correct", False)),
-            "progress_percentage": (attempted_questions / exam_data.get("total_questions", 1) * 100) if exam_data.get("total_questions", 0) > 0 else 0,
-            "accuracy_percentage": last_accuracy,  # 使用上次正确率
-            "last_attempt": exam_data.get("last_attempt"),
-            "best_score": exam_data.get("best_score", 0),
-            "last_accuracy": last_accuracy
-        }
-
-    def _calculate_last_attempt_accuracy(self, exam_id: str, questions: Dict[str, Any]) -> float:
+            return {
+                "exam_id": exam_id,
+                "total_questions": exam_data.get("total_questions", 0),
+                "attempted_questions": attempted_questions,
+                "correct_questions": exam_data.get("last_correct_count", 0),
+                "progress_percentage": (attempted_questions / exam_data.get("total_questions", 1) * 100) if exam_data.get("total_questions", 0) > 0 else 0,
+                "accuracy_percentage": last_accuracy,  # 使用上次正确率
+                "last_attempt": exam_data.get("last_attempt"),
+                "best_score": exam_data.get("best_score", 0),
+                "last_accuracy": last_accuracy
+            }
+
+    def _calculate_last_attempt_accuracy(self, exam_id: str) -> float:
         """
         计算上次做题的正确率
 
+        最近一次答题属于某个会话时直接读取会话索引；没有会话ID时（旧版数据迁移、record_answer 未传 session_id）
+        按原有规则推断：取每道题最后一次答题记录，与最近一次相隔 30 分钟以内的视为同一次会话
+
         Args:
             exam_id: 试卷ID
-            questions: 题目数据字典
 
         Returns:
             上次正确率（百分比）
         """
-        if not questions:
-            return 0.0
-
-        # 找出所有题目最近一次答题的时间
-        recent_attempts = []
-        for q_id, q_data in questions.items():
-            if q_data.get("history"):
-                # 获取最近一次答题记录
-                last_record = q_data["history"][-1]
-                recent_attempts.append({
-                    "question_id": q_id,
-                    "timestamp": last_record.get("timestamp"),
-                    "correct": last_record.get("correct", False)
-                })
-
-        if not recent_attempts:
-            return 0.0
-
-        # 按时间排序，找到最近的时间
-        recent_attempts.sort(key=lambda x: x["timestamp"] or "", reverse=True)
-        most_recent_time = recent_attempts[0]["timestamp"]
-
-        if not most_recent_time:
-            return 0.0
-
-        # 找出在最近时间窗口内（比如30分钟内）做的题目
-        # 首先解析时间字符串
-        from datetime import datetime
-        try:
-            most_recent_dt = datetime.fromisoformat(most_recent_time.replace('Z', '+00:00'))
-        except:
-            # 如果时间格式解析失败，使用简单方法
-            most_recent_dt = None
-
-        last_session_questions = []
-        for attempt in recent_attempts:
-            timestamp = attempt["timestamp"]
-            if not timestamp:
-                continue
-
-            if most_recent_dt:
-                # 使用时间窗口（30分钟）
-                try:
-                    attempt_dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                    time_diff = abs((attempt_dt - most_recent_dt).total_seconds())
-                    if time_diff <= 1800:  # 30分钟内的题目视为同一次会话
-                        last_session_questions.append(attempt)
-                except:
-                    # 时间解析失败，直接比较字符串
-                    if timestamp == most_recent_time:
-                        last_session_questions.append(attempt)
-            else:
-                # 没有时间解析，直接比较字符串
-                if timestamp == most_recent_time:
+        with self._lock:
+            stats = self.get_session_stats(exam_id)
+            if stats is not None:
+                return stats["correct"] / stats["attempts"] * 100 if stats["attempts"] else 0.0
+
+            questions = self.progress_data["exams"].get(exam_id, {}).get("questions", {})
+            # 找出所有题目最近一次答题的时间
+            recent_attempts = []
+            for q_data in questions.values():
+                if q_data.get("history"):
+                    last_record = q_data["history"][-1]
+                    recent_attempts.append({
+                        "timestamp": last_record.get("timestamp"),
+                        "correct": last_record.get("correct", False)
+                    })
+            if not recent_attempts:
+                return 0.0
+
+            # 按时间排序，找到最近的时间
+            recent_attempts.sort(key=lambda x: x["timestamp"] or "", reverse=True)
+            most_recent_time = recent_attempts[0]["timestamp"]
+            if not most_recent_time:
+                return 0.0
+            try:
+                most_recent_dt = datetime.fromisoformat(most_recent_time.replace('Z', '+00:00'))
+            except (TypeError, ValueError):
+                # 时间格式解析失败时只比较字符串
+                most_recent_dt = None
+
+            last_session_questions = []
+            for attempt in recent_attempts:
+                timestamp = attempt["timestamp"]
+                if not timestamp:
+                    continue
+                if most_recent_dt:
+                    try:
+                        attempt_dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+                        if abs((attempt_dt - most_recent_dt).total_seconds()) <= 1800:  # 30分钟内的题目视为同一次会话
+                            last_session_questions.append(attempt)
+                    except (TypeError, ValueError):
+                        if timestamp == most_recent_time:
+                            last_session_questions.append(attempt)
+                elif timestamp == most_recent_time:
                     last_session_questions.append(attempt)
 
-        # 如果没有找到时间窗口内的题目，至少使用最近的一道题
-        if not last_session_questions and recent_attempts:
-            last_session_questions = [recent_attempts[0]]
+            # 如果没有找到时间窗口内的题目，至少使用最近的一道题
+            if not last_session_questions:
+                last_session_questions = [recent_attempts[0]]
+
+            correct_count = sum(1 for q in last_session_questions if q["correct"])
+            return correct_count / len(last_session_questions) * 100
 
-        # 计算正确率：上次做对的题数 / 上次做的题数
-        correct_count = sum(1 for q in last_session_questions if q["correct"])
-        total_count = len(last_session_questions)
+    def get_session_stats(self, exam_id: str, session_id: str = None) -> Optional[Dict[str, Any]]:
+        """
+        获取一次会话的答题统计
 
-        return (correct_count / total_count * 100) if total_count > 0 else 0.0
+        Args:
+            exam_id: 试卷ID
+            session_id: 会话ID（None 表示最近一次答题所属的会话）
 
-    def record_exam_session(self, exam_id: str, accuracy: float, session_id: str = None) -> bool:
+        Returns:
+            {"session_id", "attempts", "correct", "first_timestamp", "last_timestamp", "accuracy", "score"}，
+            accuracy / score 为交卷时记录的值（未交卷时为 None）；没有该会话时返回 None
+        """
+        with self._lock:
+            exam_data = self.progress_data["exams"].get(exam_id)
+            if exam_data is None:
+                return None
+            if session_id is None:
+                session_id = exam_data.get("last_session_id")
+            entry = exam_data.get("session_index", {}).get(session_id)
+            if entry is None:
+                return None
+            return {
+                "session_id": session_id,
+                "attempts": entry["attempts"],
+                "correct": entry["correct"],
+                "first_timestamp": entry.get("first_timestamp"),
+                "last_timestamp": entry.get("last_timestamp"),
+                "accuracy": entry.get("accuracy"),
+                "score": entry.get("score")
+            }
+
+    def get_session_breakdown(self, exam_id: str) -> List[Dict[str, Any]]:
+        """
+        获取试卷每次会话的答题统计
+
+        Args:
+            exam_id: 试卷ID
+
+        Returns:
+            按会话开始先后排列的统计列表，字段同 get_session_stats
+        """
+        with self._lock:
+            exam_data = self.progress_data["exams"].get(exam_id)
+            if exam_data is None:
+                return []
+            return [self.get_session_stats(exam_id, session_id) for session_id in exam_data.get("session_index", {})]
+
+    def record_exam_session(self, exam_id: str, accuracy: float, session_id: str = None,
+                            score: float = None) -> bool:
         """
         记录交卷会话的正确率
 
@@ -288,45 +581,26 @@ class UserProgressManager:
             exam_id: 试卷ID
             accuracy: 这次交卷的正确率
             session_id: 会话ID（如果为None则自动生成）
+            score: 这次交卷的得分（可选，用于更新最高分）
 
         Returns:
             是否记录成功
         """
         try:
-            if exam_id not in self.progress_data["exams"]:
-                self.progress_data["exams"][exam_id] = {
-                    "total_attempts": 0,
-                    "correct_attempts": 0,
-                    "questions": {},
-                    "last_attempt": None,
-                    "best_score": 0,
-                    "total_questions": 0,
-                    "last_session_accuracy": 0,  # 上次交卷正确率
-                    "sessions": []  # 交卷会话历史
-                }
-
-            exam_data = self.progress_data["exams"][exam_id]
-
             # 生成会话ID（如果未提供）
             if not session_id:
                 session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
 
-            # 记录会话
-            session_record = {
+            event = {
+                "op": "session",
+                "exam_id": exam_id,
                 "session_id": session_id,
-                "timestamp": datetime.now().isoformat(),
-                "accuracy": accuracy
+                "accuracy": accuracy,
+                "timestamp": datetime.now().isoformat()
             }
-
-            if "sessions" not in exam_data:
-                exam_data["sessions"] = []
-
-            exam_data["sessions"].append(session_record)
-            exam_data["last_session_accuracy"] = accuracy
-            exam_data["last_attempt"] = datetime.now().isoformat()
-
-            # 保存数据
-            return self._save_progress_data()
+            if score is not None:
+                event["score"] = score
+            return self._record_event(event)
 
         except Exception as e:
             print(f"记录交卷会话失败: {e}")
@@ -342,11 +616,12 @@ class UserProgressManager:
         Returns:
             上次交卷正确率（百分比），如果没有记录则返回0
         """
-        if exam_id not in self.progress_data["exams"]:
-            return 0.0
+        with self._lock:
+            if exam_id not in self.progress_data["exams"]:
+                return 0.0
 
-        exam_data = self.progress_data["exams"][exam_id]
-        return exam_data.get("last_session_accuracy", 0.0)
+            exam_data = self.progress_data["exams"][exam_id]
+            return exam_data.get("last_session_accuracy", 0.0)
 
     def update_exam_total_questions(self, exam_id: str, total_questions: int) -> bool:
         """
@@ -359,19 +634,15 @@ class UserProgressManager:
         Returns:
             是否更新成功
         """
-        if exam_id not in self.progress_data["exams"]:
-            self.progress_data["exams"][exam_id] = {
-                "total_attempts": 0,
-                "correct_attempts": 0,
-                "questions": {},
-                "last_attempt": None,
-                "best_score": 0,
-                "total_questions": total_questions
-            }
-        else:
-            self.progress_data["exams"][exam_id]["total_questions"] = total_questions
-
-        return self._save_progress_data()
+        exam = self.progress_data["exams"].get(exam_id)
+        if exam is not None and exam.get("total_questions") == total_questions:
+            # 总题数未变化：不产生修改，也不触发写入
+            return True
+        return self._record_event({
+            "op": "total_questions",
+            "exam_id": exam_id,
+            "total_questions": total_questions
+        })
 
     def get_all_exams_progress(self) -> Dict[str, Dict[str, Any]]:
         """
@@ -380,10 +651,11 @@ class UserProgressManager:
         Returns:
             所有试卷进度字典
         """
-        result = {}
-        for exam_id in self.progress_data["exams"]:
-            result[exam_id] = self.get_exam_progress(exam_id)
-        return result
+        with self._lock:
+            result = {}
+            for exam_id in self.progress_data["exams"]:
+                result[exam_id] = self.get_exam_progress(exam_id)
+            return result
 
     def migrate_from_old_stats(self, old_stats_file: str = "user_stats.json") -> bool:
         """
@@ -434,13 +706,12 @@ class UserProgressManager:
             是否清除成功
         """
         if exam_id in self.progress_data["exams"]:
-            del self.progress_data["exams"][exam_id]
-            return self._save_progress_data()
+            return self._record_event({"op": "clear_exam", "exam_id": exam_id})
         return True
 
     def get_question_history(self, exam_id: str, question_id: str) -> List[Dict[str, Any]]:
         """
-        获取指定题目的答题历史
+        获取指定题目的答题历史（按保留策略只包含最近的记录，更早的记录汇总在题目的 history_summary 中）
 
         Args:
             exam_id: 试卷ID
@@ -449,11 +720,13 @@ class UserProgressManager:
         Returns:
             答题历史列表
         """
-        if (exam_id not in self.progress_data["exams"] or
-            question_id not in self.progress_data["exams"][exam_id]["questions"]):
-            return []
+        with self._lock:
+            if (exam_id not in self.progress_data["exams"] or
+                question_id not in self.progress_data["exams"][exam_id]["questions"]):
+                return []
 
-        return self.progress_data["exams"][exam_id]["questions"][question_id].get("history", [])
+            # 返回副本：后台写入合并其他进程的修改时会原地更新内存数据
+            return list(self.progress_data["exams"][exam_id]["questions"][question_id].get("history", []))
 
     def get_daily_stats(self, date_str: str = None) -> Dict[str, Any]:
         """
@@ -465,29 +738,50 @@ class UserProgressManager:
         Returns:
             每日统计数据
         """
-        if date_str is None:
-            date_str = datetime.now().strftime("%Y-%m-%d")
-
-        if date_str not in self.progress_data["daily_stats"]:
-            return {
-                "date": date_str,
-                "total": 0,
-                "correct": 0,
-                "questions": []
-            }
+        with self._lock:
+            if date_str is None:
+                date_str = datetime.now().strftime("%Y-%m-%d")
+
+            if date_str not in self.progress_data["daily_stats"]:
+                return {
+                    "date": date_str,
+                    "total": 0,
+                    "correct": 0,
+                    "questions": []
+                }
 
-        return self.progress_data["daily_stats"][date_str]
+            return self.progress_data["daily_stats"][date_str]
 
     def reload_data(self) -> bool:
         """
-        重新从文件加载进度数据
+        同步其他进程写入的进度数据（存储未被修改时只检查文件状态，不重新读取）
 
         Returns:
             是否加载成功
         """
         try:
-            self.progress_data = self._load_progress_data()
+            with self._lock:
+                # 先写入尚未保存的修改（写入时会合并其他进程的修改）
+                if self._dirty:
+                    return self.flush()
+                if self.store.changed():
+                    with self._file_lock:
+                        self._merge_external_changes()
             return True
         except Exception as e:
             print(f"重新加载进度数据失败: {e}")
-            return False
\ No newline at end of file
+            return False
+
+
+# 全局共享的进度管理器（试卷列表、答题窗口等共用同一份内存数据，互相立即可见）
+_shared_manager: Optional[UserProgressManager] = None
+_shared_manager_lock = threading.Lock()
+
+
+def get_progress_manager() -> UserProgressManager:
+    """获取全局共享的进度管理器"""
+    global _shared_manager
+    with _shared_manager_lock:
+        if _shared_manager is None:
+            _shared_manager = UserProgressManager()
+        return _shared_manager
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+延迟合并写入 - 把短时间内的多次修改合并为一次后台写入
+
+每次修改后调用 schedule()：最后一次修改之后 delay 秒内没有新的修改时，在后台线程执行一次写入；
+持续修改时最迟在第一次修改之后 max_delay 秒写入，避免长时间不落盘。
+"""
+
+import threading
+import time
+from typing import Callable, Optional
+
+
+class DebouncedFlusher:
+    """防抖的后台写入线程（线程在第一次 schedule 时才启动）"""
+
+    def __init__(self, flush: Callable[[], object], delay: float, max_delay: float):
+        """
+        Args:
+            flush: 写入函数（在后台线程中调用，自行处理并发）
+            delay: 最后一次修改后等待的秒数
+            max_delay: 第一次修改后最多等待的秒数
+        """
+        self._flush = flush
+        self.delay = delay
+        self.max_delay = max_delay
+        self._cond = threading.Condition()
+        self._deadline: Optional[float] = None
+        self._first_pending: Optional[float] = None
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+    def schedule(self) -> None:
+        """登记一次修改，推迟到防抖窗口结束后写入"""
+        with self._cond:
+            if self._closed:
+                return
+            now = time.monotonic()
+            if self._first_pending is None:
+                self._first_pending = now
+            self._deadline = min(now + self.delay, self._first_pending + self.max_delay)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="progress-writer", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def cancel(self) -> None:
+        """取消已登记的写入（调用方已同步写入时使用）"""
+        with self._cond:
+            self._deadline = None
+            self._first_pending = None
+
+    def _run(self) -> None:
+        with self._cond:
+            while True:
+                while self._deadline is None and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                timeout = self._deadline - time.monotonic()
+                if timeout > 0:
+                    self._cond.wait(timeout)
+                    continue
+
+                self._deadline = None
+                self._first_pending = None
+                # 写入期间释放条件锁，新的修改可以继续登记
+                self._cond.release()
+                try:
+                    self._flush()
+                except Exception as e:
+                    print(f"后台写入失败: {e}")
+                finally:
+                    self._cond.acquire()
+
+    def close(self) -> None:
+        """停止后台线程（不执行尚未到期的写入，调用方应先同步写入）"""
+        with self._cond:
+            self._closed = True
+            self._deadline = None
+            self._cond.notify()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
@@ -14,7 +14,10 @@ from pathlib import Path
 project_root = Path(__file__).parent
 sys.path.append(str(project_root))
 
-from core.data_encryptor import encryptor
+from core.data_encryptor import encryptor, CONTAINER_EXTENSION
+
+# 可解密的文件后缀：Base64 文本格式和二进制容器
+ENCRYPTED_SUFFIXES = ('.enc', CONTAINER_EXTENSION)
 
 
 def decrypt_exam_file(encrypted_file_path, output_dir=None):
@@ -26,12 +29,12 @@ def decrypt_exam_file(encrypted_file_path, output_dir=None):
         output_dir: 输出目录（可选，默认为当前目录下的decrypted_exams目录）
 
     Returns:
-        解密后的文件路径
+        (解密后的文件路径, 解密统计信息)
     """
     # 检查文件是否存在
     if not os.path.exists(encrypted_file_path):
         print(f"错误：文件不存在 - {encrypted_file_path}")
-        return None
+        return None, None
 
     # 设置输出目录
     if output_dir is None:
@@ -44,24 +47,24 @@ def decrypt_exam_file(encrypted_file_path, output_dir=None):
     filename = os.path.basename(encrypted_file_path)
     if filename.endswith('.enc'):
         output_filename = filename[:-4]  # 移除.enc后缀
+    elif filename.endswith(CONTAINER_EXTENSION):
+        output_filename = filename[:-len(CONTAINER_EXTENSION)] + '.json'
     else:
         output_filename = filename + '.decrypted.json'
 
     output_path = os.path.join(output_dir, output_filename)
 
     try:
-        # 使用项目中的加密器解密文件
-        decrypted_path = encryptor.decrypt_file(encrypted_file_path, output_path)
-
-        # 读取解密后的JSON数据
-        with open(decrypted_path, 'r', encoding='utf-8') as f:
-            decrypted_data = json.load(f)
+        # 使用项目中的加密器流式解密文件（峰值内存与文件大小无关）
+        stats = encryptor.decrypt_file_stream(encrypted_file_path, output_path)
+        decrypted_path = stats['output_file']
 
         print(f"✓ 成功解密: {filename}")
         print(f"  保存到: {decrypted_path}")
-        print(f"  数据大小: {len(json.dumps(decrypted_data, ensure_ascii=False))} 字符")
+        print(f"  题目数量: {stats['questions']}")
+        print(f"  数据大小: {stats['chars']} 字符")
 
-        return decrypted_path, decrypted_data
+        return decrypted_path, stats
 
     except Exception as e:
         print(f"✗ 解密失败: {filename}")
@@ -104,11 +107,11 @@ def decrypt_all_exams(exams_dir=None, output_dir=None):
 
     # 遍历所有加密文件
     for filename in os.listdir(exams_dir):
-        if filename.endswith('.enc'):
+        if filename.endswith(ENCRYPTED_SUFFIXES):
             encrypted_file_path = os.path.join(exams_dir, filename)
 
             # 解密文件
-            decrypted_path, decrypted_data = decrypt_exam_file(
+            decrypted_path, stats = decrypt_exam_file(
                 encrypted_file_path, output_dir
             )
 
@@ -117,7 +120,7 @@ def decrypt_all_exams(exams_dir=None, output_dir=None):
                     'original_file': filename,
                     'decrypted_file': os.path.basename(decrypted_path),
                     'decrypted_path': decrypted_path,
-                    'data': decrypted_data
+                    'stats': stats
                 })
 
     print("-" * 50)
@@ -206,10 +209,10 @@ def main():
         print(f"错误：试卷目录不存在 - {exams_dir}")
         return
 
-    encrypted_files = [f for f in os.listdir(exams_dir) if f.endswith('.enc')]
+    encrypted_files = [f for f in os.listdir(exams_dir) if f.endswith(ENCRYPTED_SUFFIXES)]
 
     if not encrypted_files:
-        print("未找到加密试卷文件 (.enc)")
+        print("未找到加密试卷文件 (.enc/.exb)")
         return
 
     print(f"找到 {len(encrypted_files)} 个加密试卷文件:")
@@ -252,7 +255,7 @@ def main():
                 filename = encrypted_files[file_choice - 1]
                 encrypted_path = os.path.join(exams_dir, filename)
 
-                decrypted_path, decrypted_data = decrypt_exam_file(
+                decrypted_path, stats = decrypt_exam_file(
                     encrypted_path, output_dir
                 )
 
@@ -14,7 +14,7 @@ from pathlib import Path
 project_root = Path(__file__).parent
 sys.path.append(str(project_root))
 
-from core.data_encryptor import encryptor
+from core.data_encryptor import encryptor, CONTAINER_EXTENSION
 
 
 def decrypt_to_exams_folder():
@@ -30,11 +30,11 @@ def decrypt_to_exams_folder():
 
     # 查找所有加密文件
     encrypted_files = []
-    for file in exams_dir.glob("*.enc"):
-        encrypted_files.append(file)
+    for pattern in ("*.enc", f"*{CONTAINER_EXTENSION}"):
+        encrypted_files.extend(exams_dir.glob(pattern))
 
     if not encrypted_files:
-        print("未找到加密试卷文件 (.enc)")
+        print("未找到加密试卷文件 (.enc/.exb)")
         return []
 
     print(f"找到 {len(encrypted_files)} 个加密试卷文件")
@@ -45,25 +45,26 @@ def decrypt_to_exams_folder():
 
     for encrypted_file in encrypted_files:
         # 生成输出文件名（移除.enc后缀）
-        output_filename = encrypted_file.stem  # 移除.enc，保留exam_001.json
+        if encrypted_file.suffix == CONTAINER_EXTENSION:
+            output_filename = encrypted_file.stem + '.json'  # exam_001.exb -> exam_001.json
+        else:
+            output_filename = encrypted_file.stem  # 移除.enc，保留exam_001.json
         output_path = exams_dir / output_filename
 
         print(f"解密: {encrypted_file.name} -> {output_filename}")
 
         try:
-            # 使用项目中的加密器解密文件
-            decrypted_path = encryptor.decrypt_file(str(encrypted_file), str(output_path))
+            # 使用项目中的加密器流式解密文件（峰值内存与文件大小无关）
+            stats = encryptor.decrypt_file_stream(str(encrypted_file), str(output_path))
+            decrypted_path = stats['output_file']
 
             # 验证解密文件
             if os.path.exists(decrypted_path):
-                with open(decrypted_path, 'r', encoding='utf-8') as f:
-                    decrypted_data = json.load(f)
-
                 results.append({
                     'original': encrypted_file.name,
                     'decrypted': output_filename,
                     'path': decrypted_path,
-                    'size': len(json.dumps(decrypted_data, ensure_ascii=False))
+                    'size': stats['chars']
                 })
 
                 print(f"  ✓ 成功解密，大小: {results[-1]['size']} 字符")
@@ -221,7 +222,7 @@ def main():
     print()
 
     # 检查现有文件
-    encrypted_files = list(exams_dir.glob("*.enc"))
+    encrypted_files = list(exams_dir.glob("*.enc")) + list(exams_dir.glob(f"*{CONTAINER_EXTENSION}"))
     json_files = [f for f in exams_dir.glob("*.json")
                   if not f.name.endswith('.enc') and f.name != 'decryption_summary.json']
 
@@ -144,19 +144,27 @@
 
 import os
 import sys
+import json
 # 确保可以找到 core 文件夹
 project_root = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(project_root)
 
 try:
     from core.data_encryptor import encryptor
+    from core.lazy_exam import LazyExam, write_indexed_exam, INDEXED_EXTENSION
+    from core.exam_metadata import build_exam_info, write_metadata_sidecar
 except ImportError as e:
     print(f"错误: 无法导入加密模块，请检查目录结构。{e}")
     sys.exit(1)
 
 
-def encrypt_all_exams():
-    """加密所有试卷文件"""
+def encrypt_all_exams(indexed: bool = False):
+    """
+    加密所有试卷文件
+
+    Args:
+        indexed: 是否输出分段索引格式 (.exi)，该格式支持按题解密
+    """
     data_dir = os.path.join(project_root, "data")
     exams_dir = os.path.join(data_dir, "exams")
 
@@ -172,16 +180,23 @@ def encrypt_all_exams():
     skipped_count = 0
     error_count = 0
 
+    # 同一批次共用一个盐值：读取整个题库时只需派生一次密钥（IV 仍逐文件随机）
+    batch_salt = os.urandom(16)
+
     for filename in os.listdir(exams_dir):
         # 仅处理原始 .json 文件
         if filename.endswith('.json') and not filename.endswith('.enc'):
             input_file = os.path.join(exams_dir, filename)
-            output_file = input_file + '.enc'
+            if indexed:
+                output_file = input_file[:-len('.json')] + INDEXED_EXTENSION
+            else:
+                output_file = input_file + '.enc'
+            output_name = os.path.basename(output_file)
 
             # --- 修改点 1: 增加对旧加密格式的识别 ---
             # 如果已存在 .enc 文件，建议询问是否重新加密（因为旧的 .enc 可能是固定盐值格式）
             if os.path.exists(output_file):
-                print(f"⚠️ 发现已存在的加密文件 {filename}.enc")
+                print(f"⚠️ 发现已存在的加密文件 {output_name}")
                 choice = input(f"   是否使用【新版动态盐格式】重新加密该文件? (y/N): ").strip().lower()
                 if choice != 'y':
                     skipped_count += 1
@@ -189,17 +204,24 @@ def encrypt_all_exams():
 
             try:
                 # 执行加密 (内部已自动处理环境变量读取和随机盐生成)
-                encryptor.encrypt_file(input_file, output_file)
+                if indexed:
+                    with open(input_file, 'r', encoding='utf-8') as f:
+                        write_indexed_exam(json.load(f), output_file, salt=batch_salt)
+                else:
+                    encryptor.encrypt_file(input_file, output_file, salt=batch_salt)
                 
                 # --- 修改点 2: 验证环节 ---
-                with open(output_file, 'r', encoding='utf-8') as f:
-                    encrypted_data_str = f.read().strip()
-                
                 # 验证解密是否成功
-                decrypted_data = encryptor.decrypt_data(encrypted_data_str)
+                if indexed:
+                    decrypted_data = LazyExam(output_file).to_dict()
+                else:
+                    decrypted_data = encryptor.load_file(output_file)
                 
+                # 写入签名的元数据旁路文件，试卷列表无需解密即可显示
+                write_metadata_sidecar(output_file, build_exam_info(decrypted_data))
+
                 encrypted_count += 1
-                print(f"✓ 成功加密: {filename} -> {filename}.enc (已验证)")
+                print(f"✓ 成功加密: {filename} -> {output_name} (已验证)")
                 
                 # 打印题目数量确认数据完整
                 q_count = len(decrypted_data.get('questions', [])) if isinstance(decrypted_data, dict) else 0
@@ -239,6 +261,7 @@ if __name__ == "__main__":
     if test_encryption():
         choice = input("\n是否开始扫描并加密 exams 目录下的文件? (y/N): ").strip().lower()
         if choice == 'y':
-            encrypt_all_exams()
+            fmt = input("输出格式: 1. 整卷加密 (.json.enc)  2. 分段索引按题解密 (.exi) [1]: ").strip()
+            encrypt_all_exams(indexed=(fmt == '2'))
     else:
         print("\n[停止] 请先解决上述验证错误再运行加密。")
\ No newline at end of file
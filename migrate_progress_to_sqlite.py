@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+用户进度迁移脚本：JSON（user_progress.json + user_progress.journal）-> SQLite（user_progress.db）
+
+迁移成功后原 JSON 文件重命名为 *.migrated 备份，程序检测到 user_progress.db 后自动使用 SQLite 存储。
+
+用法:
+    python migrate_progress_to_sqlite.py              # 迁移 data 目录中的进度
+    python migrate_progress_to_sqlite.py --dir 路径   # 指定数据目录
+    python migrate_progress_to_sqlite.py --keep       # 保留原 JSON 文件（不重命名）
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# 确保可以找到 core 文件夹
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(project_root)
+
+try:
+    from core.user_progress_manager import UserProgressManager, STORAGE_JSON, STORAGE_SQLITE
+    from core.progress_journal import JOURNAL_SUFFIX
+except ImportError as e:
+    print(f"错误: 无法导入进度管理模块，请检查目录结构。{e}")
+    sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="把用户进度从 JSON 文件迁移到 SQLite 数据库")
+    parser.add_argument('--dir', default=os.path.join(project_root, "data"), help="数据目录（默认 data）")
+    parser.add_argument('--keep', action='store_true', help="保留原 JSON 文件")
+    args = parser.parse_args()
+
+    source = UserProgressManager(args.dir, storage=STORAGE_JSON)
+    if not os.path.exists(source.progress_file):
+        print(f"进度文件不存在: {source.progress_file}")
+        return 1
+    if os.path.exists(source.db_file):
+        print(f"数据库已存在: {source.db_file}（如需重新迁移请先删除）")
+        return 1
+
+    exams = source.progress_data["exams"]
+    attempt_count = sum(len(q.get("history", [])) for exam in exams.values() for q in exam["questions"].values())
+    source.close()
+
+    start = time.perf_counter()
+    target = UserProgressManager(args.dir, storage=STORAGE_SQLITE)
+    target.progress_data = source.progress_data
+    ok = target.compact()
+    target.close()
+    elapsed = (time.perf_counter() - start) * 1000
+    if not ok:
+        os.remove(target.db_file)
+        print("迁移失败，已删除未完成的数据库")
+        return 1
+
+    # 校验：从数据库重新加载的试卷进度应与原数据一致
+    reloaded = UserProgressManager(args.dir, storage=STORAGE_SQLITE)
+    consistent = reloaded.progress_data["exams"] == exams
+    reloaded.close()
+    if not consistent:
+        print("警告: 数据库内容与原进度数据不一致，请检查后再删除原文件")
+        return 1
+
+    print(f"已迁移 {len(exams)} 份试卷、{attempt_count} 条答题记录，耗时 {elapsed:.1f} ms")
+    print(f"数据库: {source.db_file}")
+    if not args.keep:
+        journal_file = os.path.splitext(source.progress_file)[0] + JOURNAL_SUFFIX
+        for path in (source.progress_file, journal_file):
+            if os.path.exists(path):
+                os.replace(path, path + '.migrated')
+                print(f"原文件已备份为: {path}.migrated")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -21,8 +21,8 @@ from typing import Dict, Any
 # 添加core模块到路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 try:
-    from core.question_manager import QuestionManager
-    from core.user_progress_manager import UserProgressManager
+    from core.question_manager import get_question_manager
+    from core.user_progress_manager import get_progress_manager
     QUESTION_MANAGER_AVAILABLE = True
     PROGRESS_MANAGER_AVAILABLE = True
 except ImportError:
@@ -30,6 +30,8 @@ except ImportError:
     PROGRESS_MANAGER_AVAILABLE = False
     print("警告: 试题管理器或进度管理器模块不可用")
 
+from ui.exam_prefetcher import ExamPrefetcher, pick_prefetch_candidates
+
 
 class ExamListWindow(QWidget):
     """试卷列表窗口"""
@@ -45,17 +47,23 @@ class ExamListWindow(QWidget):
 
         # 初始化管理器
         if QUESTION_MANAGER_AVAILABLE:
-            self.question_manager = QuestionManager()
+            self.question_manager = get_question_manager()
         else:
             self.question_manager = None
             QMessageBox.warning(self, "错误", "试题管理器初始化失败")
 
         if PROGRESS_MANAGER_AVAILABLE:
-            self.progress_manager = UserProgressManager()
+            self.progress_manager = get_progress_manager()
             self.progress_manager.migrate_from_old_stats()
         else:
             self.progress_manager = None
 
+        # 后台预加载最可能打开的试卷
+        self.prefetcher = None
+        if self.question_manager:
+            self.prefetcher = ExamPrefetcher(self.question_manager, self)
+            self.prefetcher.prefetch_failed.connect(self.on_prefetch_failed)
+
         # 初始化UI
         self.init_ui()
 
@@ -170,10 +178,12 @@ class ExamListWindow(QWidget):
             return
 
         self.table_widget.setRowCount(len(exams))
+        progress_list = []
 
         for row, exam in enumerate(exams):
             exam_id = exam["id"]
             progress_data = self.get_exam_progress_data(exam_id, exam["total_questions"])
+            progress_list.append(dict(progress_data, exam_id=exam_id))
             p_percent = progress_data["progress_percentage"]
             
             # 状态列
@@ -249,12 +259,22 @@ class ExamListWindow(QWidget):
 
             self.table_widget.setCellWidget(row, 5, btn_widget)
 
+        # 列表绘制完成后再开始预加载，不影响首屏显示
+        if self.prefetcher:
+            self.prefetcher.prefetch(pick_prefetch_candidates(progress_list))
+
+    def on_prefetch_failed(self, exam_id, message):
+        print(f"预加载试卷 {exam_id} 失败: {message}")
+
     def get_exam_progress_data(self, exam_id: str, total_questions: int) -> Dict[str, Any]:
         if self.progress_manager:
             return self.progress_manager.get_exam_progress(exam_id)
         return {"progress_percentage": 0, "accuracy_percentage": 0, "attempted_questions": 0}
 
     def on_study_clicked(self, exam_id):
+        # 用户已选定试卷，剩余的预加载不再需要（正在加载的同一试卷会由 QuestionManager 合并等待）
+        if self.prefetcher:
+            self.prefetcher.cancel()
         self.study_exam_requested.emit(exam_id)
 
     def on_clear_progress_clicked(self, exam_id):
@@ -269,6 +289,12 @@ class ExamListWindow(QWidget):
         self.load_real_data()
 
     def closeEvent(self, event):
+        if self.prefetcher:
+            self.prefetcher.cancel()
+            self.prefetcher.wait()
+        # 写入延迟合并中尚未保存的进度
+        if self.progress_manager:
+            self.progress_manager.flush()
         super().closeEvent(event)
         global _exam_list_window_instance
         if _exam_list_window_instance is self:
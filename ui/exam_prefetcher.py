@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+试卷后台预加载 - ExamPrefetcher
+试卷列表显示后，在后台线程中提前解密并校验用户最可能打开的试卷，放入 QuestionManager 的内存缓存，
+点击"学习"时即可直接从缓存打开。
+
+预加载使用独立的单线程 QThreadPool，避免占满全局线程池；结果通过信号回到界面线程。
+可随时取消：尚未开始的试卷会被跳过，正在解密的试卷完成后停止。
+"""
+
+import threading
+from typing import Any, Dict, List
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+# 单次最多预加载的试卷数量（需小于试卷缓存容量，避免把刚加载的试卷挤出缓存）
+PREFETCH_LIMIT = 3
+
+
+def pick_prefetch_candidates(progress_list: List[Dict[str, Any]], limit: int = PREFETCH_LIMIT) -> List[str]:
+    """
+    挑选最可能被打开的试卷
+
+    Args:
+        progress_list: UserProgressManager.get_exam_progress 的结果列表
+
+    Returns:
+        试卷ID列表，按优先级排序：最近学习的试卷，其次是其余学习到一半的试卷（按最近学习时间）
+    """
+    studied = [p for p in progress_list if p.get("last_attempt")]
+    studied.sort(key=lambda p: p["last_attempt"], reverse=True)
+
+    candidates = []
+    if studied:
+        candidates.append(studied[0]["exam_id"])
+    for progress in studied[1:]:
+        if 0 < progress.get("progress_percentage", 0) < 100:
+            candidates.append(progress["exam_id"])
+    return candidates[:limit]
+
+
+class _PrefetchRunnable(QRunnable):
+    """在线程池中依次预加载一组试卷"""
+
+    def __init__(self, prefetcher: 'ExamPrefetcher', exam_ids: List[str], cancel_event: threading.Event):
+        super().__init__()
+        self.prefetcher = prefetcher
+        self.question_manager = prefetcher.question_manager
+        self.exam_ids = exam_ids
+        self.cancel_event = cancel_event
+
+    def run(self):
+        for exam_id in self.exam_ids:
+            if self.cancel_event.is_set():
+                break
+            try:
+                self.question_manager.prefetch_exam(exam_id)
+                self.prefetcher.exam_prefetched.emit(exam_id)
+            except Exception as e:
+                self.prefetcher.prefetch_failed.emit(exam_id, str(e))
+        self.prefetcher.finished.emit()
+
+
+class ExamPrefetcher(QObject):
+    """试卷后台预加载器"""
+
+    exam_prefetched = pyqtSignal(str)       # 试卷已放入缓存：试卷ID
+    prefetch_failed = pyqtSignal(str, str)  # 预加载失败：试卷ID, 错误信息
+    finished = pyqtSignal()                 # 本轮预加载结束（完成或被取消）
+
+    def __init__(self, question_manager, parent=None):
+        super().__init__(parent)
+        self.question_manager = question_manager
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._cancel_event = None
+
+    def prefetch(self, exam_ids: List[str]) -> None:
+        """取消上一轮预加载并开始新一轮"""
+        self.cancel()
+        if not exam_ids:
+            return
+        self._cancel_event = threading.Event()
+        self._pool.start(_PrefetchRunnable(self, list(exam_ids), self._cancel_event))
+
+    def cancel(self) -> None:
+        """取消尚未开始的预加载"""
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+            self._cancel_event = None
+
+    def wait(self, msecs: int = -1) -> bool:
+        """等待后台线程结束，返回是否在超时前结束"""
+        return self._pool.waitForDone(msecs)
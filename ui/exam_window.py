@@ -21,8 +21,9 @@ from .progress_dialog import ProgressDialog
 # 添加core模块到路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 try:
-    from core.question_manager import QuestionManager
-    from core.user_progress_manager import UserProgressManager
+    from core.question_manager import get_question_manager
+    from core.user_progress_manager import get_progress_manager
+    from core.lazy_exam import LazyExam, count_exam_items
     QUESTION_MANAGER_AVAILABLE = True
     PROGRESS_MANAGER_AVAILABLE = True
 except ImportError:
@@ -84,6 +85,7 @@ class ExamWindow(QWidget):
         self.answered_questions = {}  # 已做题目的索引，格式：{题目索引: 已做item索引集合}
         
         self.questions = []  # 题目列表
+        self.exam_data = None  # 试卷数据（分段索引格式为 LazyExam）
         self.current_item_index = 0  # 当前聚焦的item索引（用于cloze_group类型）
 
         # 生成会话ID
@@ -98,14 +100,14 @@ class ExamWindow(QWidget):
 
         # 初始化试题管理器
         if QUESTION_MANAGER_AVAILABLE:
-            self.question_manager = QuestionManager()
+            self.question_manager = get_question_manager()
         else:
             self.question_manager = None
             QMessageBox.warning(self, "错误", "试题管理器初始化失败")
 
         # 初始化进度管理器
         if PROGRESS_MANAGER_AVAILABLE:
-            self.progress_manager = UserProgressManager()
+            self.progress_manager = get_progress_manager()
             # 更新试卷总题数
             self.update_exam_total_questions()
         else:
@@ -247,14 +249,11 @@ class ExamWindow(QWidget):
         """更新试卷总题数到进度管理器"""
         if self.progress_manager and self.questions:
             # 计算实际题目总数（对于cloze_group和comprehensive类型，每个item算作一道题）
-            total_questions = 0
-            for question in self.questions:
-                question_type = question.get('type', 'single_choice')
-                if question_type == "cloze_group" or question_type == "comprehensive":
-                    items = question.get('items', [])
-                    total_questions += len(items)
-                else:
-                    total_questions += 1
+            # 按需解密的试卷直接使用索引中的题目数，避免为统计而解密全部题目
+            if isinstance(self.exam_data, LazyExam):
+                total_questions = self.exam_data.total_questions
+            else:
+                total_questions = sum(count_exam_items(q) for q in self.questions)
 
             self.progress_manager.update_exam_total_questions(
                 self.exam_id, total_questions
@@ -720,8 +719,13 @@ class ExamWindow(QWidget):
         if not exam_data:
             return
 
+        self.exam_data = exam_data
         self.exam_name = exam_data.get('exam_name', self.exam_name)
         self.setWindowTitle(f"答题 - {self.exam_name}")
+
+        if isinstance(exam_data, LazyExam):
+            self.load_lazy_questions(exam_data)
+            return
         
         original_questions = exam_data.get('questions', [])
         self.questions = []
@@ -756,6 +760,39 @@ class ExamWindow(QWidget):
 
         self.update_exam_total_questions()
         self.show_question(0, 0)
+
+    def load_lazy_questions(self, exam):
+        """加载分段索引试卷：题号由索引预先计算，题目在显示时才解密"""
+        # 根据索引中的折算题数计算每道题的起始题号
+        first_numbers = []
+        question_counter = 1
+        for q_idx in range(exam.question_count):
+            first_numbers.append(question_counter)
+            question_counter += exam.questions.item_count(q_idx)
+        self.total_questions = exam.total_questions
+
+        def apply_numbering(q_idx, question):
+            # 与 load_real_questions 中的编号规则保持一致
+            if question.get('type', 'single_choice') in ("cloze_group", "comprehensive"):
+                question['question_number'] = None
+                for item_idx, item in enumerate(question.get('items', [])):
+                    if 'metadata' not in item: item['metadata'] = {}
+                    item['metadata']['question_number'] = first_numbers[q_idx] + item_idx
+            else:
+                question['question_number'] = first_numbers[q_idx]
+
+        exam.set_on_load(apply_numbering)
+        self.questions = exam.questions
+
+        self.update_exam_total_questions()
+        self.show_question(0, 0)
+
+    def question_type_at(self, index):
+        """获取指定题目的题型（分段索引试卷直接读取索引，不解密题目）"""
+        if isinstance(self.exam_data, LazyExam):
+            return self.questions.type_of(index)
+        return self.questions[index].get('type', 'single_choice')
+
     def print_question_structure(self):
         """打印题目结构用于调试"""
         print("\n=== 题目结构调试信息 ===")
@@ -783,9 +820,15 @@ class ExamWindow(QWidget):
         if index < 0 or index >= len(self.questions):
             return
 
+        try:
+            # 分段索引试卷在首次显示时才解密并校验题目，失败时提示并停留在当前题目
+            question = self.questions[index]
+        except (ValueError, OSError) as e:
+            QMessageBox.warning(self, "错误", f"第 {index + 1} 题加载失败: {e}")
+            return
+
         self.current_question_index = index
         self.current_item_index = item_index
-        question = self.questions[index]
         question_id = question.get('id', f'q_{index+1}')
 
         question_type = question.get('type', 'single_choice')
@@ -890,7 +933,7 @@ class ExamWindow(QWidget):
                         if user_answer[0] == option:
                             radio.setChecked(True)
                             # 检查答案是否正确并设置颜色
-                            is_correct, _, _, _ = self.question_manager.check_answer(question, user_answer)
+                            is_correct, _, _, _ = self.check_current_answer(question, user_answer)
                             if is_correct:
                                 # 正确 - 绿色
                                 radio.setStyleSheet("""
@@ -982,7 +1025,7 @@ class ExamWindow(QWidget):
                         input_field.setText(user_answer[0])
                         # 检查答案是否正确并设置颜色
                         if user_answer[0].strip():  # 只处理非空答案
-                            is_correct, _, item_correctness, _ = self.question_manager.check_answer(question, user_answer)
+                            is_correct, _, item_correctness, _ = self.check_current_answer(question, user_answer)
                             if len(item_correctness) > 0:
                                 is_item_correct = item_correctness[0]
                                 # 使用统一的颜色设置方法
@@ -1052,7 +1095,7 @@ class ExamWindow(QWidget):
                                 input_field.setText(user_answer[i])
                                 # 检查答案是否正确并设置颜色
                                 if user_answer[i].strip():  # 只处理非空答案
-                                    is_correct, _, item_correctness, _ = self.question_manager.check_answer(question, user_answer)
+                                    is_correct, _, item_correctness, _ = self.check_current_answer(question, user_answer)
                                     if i < len(item_correctness):
                                         is_item_correct = item_correctness[i]
                                         # 使用统一的颜色设置方法
@@ -1088,7 +1131,7 @@ class ExamWindow(QWidget):
                             input_field.setText(user_answer[0])
                             # 检查答案是否正确并设置颜色
                             if user_answer[0].strip():  # 只处理非空答案
-                                is_correct, _, item_correctness, _ = self.question_manager.check_answer(question, user_answer)
+                                is_correct, _, item_correctness, _ = self.check_current_answer(question, user_answer)
                                 if len(item_correctness) > 0:
                                     is_item_correct = item_correctness[0]
                                     # 使用统一的颜色设置方法
@@ -1468,7 +1511,7 @@ class ExamWindow(QWidget):
         question_type = question.get('type', 'single_choice')
 
         # 检查答案是否正确
-        is_correct, _, item_correctness, _ = self.question_manager.check_answer(question, user_answer)
+        is_correct, _, item_correctness, _ = self.check_current_answer(question, user_answer)
 
         # 根据题型恢复颜色
         if question_type in ["cloze_group", "comprehensive"]:
@@ -1753,6 +1796,10 @@ class ExamWindow(QWidget):
         # 保存会话数据到文件
         self.save_session_data()
 
+    def check_current_answer(self, question, user_answer):
+        """判定当前题目的答案（按试卷ID和题目序号复用已编译的答案）"""
+        return self.question_manager.check_answer(question, user_answer, self.exam_id, self.current_question_index)
+
     def check_and_show_answer_result(self, question, user_answer, question_type):
         """检查答案并显示结果"""
         if not user_answer:
@@ -1761,7 +1808,7 @@ class ExamWindow(QWidget):
         question_id = question.get('id', f'q_{self.current_question_index+1}')
 
         # 检查答案是否正确
-        is_correct, correct_answer, item_correctness, item_earned_scores = self.question_manager.check_answer(
+        is_correct, correct_answer, item_correctness, item_earned_scores = self.check_current_answer(
             question, user_answer
         )
 
@@ -1904,7 +1951,7 @@ class ExamWindow(QWidget):
 
         # 检查答案是否正确
         user_answer = self.user_answers[question_id]
-        is_correct, _, _, _ = self.question_manager.check_answer(question, user_answer)
+        is_correct, _, _, _ = self.check_current_answer(question, user_answer)
 
         # 更新单选按钮颜色
         self.update_radio_button_color(question, selected_option, is_correct)
@@ -1945,7 +1992,7 @@ class ExamWindow(QWidget):
 
             # 检查答案是否正确
             user_answer = self.user_answers[question_id]
-            is_correct, _, item_correctness, _ = self.question_manager.check_answer(question, user_answer)
+            is_correct, _, item_correctness, _ = self.check_current_answer(question, user_answer)
 
             # 更新输入框颜色
             self.update_input_field_color(question_id, index, is_correct if index == 0 else (item_correctness[index] if index < len(item_correctness) else False))
@@ -2017,7 +2064,7 @@ class ExamWindow(QWidget):
 
                 # 检查答案是否正确
                 user_answer = self.user_answers[question_id]
-                is_correct, _, item_correctness, _ = self.question_manager.check_answer(question, user_answer)
+                is_correct, _, item_correctness, _ = self.check_current_answer(question, user_answer)
 
                 # 更新所有输入框颜色（只更新已填写的空）
                 for i in range(expected_count):
@@ -2031,7 +2078,7 @@ class ExamWindow(QWidget):
                 # 如果用户填写了答案但还没填完所有空，只更新当前输入框的颜色
                 # 检查当前空的答案是否正确
                 user_answer = self.user_answers[question_id]
-                is_correct, _, item_correctness, _ = self.question_manager.check_answer(question, user_answer)
+                is_correct, _, item_correctness, _ = self.check_current_answer(question, user_answer)
 
                 # 只更新当前输入框的颜色
                 if index < len(item_correctness):
@@ -2329,8 +2376,8 @@ class ExamWindow(QWidget):
 
         # 找到该题型的第一个题目
         target_index = -1
-        for i, question in enumerate(self.questions):
-            if question.get('type') in target_types:
+        for i in range(len(self.questions)):
+            if self.question_type_at(i) in target_types:
                 target_index = i
                 break
 
@@ -2358,112 +2405,50 @@ class ExamWindow(QWidget):
             QMessageBox.warning(self, "错误", "试题管理器不可用")
             return
 
-        # 计算成绩
-        total_score = 0  # 整个试卷的总分
-        obtained_score = 0  # 用户实际得分
-        correct_count = 0
-        # 初始化总题数：统计用户实际做的题目数量
-        total_count = 0
-
-        # 先计算整个试卷的总分
-        for question in self.questions:
-            question_type = question.get('type', 'single_choice')
-            if question_type == "cloze_group" or question_type == "comprehensive":
-                items = question.get('items', [])
-                for item in items:
-                    item_score = item.get('score', 1)
-                    total_score += item_score
-            else:
-                question_score = question.get('score', 5)
-                total_score += question_score
+        # 整卷批量判分（分段索引试卷会解密全部题目，题目损坏时无法交卷）
+        try:
+            result = self.question_manager.grade_exam(self.questions, self.user_answers, self.exam_id)
+        except (ValueError, OSError) as e:
+            QMessageBox.warning(self, "错误", f"试卷题目加载失败，无法交卷: {e}")
+            return
 
-        # 生成会话ID（在循环之前）
+        # 生成会话ID
         import time
         session_id = f"session_{int(time.time())}"
 
-        for question in self.questions:
-            question_id = question.get('id')
-            user_answer = self.user_answers.get(question_id, [])
-
-            # 只记录用户实际做了的题目（user_answer不为空）
-            if user_answer:
-                # 检查答案
-                is_correct, _, item_correctness, item_earned_scores = self.question_manager.check_answer(question, user_answer)
-
-                # 记录用户进度
-                if self.progress_manager:
-                    question_type = question.get('type', 'single_choice')
-                    if question_type == "cloze_group" or question_type == "comprehensive":
-                        # 对于cloze_group和comprehensive类型，为每个item记录独立的答题结果
-                        items = question.get('items', [])
-                        for i, item in enumerate(items):
-                            item_id = f"{question_id}_item{i+1}"
-                            item_is_correct = item_correctness[i] if i < len(item_correctness) else False
-                            # 只记录用户实际做了的item
-                            if i < len(user_answer) and user_answer[i]:
-                                self.progress_manager.record_answer(
-                                    exam_id=self.exam_id,
-                                    question_id=item_id,
-                                    is_correct=item_is_correct,
-                                    user_answer=[user_answer[i]] if i < len(user_answer) else [],
-                                    session_id=session_id
-                                )
-                    else:
-                        # 对于其他题型，记录整个题目的答题结果
-                        self.progress_manager.record_answer(
-                            exam_id=self.exam_id,
-                            question_id=question_id,
-                            is_correct=is_correct,
-                            user_answer=user_answer,
-                            session_id=session_id  # 传递会话ID
-                        )
-
-                # 获取题目分值
-                question_type = question.get('type', 'single_choice')
+        total_score = result.total_score  # 整个试卷的总分
+        obtained_score = result.obtained_score  # 用户实际得分
+        correct_count = result.correct_count
+        total_count = result.attempted_count  # 用户实际做的题目数量
+        accuracy = result.accuracy
+
+        # 记录用户进度（只记录用户实际做了的题目，与判分结果的作答判定一致），答题结果和交卷正确率一次性保存
+        if self.progress_manager:
+            answers = []
+            for question_id, question_result in result.question_results.items():
+                user_answer = self.user_answers.get(question_id, [])
+                question_type = question_result['type']
                 if question_type == "cloze_group" or question_type == "comprehensive":
-                    # 对于cloze_group和comprehensive类型，从items中获取每个item的分值
-                    items = question.get('items', [])
-                    item_scores = []
-                    for item in items:
-                        item_score = item.get('score', 1)
-                        item_scores.append(item_score)
-
-                    # 对于cloze_group和comprehensive类型，使用实际得分而不是整体判断
-                    earned_score = sum(item_earned_scores) if item_earned_scores else 0
-                    obtained_score += earned_score
-
-                    # 统计用户实际做的小空数量
-                    actual_attempted_items = 0
-                    for i in range(len(items)):
-                        if i < len(user_answer) and user_answer[i]:
-                            actual_attempted_items += 1
-                    total_count += actual_attempted_items
-
-                    # 基于item_correctness计算正确的item数量
-                    if item_correctness:
-                        correct_items = sum(1 for is_correct in item_correctness if is_correct)
-                        correct_count += correct_items
+                    # 对于cloze_group和comprehensive类型，为每个item记录独立的答题结果
+                    item_correctness = question_result['item_correctness']
+                    item_attempted = question_result['item_attempted']
+                    for i, item_is_correct in enumerate(item_correctness):
+                        # 只记录用户实际做了的item（规范化后为空的不算）
+                        if item_attempted[i]:
+                            answers.append((f"{question_id}_item{i+1}", item_is_correct, [user_answer[i]]))
                 else:
-                    total_count += 1  # 用户做了这道题
-                    if is_correct:
-                        correct_count += 1
-                        question_score = question.get('score', 5)
-                        obtained_score += question_score
-            else:
-                # 用户没有做这道题，不计入统计
-                pass
-
-        # 计算正确率
-        accuracy = (correct_count / total_count * 100) if total_count > 0 else 0
+                    # 对于其他题型，记录整个题目的答题结果
+                    answers.append((question_id, question_result['correct'], user_answer))
 
-        # 记录交卷会话的正确率
-        if self.progress_manager:
-            # 记录交卷正确率（使用前面生成的session_id）
-            self.progress_manager.record_exam_session(
+            self.progress_manager.record_submission(
                 exam_id=self.exam_id,
+                session_id=session_id,
+                answers=answers,
                 accuracy=accuracy,
-                session_id=session_id
+                score=obtained_score
             )
+            # 交卷是明确的保存点：立即写入，不等待延迟写入
+            self.progress_manager.flush()
 
         # 显示成绩（使用原来的简单弹窗）
         result_text = f"""
@@ -2499,6 +2484,9 @@ class ExamWindow(QWidget):
         self.save_current_answer()
         # 保存会话数据
         self.save_session_data()
+        # 写入延迟合并中尚未保存的进度
+        if self.progress_manager:
+            self.progress_manager.flush()
         print(f"窗口关闭，会话数据已保存: {self.session_file}")
         event.accept()
 
@@ -2508,8 +2496,13 @@ class ExamWindow(QWidget):
             QMessageBox.warning(self, "提示", "暂无题目数据")
             return
 
-        # 创建并显示进度弹窗
-        dialog = ProgressDialog(self.questions, self.user_answers, self)
+        # 创建并显示进度弹窗（作答统计与交卷使用同一份判分结果）
+        try:
+            grade_result = self.question_manager.grade_exam(self.questions, self.user_answers, self.exam_id) if self.question_manager else None
+        except (ValueError, OSError) as e:
+            QMessageBox.warning(self, "错误", f"试卷题目加载失败: {e}")
+            return
+        dialog = ProgressDialog(self.questions, self.user_answers, self, grade_result=grade_result)
         # 连接信号，当用户点击题号时跳转到对应题目
         dialog.question_clicked.connect(self.on_progress_question_clicked)
         dialog.exec_()
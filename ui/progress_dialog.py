@@ -17,10 +17,18 @@ class ProgressDialog(QDialog):
     # 定义信号：当用户点击题号按钮时发出
     question_clicked = pyqtSignal(int, int)  # 参数：题目索引, item索引（对于cloze_group）
 
-    def __init__(self, questions, user_answers, parent=None):
+    def __init__(self, questions, user_answers, parent=None, grade_result=None):
+        """
+        Args:
+            questions: 题目列表
+            user_answers: 用户答案字典
+            parent: 父窗口
+            grade_result: QuestionManager.grade_exam 的判分结果（可选，提供时直接使用其中的作答统计）
+        """
         super().__init__(parent)
         self.questions = questions
         self.user_answers = user_answers
+        self.grade_result = grade_result
         self.setWindowTitle("答题进度")
         self.setFixedSize(500, 600)
         self.setStyleSheet("""
@@ -168,26 +176,31 @@ class ProgressDialog(QDialog):
         # 计算统计数据 - 考虑cloze_group的每个item
         total_count = 0
         answered_count = 0
-        for i, question in enumerate(self.questions):
-            question_type = question.get('type', 'single_choice')
-            question_id = question.get('id', f'q_{i+1}')
+        if self.grade_result is not None:
+            # 直接使用整卷判分结果中的作答统计
+            total_count = self.grade_result.total_count
+            answered_count = self.grade_result.attempted_count
+        else:
+            for i, question in enumerate(self.questions):
+                question_type = question.get('type', 'single_choice')
+                question_id = question.get('id', f'q_{i+1}')
 
-            if question_type == 'cloze_group' or question_type == 'comprehensive':
-                # 对于cloze_group和comprehensive，每个item算作一道题
-                items = question.get('items', [])
-                total_count += len(items)
-
-                # 检查每个item是否有答案
-                if question_id in self.user_answers:
-                    user_answer_list = self.user_answers[question_id]
-                    for item_idx in range(len(items)):
-                        if item_idx < len(user_answer_list) and user_answer_list[item_idx]:
-                            answered_count += 1
-            else:
-                # 对于普通题目
-                total_count += 1
-                if question_id in self.user_answers:
-                    answered_count += 1
+                if question_type == 'cloze_group' or question_type == 'comprehensive':
+                    # 对于cloze_group和comprehensive，每个item算作一道题
+                    items = question.get('items', [])
+                    total_count += len(items)
+
+                    # 检查每个item是否有答案
+                    if question_id in self.user_answers:
+                        user_answer_list = self.user_answers[question_id]
+                        for item_idx in range(len(items)):
+                            if item_idx < len(user_answer_list) and user_answer_list[item_idx]:
+                                answered_count += 1
+                else:
+                    # 对于普通题目
+                    total_count += 1
+                    if question_id in self.user_answers:
+                        answered_count += 1
 
         # 更新统计标签
         self.total_label.setText(f"总题量: {total_count}")
@@ -363,7 +376,12 @@ class ProgressDialog(QDialog):
 
             # 检查是否已作答
             question_id = question.get('id', f'q_{question_index+1}')
-            if question_id in self.user_answers:
+            if self.grade_result is not None:
+                if question_type == 'cloze_group' or question_type == 'comprehensive':
+                    is_answered = self.grade_result.is_attempted(question_index, question.get('item_index', 0))
+                else:
+                    is_answered = self.grade_result.is_attempted(question_index)
+            elif question_id in self.user_answers:
                 # 检查cloze_group或comprehensive的item是否有答案
                 if question_type == 'cloze_group' or question_type == 'comprehensive':
                     item_index = question.get('item_index', 0)